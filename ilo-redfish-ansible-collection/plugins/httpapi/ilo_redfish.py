@@ -0,0 +1,177 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: ilo_redfish
+    short_description: Persistent Redfish session and keep-alive HTTPS connection to one iLO
+    description:
+        - httpapi plugin for the ansible.netcommon.httpapi connection, selected with ansible_network_os ilo_redfish
+        - Logs in once with remote_user / password and keeps the X-Auth-Token and the TLS connection open
+          for the lifetime of the persistent connection, i.e. across every task of the play on that host
+        - The ilo_* modules send their requests through it when run with this connection, so no task
+          after the first pays for a login or a TLS handshake
+        - The session is logged out when the persistent connection closes
+    version_added: "1.0"
+    requirements:
+        - iLO 5
+        - ansible.netcommon
+    author:
+        - Dung K Hoang
+'''
+
+EXAMPLES = '''
+# host_vars/ilo1.yml
+ansible_host: 10.1.1.7
+ansible_connection: ansible.netcommon.httpapi
+ansible_network_os: ilo_redfish
+ansible_user: admin
+ansible_password: "{{ vault_ilo_password }}"
+ansible_httpapi_use_ssl: true
+ansible_httpapi_validate_certs: false
+
+# tasks - ilo_ip, ilo_username and ilo_password are taken from the connection
+- name: ilo system facts
+  ilo_system_facts:
+    option: Memory
+'''
+
+import json
+import socket
+import ssl
+import threading
+
+from ansible.errors import AnsibleConnectionFailure, AnsibleAuthenticationFailure
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+from ansible.plugins.httpapi import HttpApiBase
+
+
+#-------------------------------------------------
+
+
+class HttpApi(HttpApiBase):
+
+    SERVICE_ROOT                = '/redfish/v1/'
+    SESSIONS                    = '/redfish/v1/SessionService/Sessions/'
+    IDEMPOTENT                  = ('GET', 'HEAD', 'PUT', 'DELETE')
+    STALE                       = (http_client.BadStatusLine, http_client.CannotSendRequest, socket.error)
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+
+        self.http                   = None                  # keep-alive HTTPSConnection
+        self.lock                   = threading.Lock()
+        self.session_key            = None
+        self.session_location       = None
+
+
+    # ----------------- sessions - called by the httpapi connection on connect and close
+    def login(self, username, password):
+        if username is None or password is None:
+            raise AnsibleAuthenticationFailure('ilo_redfish: remote_user and password are required')
+
+        _status, _headers, _read    = self.request('POST', self.SESSIONS, dict(UserName=username, Password=password), auth=False)
+        _headers                    = dict((_k.lower(), _v) for _k, _v in _headers.items())
+        if _status not in (200, 201) or not _headers.get('x-auth-token'):
+            raise AnsibleAuthenticationFailure('ilo_redfish: login to {0} failed with status {1}'.format(self.get_host(), _status))
+
+        self.session_key            = _headers['x-auth-token']
+        self.session_location       = _headers.get('location')
+        if self.session_location and '://' in self.session_location:
+            self.session_location   = urlsplit(self.session_location).path
+
+    def logout(self):
+        try:
+            if self.session_location:
+                self.request('DELETE', self.session_location)
+        finally:
+            self.session_key        = None
+            self.session_location   = None
+            self.close()
+
+    def update_auth(self, response, response_text):
+        # The token is sent by request() - nothing to take from responses
+        return None
+
+
+    # ----------------- called by the modules through Connection(socket_path).send_request()
+    def send_request(self, data, path=None, method='GET', headers=None):
+        '''
+        Returns dict(status, headers, read) - read is the body as text
+        '''
+        _status, _headers, _read    = self.request(method, path or self.SERVICE_ROOT, data, headers=headers)
+        if _status == 401 and self.session_key is not None:
+            # Session timed out or iLO was reset - log in again and replay once
+            self.session_key        = None
+            self.login(self.connection.get_option('remote_user'), self.connection.get_option('password'))
+            _status, _headers, _read = self.request(method, path or self.SERVICE_ROOT, data, headers=headers)
+        return dict(status=_status, headers=_headers, read=_read)
+
+    def get_host(self):
+        return self.connection.get_option('host')
+
+
+    # ----------------- one exchange over the keep-alive connection
+    def request(self, method, path, body=None, headers=None, auth=True):
+        _headers                    = {
+            'Accept'                : 'application/json',
+            'OData-Version'         : '4.0'
+        }
+        if auth and self.session_key:
+            _headers['X-Auth-Token'] = self.session_key
+        _data                       = None
+        if body is not None:
+            _data                   = body if isinstance(body, (bytes, str)) else json.dumps(body)
+            _headers['Content-Type'] = 'application/json'
+        _headers.update(headers or {})
+
+        with self.lock:
+            for _attempt in range(2):
+                _reused             = self.http is not None
+                try:
+                    _http           = self.get_http()
+                    _http.request(method, path, _data, _headers)
+                    _resp           = _http.getresponse()
+                    _read           = _resp.read()
+                except self.STALE as exception:
+                    self.close()
+                    # A keep-alive connection closed by the iLO - replay once on a new connection
+                    if _reused and method in self.IDEMPOTENT and _attempt == 0:
+                        continue
+                    raise AnsibleConnectionFailure('ilo_redfish: {0} {1}: {2}'.format(method, path, exception))
+
+                if _resp.getheader('Connection', '').lower() == 'close':
+                    self.close()
+                return _resp.status, dict(_resp.getheaders()), _read.decode('utf-8', 'replace')
+
+    def get_http(self):
+        if self.http is None:
+            _port                   = self.connection.get_option('port') or 443
+            _timeout                = self.connection.get_option('persistent_command_timeout')
+            _context                = ssl.create_default_context()
+            if not self.connection.get_option('validate_certs'):
+                _context.check_hostname = False
+                _context.verify_mode    = ssl.CERT_NONE
+            self.http               = http_client.HTTPSConnection(self.get_host(), _port, timeout=_timeout, context=_context)
+        return self.http
+
+    def close(self):
+        if self.http is not None:
+            self.http.close()
+            self.http               = None
@@ -0,0 +1,228 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: ilo_redfish
+    plugin_type: inventory
+    short_description: iLO inventory source - hosts grouped by hardware
+    description:
+        - Builds one host per iLO with the ilo_system_facts summary and the ilo_manager_facts info as host variables
+        - Hosts are grouped by Model, BiosVersion, ProcessorCount and iLO firmware
+        - Results go to the Ansible inventory cache, so runs within cache_timeout do not query the iLOs again
+        - The configuration file name must end with ilo_redfish.yml or ilo_redfish.yaml
+    version_added: "1.0"
+    requirements:
+        - iLO 5
+        - python-ilorest-library
+    author:
+        - Dung K Hoang
+    extends_documentation_fragment:
+        - constructed
+        - inventory_cache
+    options:
+        plugin:
+            description: Token that ensures this is a source file for the plugin
+            required: true
+            choices: ['ilo_redfish']
+        hosts:
+            description:
+                - iLOs to query - ilo_ip strings, or dict with ilo_ip and optionally name, ilo_username and ilo_password
+                - The inventory host name is name when given, ilo_ip otherwise
+            type: list
+            required: true
+        ilo_username:
+            description: Admin account to access iLO, used for hosts without ilo_username
+            type: str
+            env:
+                - name: ILO_USERNAME
+        ilo_password:
+            description: Admin account password to access iLO, used for hosts without ilo_password
+            type: str
+            env:
+                - name: ILO_PASSWORD
+        parallelism:
+            description: Maximum number of iLOs queried at once
+            type: int
+            default: 32
+        timeout:
+            description: Seconds to wait for an iLO to connect or answer a request before the host is put in ilo_failed
+            type: int
+            default: 30
+        transport:
+            description: HTTP transport - see the transport option of the modules
+            type: str
+            default: urllib3
+            choices: ['urllib3', 'asyncio']
+        group_prefix:
+            description: Prefix of the groups built from the hardware facts
+            type: str
+            default: ilo_
+'''
+
+EXAMPLES = '''
+# inventory.ilo_redfish.yml
+plugin: ilo_redfish
+ilo_username: admin
+# ilo_password from the ILO_PASSWORD environment variable
+parallelism: 64
+hosts:
+  - 10.1.1.7
+  - ilo_ip: 10.100.1.2
+    name: rack2-node1
+cache: true
+cache_plugin: jsonfile
+cache_connection: ~/.ansible/tmp/ilo_redfish_inventory
+cache_timeout: 3600
+keyed_groups:
+  - key: ilo_system.Memory | string
+    prefix: memory_gb
+
+# Groups built: ilo_model_proliant_dl380_gen10, ilo_bios_u30_v2_42_01_23_2021, ilo_processor_count_2,
+# ilo_firmware_ilo_5_v2_44 - and ilo_failed for the iLOs that could not be queried
+'''
+
+import os
+
+import ansible.module_utils
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import to_safe_group_name
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
+from ansible.utils.display import Display
+
+# The helpers of the modules import each other as ansible.module_utils.<name>, as ANSIBLE_MODULE_UTILS
+# provides them to modules - not to controller plugins. Their directory is on ansible.module_utils.__path__
+# only for this import: every helper imports the others at load time, so later lookups of other
+# ansible.module_utils names are left as they were.
+MODULE_UTILS_DIR                = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'module_utils')
+_added                          = MODULE_UTILS_DIR not in ansible.module_utils.__path__
+if _added:
+    ansible.module_utils.__path__.append(MODULE_UTILS_DIR)
+try:
+    from ansible.module_utils.fleet import FLEET
+finally:
+    if _added:
+        ansible.module_utils.__path__.remove(MODULE_UTILS_DIR)
+
+display                         = Display()
+
+
+#-------------------------------------------------
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME                        = 'ilo_redfish'
+    FAILED_GROUP                = 'ilo_failed'
+
+    # group name suffix --> value taken from the cached host result - None when the iLO did not return it
+    GROUP_BY                    = [
+        ('model',               lambda r: (r.get('system') or {}).get('Model')),
+        ('bios',                lambda r: (r.get('system') or {}).get('BiosVersion')),
+        ('processor_count',     lambda r: (r.get('system') or {}).get('ProcessorCount')),
+        ('firmware',            lambda r: (r.get('manager') or {}).get('Firmware'))
+    ]
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('ilo_redfish.yml', 'ilo_redfish.yaml'))
+        return False
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path)
+        self._read_config_data(path)
+
+        _hosts                  = self.get_hosts()
+        _cache_key              = self.get_cache_key(path)
+        _use_cache              = self.get_option('cache') and cache
+        _update_cache           = self.get_option('cache') and not cache
+
+        _results                = None
+        if _use_cache:
+            try:
+                _results        = self._cache[_cache_key]
+            except KeyError:
+                _update_cache   = True
+
+        if _results is None:
+            _connection_args    = dict(timeout=self.get_option('timeout'), transport=self.get_option('transport'))
+            _fleet              = FLEET(_hosts, connection_args=_connection_args, parallelism=self.get_option('parallelism'))
+            if _fleet.duplicates:
+                display.warning('ilo_redfish: ilo_ip listed more than once, queried once: {0}'.format(', '.join(_fleet.duplicates)))
+            _results            = _fleet.get_inventory()
+        if _update_cache:
+            self._cache[_cache_key] = _results
+
+        self.populate(_hosts, _results)
+
+
+    # ----------------- hosts option as dict(name, ilo_ip, ilo_username, ilo_password)
+    def get_hosts(self):
+        __hosts                 = []
+        for _host in self.get_option('hosts'):
+            if not isinstance(_host, dict):
+                _host           = dict(ilo_ip=_host)
+            if 'ilo_ip' not in _host:
+                raise AnsibleParserError('ilo_redfish: ilo_ip missing in hosts entry {0}'.format(_host))
+
+            __host              = dict(
+                name            = _host.get('name') or _host['ilo_ip'],
+                ilo_ip          = _host['ilo_ip'],
+                ilo_username    = _host.get('ilo_username') or self.get_option('ilo_username'),
+                ilo_password    = _host.get('ilo_password') or self.get_option('ilo_password')
+            )
+            if __host['ilo_username'] is None or __host['ilo_password'] is None:
+                raise AnsibleParserError('ilo_redfish: ilo_username and ilo_password required for {0}'.format(__host['ilo_ip']))
+            __hosts.append(__host)
+        return __hosts
+
+
+    # ----------------- hosts, host variables and groups from the fleet results
+    def populate(self, hosts, results):
+        _prefix                 = self.get_option('group_prefix')
+        _strict                 = self.get_option('strict')
+
+        for _host in hosts:
+            _name               = _host['name']
+            _result             = results.get(_host['ilo_ip'])
+            self.inventory.add_host(_name)
+            self.inventory.set_variable(_name, 'ilo_ip', _host['ilo_ip'])
+
+            if _result is None or _result.get('failed'):
+                self.inventory.add_group(self.FAILED_GROUP)
+                self.inventory.add_child(self.FAILED_GROUP, _name)
+                self.inventory.set_variable(_name, 'ilo_msg', _result.get('msg') if _result else 'not queried')
+                continue
+
+            self.inventory.set_variable(_name, 'ilo_system', _result.get('system'))
+            self.inventory.set_variable(_name, 'ilo_manager', _result.get('manager'))
+
+            for _suffix, _get in self.GROUP_BY:
+                _value          = _get(_result)
+                if _value is None or _value == '':
+                    continue
+                _group          = to_safe_group_name('{0}{1}_{2}'.format(_prefix, _suffix, _value).lower(), force=True, silent=True)
+                _group          = '_'.join(_part for _part in _group.split('_') if _part)
+                self.inventory.add_group(_group)
+                self.inventory.add_child(_group, _name)
+
+            # compose, groups and keyed_groups of the constructed options
+            _variables          = self.inventory.get_host(_name).get_vars()
+            self._set_composite_vars(self.get_option('compose'), _variables, _name, strict=_strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), _variables, _name, strict=_strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), _variables, _name, strict=_strict)
@@ -0,0 +1,501 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: asyncClient
+short_description: asyncio transport for iLO Redfish - pooled keep-alive HTTPS connections
+description:
+    - AsyncRedfishClient            : coroutine client for one iLO - login/logout, get/post/put/patch/delete
+    - get_collection                : query a collection and return its members and member uris
+    - get_many                      : GET a list of uris concurrently over the connection pool, keeping order
+
+    - IloAsyncRedfishClient         : sync facade with the IloRedfishClient surface, handed to SYSTEMS, MANAGERS, FIRMWARE and USERS
+    - run / submit                  : run a coroutine of AsyncRedfishClient on the shared event loop
+
+    - Every facade in the process shares one event loop thread, so many iLOs and many subresources
+      are driven concurrently without a thread per request.
+    - Python 3.5 or later. The module is not imported when transport is not asyncio.
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+    - Python >= 3.5
+author:
+    - Dung K Hoang
+'''
+
+
+import asyncio
+import json
+import ssl
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit, urlencode
+except ImportError:
+    from urlparse import urlsplit
+    from urllib import urlencode
+
+from redfish.rest.v1 import ServerDownOrUnreachableError, InvalidCredentialsError
+
+from ansible.module_utils.iloClient import IloRedfishClient, RedfishResponse, project
+from ansible.module_utils.metrics import get_uri
+
+
+#-------------------------------------------------
+
+
+class AsyncRedfishClient(object):
+
+    SERVICE_ROOT                = IloRedfishClient.SERVICE_ROOT
+    EXPAND_QUERY                = IloRedfishClient.EXPAND_QUERY
+    DEFAULT_POOL                = IloRedfishClient.DEFAULT_CONCURRENCY
+    DEFAULT_TIMEOUT             = 60                    # seconds per request
+    IDEMPOTENT                  = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+    # Memo helpers are shared with the blocking client
+    get_memo_key                = IloRedfishClient.get_memo_key
+    remember                    = IloRedfishClient.remember
+    invalidate                  = IloRedfishClient.invalidate
+    get_select_args             = IloRedfishClient.get_select_args
+    get_expanded_path           = IloRedfishClient.get_expanded_path
+
+    def __init__(self, base_url, username=None, password=None, pool_size=None, timeout=None, cafile=None,
+                 session_key=None, session_location=None, ilo_ip=None, response_cache=None, metrics=None, wait_timeout=None):
+
+        if '://' not in base_url:
+            base_url                = 'https://' + base_url
+        _url                        = urlsplit(base_url)
+
+        self.host                   = _url.hostname
+        self.port                   = _url.port or 443
+        self.netloc                 = _url.netloc
+        self.username               = username
+        self.password               = password
+        self.session_key            = session_key
+        self.session_location       = session_location
+        self.root                   = None                  # service root, read at login
+        self.expand                 = None
+        self.select                 = None
+        self.wait_timeout           = wait_timeout          # read by the Waiter of SYSTEMS through the facade
+
+        self.pool_size              = pool_size or self.DEFAULT_POOL
+        self.timeout                = timeout or self.DEFAULT_TIMEOUT
+        self.ssl_context            = self.get_ssl_context(cafile)
+        self.idle                   = []                    # keep-alive connections ready for reuse
+        self.slots                  = None                  # asyncio.Semaphore - created on the running loop
+
+        self.ilo_ip                 = ilo_ip or _url.netloc
+        self.response_cache         = response_cache
+        self.metrics                = metrics
+        self.memo                   = dict()
+        self.memo_lock              = threading.Lock()
+
+
+    # ----------------- sessions
+    async def login(self):
+        self.root                   = await self.request('GET', self.SERVICE_ROOT)
+        _sessions                   = ((self.root.dict or {}).get('Links') or {}).get('Sessions') or {}
+        _login_url                  = _sessions.get('@odata.id', self.SERVICE_ROOT + 'SessionService/Sessions/')
+
+        _resp                       = await self.request('POST', _login_url, dict(UserName=self.username, Password=self.password))
+        if _resp.status not in (200, 201):
+            raise InvalidCredentialsError('Login to {0} failed for {1} - HTTP {2}'.format(self.ilo_ip, self.username, _resp.status))
+
+        self.session_key            = _resp.getheader('X-Auth-Token')
+        self.session_location       = _resp.getheader('Location')
+        if self.session_location and '://' in self.session_location:
+            self.session_location   = urlsplit(self.session_location).path
+
+    async def logout(self):
+        if self.session_location:
+            try:
+                await self.request('DELETE', self.session_location)
+            finally:
+                self.session_key    = None
+                self.session_location = None
+        await self.close()
+
+    async def close(self):
+        while self.idle:
+            _reader, _writer        = self.idle.pop()
+            _writer.close()
+
+
+    # ----------------- one HTTP/1.1 exchange over a pooled connection
+    async def request(self, method, path, body=None, headers=None, args=None):
+        if args:
+            path                    = path + ('&' if '?' in path else '?') + urlencode(args)
+
+        _headers                    = {
+            'Host'                  : self.netloc,
+            'Accept'                : 'application/json',
+            'Accept-Encoding'       : 'identity',
+            'Connection'            : 'keep-alive',
+            'OData-Version'         : '4.0'
+        }
+        if self.session_key:
+            _headers['X-Auth-Token'] = self.session_key
+
+        _data                       = b''
+        if body is not None:
+            _data                   = json.dumps(body).encode('utf-8')
+            _headers['Content-Type'] = 'application/json'
+        if body is not None or method in ('POST', 'PUT', 'PATCH'):
+            _headers['Content-Length'] = str(len(_data))
+        _headers.update(headers or {})
+
+        _message                    = '{0} {1} HTTP/1.1\r\n'.format(method, path)
+        _message                    = _message + ''.join('{0}: {1}\r\n'.format(_k, _v) for _k, _v in _headers.items()) + '\r\n'
+        _message                    = _message.encode('latin-1') + _data
+
+        _start                      = time.time()
+        _retries                    = 0
+        while True:
+            _conn, _reused          = await self.acquire()
+            try:
+                _reader, _writer    = _conn
+                _writer.write(_message)
+                await _writer.drain()
+                _status, _resp_headers, _read, _keep_alive = await asyncio.wait_for(self.read_response(_reader, method), self.timeout)
+            except (OSError, EOFError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exception:
+                self.release(_conn, False)
+                # A keep-alive connection closed by the iLO - replay once on a new connection
+                if _reused and method in self.IDEMPOTENT and _retries == 0:
+                    _retries        = _retries + 1
+                    continue
+                raise ServerDownOrUnreachableError('{0} {1}: {2}'.format(method, path, exception))
+            self.release(_conn, _keep_alive)
+            break
+
+        _resp                       = RedfishResponse(_status, _read.decode('utf-8', 'replace'), _resp_headers)
+        if self.metrics is not None:
+            _cache                  = None
+            if method == 'GET':
+                _cache              = self.metrics.CACHE_HIT if _status == 304 else self.metrics.CACHE_MISS
+            self.metrics.record(method, path, _status, time.time() - _start, len(_read), retries=_retries, cache=_cache)
+        return _resp
+
+    async def read_response(self, reader, method):
+        _line                       = await reader.readline()
+        if not _line:
+            raise EOFError('connection closed by peer')
+        _version, _status           = _line.decode('latin-1').split(None, 2)[:2]
+        _status                     = int(_status)
+
+        _headers                    = dict()
+        while True:
+            _line                   = await reader.readline()
+            if _line in (b'\r\n', b'\n', b''):
+                break
+            _key, _, _value         = _line.decode('latin-1').partition(':')
+            _headers[_key.strip()]  = _value.strip()
+        _lower                      = dict((_k.lower(), _v) for _k, _v in _headers.items())
+
+        _keep_alive                 = _version == 'HTTP/1.1' and _lower.get('connection', '').lower() != 'close'
+        if method == 'HEAD' or _status in (204, 304) or _status < 200:
+            _read                   = b''
+        elif _lower.get('transfer-encoding', '').lower() == 'chunked':
+            _chunks                 = []
+            while True:
+                _size               = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if _size == 0:
+                    await reader.readline()
+                    break
+                _chunks.append(await reader.readexactly(_size))
+                await reader.readline()
+            _read                   = b''.join(_chunks)
+        elif 'content-length' in _lower:
+            _read                   = await reader.readexactly(int(_lower['content-length']))
+        else:
+            _read                   = await reader.read()
+            _keep_alive             = False
+
+        return _status, _headers, _read, _keep_alive
+
+
+    # ----------------- connection pool - pool_size connections at most
+    async def acquire(self):
+        if self.slots is None:
+            self.slots              = asyncio.Semaphore(self.pool_size)
+        await self.slots.acquire()
+
+        while self.idle:
+            _reader, _writer        = self.idle.pop()
+            if not _reader.at_eof() and not _writer.transport.is_closing():
+                return (_reader, _writer), True
+            _writer.close()
+
+        try:
+            _conn                   = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl_context), self.timeout)
+        except (OSError, asyncio.TimeoutError) as exception:
+            self.slots.release()
+            raise ServerDownOrUnreachableError('{0}: {1}'.format(self.netloc, exception))
+        return _conn, False
+
+    def release(self, conn, keep_alive):
+        if keep_alive:
+            self.idle.append(conn)
+        else:
+            conn[1].close()
+        self.slots.release()
+
+
+    # ----------------- verbs - writes invalidate the memo as in IloRedfishClient
+    async def get(self, path, args=None, headers=None):
+        if headers is not None:
+            return await self.request('GET', path, headers=headers, args=args)
+
+        _key                        = self.get_memo_key(path, args)
+        with self.memo_lock:
+            _resp                   = self.memo.get(_key)
+        if _resp is not None:
+            if self.metrics is not None:
+                self.metrics.record('GET', get_uri(path, args), _resp.status, 0, 0, cache=self.metrics.CACHE_HIT)
+            return _resp
+
+        _resp                       = await self.get_conditional(path, args=args)
+        if _resp.status == 200:
+            with self.memo_lock:
+                self.memo[_key]     = _resp
+        return _resp
+
+    async def get_uncached(self, path, args=None, headers=None):
+        self.invalidate(path)
+        return await self.get(path, args=args, headers=headers)
+
+    async def get_conditional(self, path, args=None):
+        if self.response_cache is None:
+            return await self.request('GET', path, args=args)
+
+        _key                        = self.get_memo_key(path, args)
+        _entry                      = self.response_cache.load(self.ilo_ip, _key)
+        _headers                    = None
+        if _entry is not None:
+            _headers                = {'If-None-Match': _entry['etag']}
+
+        _resp                       = await self.request('GET', path, headers=_headers, args=args)
+        if _resp.status == 304 and _entry is not None:
+            self.response_cache.touch(self.ilo_ip, _key)
+            return RedfishResponse(200, _entry['read'], _entry['headers'])
+
+        if _resp.status == 200:
+            _etag                   = _resp.getheader('ETag') or (_resp.dict or {}).get('@odata.etag')
+            self.response_cache.store(self.ilo_ip, _key, _etag, _resp.read, _resp.getheaders())
+        return _resp
+
+    async def post(self, path, body, args=None, headers=None):
+        self.invalidate(path)
+        return await self.request('POST', path, body, headers=headers, args=args)
+
+    async def put(self, path, body, args=None, headers=None):
+        self.invalidate(path)
+        return await self.request('PUT', path, body, headers=headers, args=args)
+
+    async def patch(self, path, body, args=None, headers=None):
+        self.invalidate(path)
+        return await self.request('PATCH', path, body, headers=headers, args=args)
+
+    async def delete(self, path, headers=None):
+        self.invalidate(path)
+        return await self.request('DELETE', path, headers=headers)
+
+
+    # ----------------- collection walking
+    def expand_supported(self):
+        if self.expand is None:
+            _expand                 = self.get_features().get('ExpandQuery', {})
+            self.expand             = bool(_expand.get('NoLinks') or _expand.get('ExpandAll'))
+        return self.expand
+
+    def select_supported(self):
+        if self.select is None:
+            self.select             = bool(self.get_features().get('SelectQuery'))
+        return self.select
+
+    def get_features(self):
+        return ((self.root.dict if self.root is not None else None) or {}).get('ProtocolFeaturesSupported', {})
+
+    async def get_selected(self, uri, properties, uncached=False):
+        if uncached:
+            self.invalidate(uri)
+        _args                       = self.get_select_args(properties)
+        with self.memo_lock:
+            _loaded                 = self.get_memo_key(uri) in self.memo
+        # Projected locally when the full resource is on hand already
+        if self.select_supported() and not _loaded:
+            return await self.get(uri, args=_args)
+        return await self.get_projected(uri, properties, self.get_memo_key(uri, _args))
+
+    async def get_projected(self, path, properties, key):
+        with self.memo_lock:
+            _resp                   = self.memo.get(key) or self.memo.get(self.get_memo_key(path))
+        if _resp is None:
+            _resp                   = await self.get_conditional(path)
+        if _resp.status == 200:
+            _resp                   = RedfishResponse(200, json.dumps(project(_resp.obj, properties)))
+            with self.memo_lock:
+                self.memo[key]      = _resp
+        return _resp
+
+    async def get_expanded(self, uri, properties=None):
+        _path                       = self.get_expanded_path(uri, properties)
+        if properties and not self.select_supported():
+            return await self.get_projected(_path, properties, self.get_memo_key(_path, self.get_select_args(properties)))
+        return await self.get(_path)
+
+    async def get_members(self, collection, properties=None):
+        __members                   = []
+        __members_uris              = []
+        __pending                   = []
+
+        for __m in collection.get('Members', []):
+            __m_uri                 = __m['@odata.id']
+            __members_uris.append(__m_uri)
+            if len(__m) > 1:
+                __members.append(__m)
+                self.remember(__m_uri, __m, properties)
+            else:
+                __members.append(None)
+                __pending.append(len(__members) - 1)
+
+        __responses                 = await self.get_many([__members_uris[i] for i in __pending], properties)
+        for i, __response in zip(__pending, __responses):
+            __members[i]            = __response.obj
+
+        return __members, __members_uris
+
+    async def get_many(self, uris, properties=None):
+        # Bounded by the connection pool - no thread per request
+        if properties:
+            return await asyncio.gather(*[self.get_selected(_uri, properties) for _uri in uris])
+        return await asyncio.gather(*[self.get(_uri) for _uri in uris])
+
+    async def get_collection(self, uri, properties=None):
+        __response                  = await self.get_expanded(uri, properties)
+        return await self.get_members(__response.obj, properties)
+
+    # ----------------- helpers
+    def get_ssl_context(self, cafile=None):
+        _context                    = ssl.create_default_context(cafile=cafile)
+        if cafile is None:
+            # Same default as redfish.RedfishClient - iLO ships a self-signed certificate
+            _context.check_hostname = False
+            _context.verify_mode    = ssl.CERT_NONE
+        return _context
+
+
+class IloAsyncRedfishClient(object):
+    '''
+    Blocking facade over AsyncRedfishClient - same surface as IloRedfishClient
+    '''
+
+    # One event loop thread shared by every facade in the process
+    _loop                       = None
+    _loop_lock                  = threading.Lock()
+
+    def __init__(self, aio, session_cache=None, username=None):
+
+        self.aio                    = aio
+        self.session_cache          = session_cache
+        self.ilo_ip                 = aio.ilo_ip
+        self.username               = username or aio.username
+        self.metrics                = aio.metrics
+        self.max_concurrency        = aio.pool_size
+
+
+    @classmethod
+    def connect(cls, base_url, username, password, session_key=None, session_location=None, session_cache=None, **kwargs):
+        _aio                        = AsyncRedfishClient(base_url, username=username, password=password,
+                                                         session_key=session_key, session_location=session_location, **kwargs)
+        _client                     = cls(_aio, session_cache=session_cache, username=username)
+        if session_key is None:
+            _client.run(_aio.login())
+        else:
+            _aio.root               = _client.run(_aio.request('GET', _aio.SERVICE_ROOT))
+        return _client
+
+
+    def __getattr__(self, name):
+        return getattr(self.aio, name)
+
+
+    # ----------------- shared event loop
+    @classmethod
+    def get_loop(cls):
+        with cls._loop_lock:
+            if cls._loop is None:
+                cls._loop               = asyncio.new_event_loop()
+                _thread                 = threading.Thread(target=cls._loop.run_forever, name='ilo-redfish-asyncio')
+                _thread.daemon          = True
+                _thread.start()
+            return cls._loop
+
+    def submit(self, coroutine):
+        # concurrent.futures.Future - submit several, then wait on all of them
+        return asyncio.run_coroutine_threadsafe(coroutine, self.get_loop())
+
+    def run(self, coroutine):
+        return self.submit(coroutine).result()
+
+
+    # ----------------- IloRedfishClient surface
+    def get(self, path, args=None, headers=None):
+        return self.run(self.aio.get(path, args=args, headers=headers))
+
+    def get_uncached(self, path, args=None, headers=None):
+        return self.run(self.aio.get_uncached(path, args=args, headers=headers))
+
+    def post(self, path, body, args=None, headers=None):
+        return self.run(self.aio.post(path, body, args=args, headers=headers))
+
+    def put(self, path, body, args=None, headers=None):
+        return self.run(self.aio.put(path, body, args=args, headers=headers))
+
+    def patch(self, path, body, args=None, headers=None):
+        return self.run(self.aio.patch(path, body, args=args, headers=headers))
+
+    def delete(self, path, headers=None):
+        return self.run(self.aio.delete(path, headers=headers))
+
+    def get_expanded(self, uri, properties=None):
+        return self.run(self.aio.get_expanded(uri, properties))
+
+    def get_selected(self, uri, properties, uncached=False):
+        return self.run(self.aio.get_selected(uri, properties, uncached=uncached))
+
+    def get_members(self, collection, properties=None):
+        return self.run(self.aio.get_members(collection, properties))
+
+    def get_many(self, uris, properties=None):
+        return self.run(self.aio.get_many(uris, properties))
+
+    def get_collection(self, uri, properties=None):
+        return self.run(self.aio.get_collection(uri, properties))
+
+    def logout(self):
+        if self.session_cache is not None:
+            self.session_cache.release(self.ilo_ip, self.username)
+            self.run(self.aio.close())
+        else:
+            self.run(self.aio.logout())
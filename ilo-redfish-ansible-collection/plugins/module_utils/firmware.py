@@ -57,32 +57,41 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #from ansible.module_utils.basic import *
 #from ansible.module_utils.basic import AnsibleModule
 
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, LazyCollection
 
 
 #-------------------------------------------------
 
 
-class FIRMWARE:
+class FIRMWARE(object):
 
     MSG_MAINTENANCE_EXISTED                     = 'iLO - Maintenance Window already exists'
     MSG_MAINTENANCE_ATTRIBUTE_ERROR             = 'iLO - Error in attribute specified for maintenance window. Value is {0}'    
 
+    MAINTENANCE                                 = '/redfish/v1/UpdateService/MaintenanceWindows'
+    INVENTORY                                   = '/redfish/v1/UpdateService/FirmwareInventory'
+    REPOSITORY                                  = '/redfish/v1/UpdateService/ComponentRepository/'
+    INSTALLSET                                  = '/redfish/v1/UpdateService/InstallSets/'
+
+    # Sub collections - fetched on first access only, so each option pays for its own subtree
+    maintenance_collection                      = LazyCollection('get_sub_collection_by', 0, MAINTENANCE)
+    maintenance_collection_uris                 = LazyCollection('get_sub_collection_by', 1, MAINTENANCE)
+    inventory_collection                        = LazyCollection('get_sub_collection_by', 0, INVENTORY)
+    inventory_collection_uris                   = LazyCollection('get_sub_collection_by', 1, INVENTORY)
+    repository_collection                       = LazyCollection('get_sub_collection_by', 0, REPOSITORY)
+    repository_collection_uris                  = LazyCollection('get_sub_collection_by', 1, REPOSITORY)
+    install_set_collection                      = LazyCollection('get_sub_collection_by', 0, INSTALLSET)
+    install_set_collection_uris                 = LazyCollection('get_sub_collection_by', 1, INSTALLSET)
+
     def __init__(self, connection):
 
         self.endpoint                                                   = '/redfish/v1/UpdateService' 
-        self.maintenance                                                = '/redfish/v1/UpdateService/MaintenanceWindows'
-        self.inventory                                                  = '/redfish/v1/UpdateService/FirmwareInventory'
-        self.repository                                                 = '/redfish/v1/UpdateService/ComponentRepository/'
-        self.installset                                                 = '/redfish/v1/UpdateService/InstallSets/'
+        self.maintenance                                                = self.MAINTENANCE
+        self.inventory                                                  = self.INVENTORY
+        self.repository                                                 = self.REPOSITORY
+        self.installset                                                 = self.INSTALLSET
 
         self.connection                                                 = connection
-          
-
-        self.maintenance_collection, self.maintenance_collection_uris   = self.get_sub_collection_by(self.maintenance)
-        self.inventory_collection, self.inventory_collection_uris       = self.get_sub_collection_by(self.inventory)
-        self.repository_collection, self.repository_collection_uris     = self.get_sub_collection_by(self.repository)
-        self.install_set_collection, self.install_set_collection_uris   = self.get_sub_collection_by(self.installset)
          
 
 
@@ -128,8 +137,6 @@ class FIRMWARE:
     # ----------------- get iLO firmware inventory
 
     def get_firmware_inventory(self):
-        if self.inventory_collection is None:
-            self.inventory_collection, self.inventory_collection_uris = self.get_sub_collection_by(self.inventory)
         _inventory_list                     = []
         for _m in self.inventory_collection:
             _oem                            = _m['Oem']['Hpe']
@@ -161,13 +168,7 @@ class FIRMWARE:
         __sub_collection_uris           = []
 
         if uri is not None:
-            __resp                      = self.connection.get(uri)
-            for __sm in __resp.obj['Members']:
-                    __sm_uri            = __sm['@odata.id']
-                    __sub_collection_uris.append(__sm_uri)
-
-                    __response          = self.connection.get(__sm_uri)
-                    __sub_collection.append(__response.obj)
+            __sub_collection, __sub_collection_uris = self.connection.get_collection(uri)
         
         return __sub_collection, __sub_collection_uris
   
@@ -181,9 +182,7 @@ class FIRMWARE:
         if start_time is not None and end_time is not None:
             _start_after        = '{0}Z'.format(self.convert_time_to_iso_format(start_time))   # Add Z at thend for UTC format
             _expire             = '{0}Z'.format(self.convert_time_to_iso_format(end_time))
-        
-        if self.maintenance_collection is None:
-            self.maintenance_collection, self.maintenance_collection_uris = self.get_sub_collection_by(self.maintenance)  
+
         for _m in self.maintenance_collection:
             if id == _m['Id'] or (name == _m['Name'] and _start_after == _m['StartAfter'] and _expire == _m['Expire']):
                 _this        = _m
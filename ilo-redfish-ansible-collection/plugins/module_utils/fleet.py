@@ -0,0 +1,290 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: fleet
+short_description: Common routines and class for ilo_fleet_facts - many iLOs from one module run
+description:
+    - get_system_info               : SYSTEMS.get_system_info of every host, at most parallelism hosts at once
+    - get_unique_hosts              : hosts without repeated ilo_ip - the first entry is kept, the ilo_ip of the
+                                      others are in duplicates for the caller to warn about
+    - get_inventory                 : SYSTEMS.get_system_info and MANAGERS.get_manager_info of every host - for the ilo_redfish inventory
+    - get_host_info                 : login, SYSTEMS.get_system_info and logout for one host - failures are returned, not raised
+    - get_host_inventory            : login, system and manager info and logout for one host
+    - rotate_password               : PATCH the password of one account on every host, at most parallelism hosts at once
+                                      and at most rate hosts started per second - hosts in the checkpoint file are skipped
+    - rotate_host                   : login, USERS lookup and PATCH, logout, then verify the new password for one host
+    - verify                        : one GET with Basic authentication - checks a credential without opening a session
+
+    - Checkpoint                    : hosts done, kept in a JSON file rewritten after every host so an interrupted
+                                      rotation resumes where it stopped. Entries hold a digest of the new password, never
+                                      the password, and only skip hosts when rotating to the same password
+    - RateLimit                     : space the starts of the hosts by 1 / rate seconds
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+try:
+    from ansible.module_utils._text import to_native
+except ImportError:
+    to_native = str
+
+from redfish import RedfishClient
+
+from ansible.module_utils.iloRedfish import RedFishModule, set_metrics
+from ansible.module_utils.systems import SYSTEMS
+from ansible.module_utils.managers import MANAGERS
+from ansible.module_utils.users import USERS
+
+
+#-------------------------------------------------
+
+
+class FLEET(object):
+
+    DEFAULT_PARALLELISM         = 32                    # hosts queried at once
+    VERIFY_URI                  = '/redfish/v1/AccountService/Accounts/'   # small and needs authentication
+
+    def __init__(self, hosts, connection_args=None, parallelism=None):
+
+        self.hosts, self.duplicates = self.get_unique_hosts(hosts)   # list of dict(ilo_ip, ilo_username, ilo_password)
+        self.connection_args        = connection_args or dict()
+        self.parallelism            = parallelism or self.DEFAULT_PARALLELISM
+
+
+    # ----------------- results are keyed by ilo_ip - one query per iLO, whatever the number of entries
+    @staticmethod
+    def get_unique_hosts(hosts):
+        __hosts                     = []
+        __duplicates                = []
+        _seen                       = set()
+        for _host in hosts:
+            if _host['ilo_ip'] in _seen:
+                if _host['ilo_ip'] not in __duplicates:
+                    __duplicates.append(_host['ilo_ip'])
+                continue
+            _seen.add(_host['ilo_ip'])
+            __hosts.append(_host)
+        return __hosts, __duplicates
+
+    # ----------------- get system info of every host - keyed by ilo_ip
+    def get_system_info(self):
+        return self.get_all(self.get_host_info)
+
+    # ----------------- get system and manager info of every host - keyed by ilo_ip
+    def get_inventory(self):
+        return self.get_all(self.get_host_inventory)
+
+    # ----------------- run get_host on every host, at most parallelism at once
+    def get_all(self, get_host):
+        __results                   = []
+
+        if ThreadPoolExecutor is None or self.parallelism <= 1 or len(self.hosts) <= 1:
+            __results               = [get_host(_host) for _host in self.hosts]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.parallelism, len(self.hosts))) as _executor:
+                __results           = list(_executor.map(get_host, self.hosts))
+
+        __systems                   = dict()
+        for _host, _result in zip(self.hosts, __results):
+            __systems[_host['ilo_ip']] = _result
+        return __systems
+
+
+    # ----------------- one host - login, get_system_info, logout
+    def get_host_info(self, host):
+        return self.run_host(host, lambda _connection: dict(system=SYSTEMS(_connection).get_system_info()))
+
+    # ----------------- one host - login, get_system_info and get_manager_info, logout
+    def get_host_inventory(self, host):
+        return self.run_host(host, lambda _connection: dict(system=SYSTEMS(_connection).get_system_info(),
+                                                             manager=MANAGERS(_connection).get_manager_info()))
+
+    # ----------------- rotate the password of username on every host - keyed by ilo_ip
+    def rotate_password(self, username, password, checkpoint=None, rate=None, check_mode=False):
+        _checkpoint                 = Checkpoint(checkpoint, username, password) if checkpoint else None
+        _limit                      = RateLimit(rate)
+        return self.get_all(lambda _host: self.rotate_host(_host, username, password, _checkpoint, _limit, check_mode))
+
+    # ----------------- one host - skip when in the checkpoint, PATCH the password, verify it
+    def rotate_host(self, host, username, password, checkpoint=None, limit=None, check_mode=False):
+        if checkpoint is not None and checkpoint.is_done(host['ilo_ip']):
+            return dict(failed=False, changed=False, skipped=True, msg='done in checkpoint')
+        if check_mode:
+            return dict(failed=False, changed=True)
+
+        if limit is not None:
+            limit.wait()
+        _result                     = self.run_host(host, lambda _connection: self.set_password(_connection, username, password))
+
+        if not _result['failed']:
+            _result['changed']      = True
+            _result['verified']     = self.verify(host['ilo_ip'], username, password)
+            if not _result['verified']:
+                _result.update(failed=True, msg='{0}: new password not accepted after PATCH'.format(username))
+        elif host['ilo_username'] == username and self.verify(host['ilo_ip'], username, password):
+            # Login with the old password failed but the new one is accepted - rotated by a run stopped before its checkpoint
+            _result                 = dict(failed=False, changed=False, verified=True, elapsed=_result['elapsed'])
+
+        if checkpoint is not None and not _result['failed']:
+            checkpoint.set_done(host['ilo_ip'])
+        return _result
+
+    # ----------------- PATCH the password of an existing account
+    def set_password(self, connection, username, password):
+        _users                      = USERS(connection)
+        _this, _this_uri            = _users.get_by(type='UserName', name=username)
+        if _this is None:
+            raise ValueError(USERS.MSG_NOT_EXISTED.format(username))
+
+        _change                     = _users.apply(dict(username=username, action='patch', uri=_this_uri, body=dict(Password=password)))
+        if not _change['status']:
+            raise ValueError('{0}: {1}'.format(username, _change['msg']))
+        return dict()
+
+    # ----------------- one authenticated GET with the new credential - no session is opened
+    def verify(self, ilo_ip, username, password):
+        _client_args                = dict()
+        if self.connection_args.get('timeout'):
+            _client_args            = dict(timeout=self.connection_args['timeout'], retries=1)
+
+        _auth                       = base64.b64encode('{0}:{1}'.format(username, password).encode('utf-8')).decode('ascii')
+        try:
+            _client                 = RedfishClient(base_url='https://' + ilo_ip, **_client_args)
+            _resp                   = _client.get(self.VERIFY_URI, headers={'Authorization': 'Basic ' + _auth})
+        except Exception:
+            return False
+        return _resp.status == 200
+
+
+    # ----------------- login, collect(connection) and logout - failures are returned in the result
+    def run_host(self, host, collect):
+        _start                      = time.time()
+        _connection                 = None
+
+        _module_args                = dict(self.connection_args)
+        _module_args.update(host)
+        try:
+            _connection             = RedFishModule(module_args=_module_args).redfish_client
+            _result                 = dict(failed=False)
+            # Plain dict and list - RisObject values of the responses are not accepted by the inventory
+            _result.update(json.loads(json.dumps(collect(_connection))))
+        except Exception as exception:
+            # One unreachable or misconfigured iLO must not fail the whole fleet
+            # Some python-ilorest errors, e.g. RetriesExhaustedError, come without message
+            _msg                    = to_native(exception)
+            _result                 = dict(failed=True, msg='{0}: {1}'.format(type(exception).__name__, _msg) if _msg else type(exception).__name__)
+
+        if _connection is not None:
+            try:
+                _connection.logout()
+            except Exception:
+                pass
+            set_metrics(_result, _connection)
+
+        _result['elapsed']          = round(time.time() - _start, 3)
+        return _result
+
+
+#-------------------------------------------------
+
+
+class Checkpoint(object):
+
+    def __init__(self, path, username, password):
+
+        self.path                   = os.path.expanduser(path)
+        self.username               = username
+        self.password               = password
+        self.lock                   = threading.Lock()
+        self.hosts                  = self.read()           # ilo_ip --> dict(username, digest, done)
+
+
+    # ----------------- done with the same account and password
+    def is_done(self, ilo_ip):
+        _entry                      = self.hosts.get(ilo_ip) or dict()
+        return _entry.get('digest') == self.get_digest(ilo_ip)
+
+    def set_done(self, ilo_ip):
+        with self.lock:
+            self.hosts[ilo_ip]      = dict(username=self.username, digest=self.get_digest(ilo_ip), done=time.time())
+            self.write()
+
+    def get_digest(self, ilo_ip):
+        _key                        = '{0}|{1}|{2}'.format(ilo_ip, self.username, self.password).encode('utf-8')
+        return hashlib.sha256(_key).hexdigest()
+
+
+    # ----------------- file helpers - written to a temporary file then renamed, never left half written
+    def read(self):
+        try:
+            with open(self.path, 'r') as _f:
+                return json.load(_f).get('hosts', dict())
+        except (IOError, OSError, ValueError):
+            return dict()
+
+    def write(self):
+        _dir                        = os.path.dirname(self.path)
+        if _dir and not os.path.isdir(_dir):
+            os.makedirs(_dir, 0o700)
+        _tmp                        = '{0}.{1}.tmp'.format(self.path, os.getpid())
+        _fd                         = os.open(_tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(_fd, 'w') as _f:
+            json.dump(dict(hosts=self.hosts), _f, indent=1, sort_keys=True)
+        os.rename(_tmp, self.path)
+
+
+class RateLimit(object):
+
+    def __init__(self, rate=None):
+
+        self.interval               = 1.0 / rate if rate else 0
+        self.next                   = 0
+        self.lock                   = threading.Lock()
+
+
+    # ----------------- block until the next start slot
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            _now                    = time.time()
+            _start                  = max(_now, self.next)
+            self.next               = _start + self.interval
+        if _start > _now:
+            time.sleep(_start - _now)
@@ -0,0 +1,93 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: httpapiClient
+short_description: Redfish client over the ilo_redfish httpapi persistent connection
+description:
+    - HttpApiRedfishClient          : get/post/put/patch/delete with the RedfishClient surface, sent through
+                                      Connection(module._socket_path) to the ilo_redfish httpapi plugin
+    - login / logout                : no-op - the session belongs to the persistent connection and outlives the module
+    - get_host                      : iLO address of the persistent connection, used as ilo_ip
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+    - ansible.netcommon
+author:
+    - Dung K Hoang
+'''
+
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from ansible.module_utils.connection import Connection
+
+from ansible.module_utils.iloClient import RedfishResponse
+
+
+#-------------------------------------------------
+
+
+class HttpApiRedfishClient(object):
+
+    def __init__(self, socket_path):
+
+        self.connection             = Connection(socket_path)
+        self.session_key            = None                  # held by the persistent connection
+        self.session_location       = None
+
+
+    # ----------------- session is owned by the persistent connection
+    def login(self):
+        pass
+
+    def logout(self):
+        pass
+
+    def get_host(self):
+        return self.connection.get_option('host')
+
+
+    # ----------------- verbs
+    def get(self, path, args=None, headers=None):
+        return self.send('GET', path, args=args, headers=headers)
+
+    def post(self, path, body, args=None, headers=None):
+        return self.send('POST', path, body, args=args, headers=headers)
+
+    def put(self, path, body, args=None, headers=None):
+        return self.send('PUT', path, body, args=args, headers=headers)
+
+    def patch(self, path, body, args=None, headers=None):
+        return self.send('PATCH', path, body, args=args, headers=headers)
+
+    def delete(self, path, headers=None):
+        return self.send('DELETE', path, headers=headers)
+
+    def send(self, method, path, body=None, args=None, headers=None):
+        if args:
+            path                    = path + ('&' if '?' in path else '?') + urlencode(args)
+        _resp                       = self.connection.send_request(body, path=path, method=method, headers=headers)
+        return RedfishResponse(_resp['status'], _resp['read'], _resp['headers'])
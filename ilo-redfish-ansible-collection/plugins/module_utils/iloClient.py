@@ -0,0 +1,419 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: iloClient
+short_description: Connection wrapper handed to SYSTEMS, MANAGERS, FIRMWARE and USERS
+description:
+    - Exposes the same get/post/put/patch/delete/logout calls as redfish.RedfishClient
+    - logout                        : keep the session open when it is owned by the session cache
+    - get_collection                : query a collection and return its members and member uris
+    - get_expanded                  : GET a collection with $expand=. when the service supports it
+    - get_members                   : return members of a collection, fetching those not expanded inline
+    - get_many                      : GET a list of uris in parallel, keeping order
+    - get_bounded                   : every request on the wire goes through it - at most max_concurrency in flight
+                                      per iLO in the process, the smallest cap asked for by its clients
+    - get                           : GET memoized per connection - the same uri is fetched once per module run
+    - get_uncached                  : GET bypassing the memo, for polling loops
+    - get_conditional               : GET with If-None-Match against the on-disk response cache, body reused on 304
+    - post/put/patch/delete         : writes invalidate the memoized target uri, its parents and children
+    - expand_supported              : check ProtocolFeaturesSupported in the service root
+    - select_supported / get_selected : GET only some properties with $select when the service supports it
+    - get_projected                 : GET in full and keep only some properties, for services without $select
+    - project                       : keep the @odata annotations and the given property paths of a resource,
+                                      or of each inline member of a collection
+
+    - get_collection, get_expanded, get_members and get_many take optional properties: members are then
+      fetched with $select, or trimmed on arrival, and memoized apart from the full resources.
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+
+import json
+import threading
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+from ansible.module_utils.metrics import get_uri
+
+
+#-------------------------------------------------
+
+
+class RedfishResponse(object):
+    '''
+    Response built from data already on hand - same read/dict/obj/status/getheader surface as RestResponse
+    '''
+
+    def __init__(self, status, read, headers=None):
+        self.status                 = status
+        self.read                   = read
+        self.headers                = headers or dict()
+
+    @property
+    def dict(self):
+        try:
+            return json.loads(self.read)
+        except (ValueError, TypeError):
+            return None
+
+    @property
+    def obj(self):
+        return self.dict
+
+    def getheader(self, name):
+        for _key, _value in self.headers.items():
+            if _key.lower() == name.lower():
+                return _value
+        return None
+
+    def getheaders(self):
+        return self.headers
+
+
+#-------------------------------------------------
+
+
+def project(obj, properties):
+    '''
+    Keep @odata annotations and the property paths of obj - nested paths use '/', e.g. Oem/Hpe/Bios
+    A collection is projected member by member
+    '''
+    if not isinstance(obj, dict):
+        return obj
+    if 'Members' in obj:
+        __projected                 = dict(obj)
+        __projected['Members']      = [project(_m, properties) if len(_m) > 1 else _m for _m in obj['Members']]
+        return __projected
+
+    __projected                     = dict((_k, _v) for _k, _v in obj.items() if _k.startswith('@odata.'))
+    for _path in properties:
+        _src                        = obj
+        _dst                        = __projected
+        _parts                      = _path.split('/')
+        for _part in _parts[:-1]:
+            _src                    = _src.get(_part) if isinstance(_src, dict) else None
+            if not isinstance(_src, dict):
+                break
+            _dst                    = _dst.setdefault(_part, dict())
+        else:
+            if _parts[-1] in _src:
+                _dst[_parts[-1]]    = _src[_parts[-1]]
+    return __projected
+
+
+class IloRedfishClient:
+
+    SERVICE_ROOT                = '/redfish/v1/'
+    EXPAND_QUERY                = '$expand=.'
+    DEFAULT_CONCURRENCY         = 4                     # Parallel GETs per iLO
+
+    # One limit per iLO, shared by every client in the process
+    _limits                     = dict()
+    _limits_lock                = threading.Lock()
+
+    def __init__(self, client, session_cache=None, ilo_ip=None, username=None, max_concurrency=None, response_cache=None, metrics=None,
+                 wait_timeout=None):
+
+        self.redfish_client         = client
+        self.session_cache          = session_cache
+        self.ilo_ip                 = ilo_ip
+        self.username               = username
+
+        self.expand                 = None                  # Detected on first collection walk
+        self.select                 = None                  # Detected on first $select GET
+        self.wait_timeout           = wait_timeout          # Deadline of the waits for POST, None for the Waiter default
+        self.max_concurrency        = max_concurrency or self.DEFAULT_CONCURRENCY
+        self.limit                  = self.get_limit(ilo_ip, self.max_concurrency)
+
+        self.response_cache         = response_cache        # Optional on-disk ETag cache
+        self.metrics                = metrics               # Optional per-request metrics
+        self.memo                   = dict()                # uri --> response, for this module run
+        self.memo_lock              = threading.Lock()
+
+
+    def __getattr__(self, name):
+        return getattr(self.redfish_client, name)
+
+
+    # ----------------- memoized GET
+    def get(self, path, args=None, headers=None):
+        if headers is not None:
+            return self.get_bounded(path, args=args, headers=headers)
+
+        _key                        = self.get_memo_key(path, args)
+        with self.memo_lock:
+            _resp                   = self.memo.get(_key)
+        if _resp is not None and self.metrics is not None:
+            self.metrics.record('GET', get_uri(path, args), _resp.status, 0, 0, cache=self.metrics.CACHE_HIT)
+        if _resp is None:
+            _resp                   = self.get_conditional(path, args=args)
+            # Errors such as ResourceNotReadyRetry must be re-queried, never memoized
+            if _resp.status == 200:
+                with self.memo_lock:
+                    self.memo[_key] = _resp
+        return _resp
+
+    def get_uncached(self, path, args=None, headers=None):
+        self.invalidate(path)
+        return self.get(path, args=args, headers=headers)
+
+
+    # ----------------- conditional GET against the on-disk response cache
+    def get_conditional(self, path, args=None):
+        if self.response_cache is None:
+            return self.get_bounded(path, args=args)
+
+        _key                        = self.get_memo_key(path, args)
+        _entry                      = self.response_cache.load(self.ilo_ip, _key)
+        _headers                    = None
+        if _entry is not None:
+            _headers                = {'If-None-Match': _entry['etag']}
+
+        _resp                       = self.get_bounded(path, args=args, headers=_headers)
+        if _resp.status == 304 and _entry is not None:
+            self.response_cache.touch(self.ilo_ip, _key)
+            return RedfishResponse(200, _entry['read'], _entry['headers'])
+
+        if _resp.status == 200:
+            _etag                   = _resp.getheader('ETag')
+            if not _etag:
+                _etag               = (_resp.dict or {}).get('@odata.etag')
+            self.response_cache.store(self.ilo_ip, _key, _etag, _resp.read, _resp.getheaders())
+        return _resp
+
+
+    # ----------------- writes invalidate what they may have changed
+    def post(self, path, body, args=None, headers=None):
+        self.invalidate(path)
+        with self.limit:
+            return self.redfish_client.post(path, body, args=args, headers=headers)
+
+    def put(self, path, body, args=None, headers=None):
+        self.invalidate(path)
+        with self.limit:
+            return self.redfish_client.put(path, body, args=args, headers=headers)
+
+    def patch(self, path, body, args=None, headers=None):
+        self.invalidate(path)
+        with self.limit:
+            return self.redfish_client.patch(path, body, args=args, headers=headers)
+
+    def delete(self, path, headers=None):
+        self.invalidate(path)
+        with self.limit:
+            return self.redfish_client.delete(path, headers=headers)
+
+
+    # ----------------- memo helpers
+    def get_memo_key(self, path, args=None):
+        _key                        = path.rstrip('/')
+        if args:
+            _key                    = _key + '?' + '&'.join('{0}={1}'.format(k, args[k]) for k in sorted(args))
+        return _key
+
+    def remember(self, path, obj, properties=None):
+        # Seed the memo with a member returned inline by $expand - a projected member never stands for the full one
+        _resp                       = RedfishResponse(200, json.dumps(obj))
+        _args                       = self.get_select_args(properties) if properties else None
+        with self.memo_lock:
+            self.memo[self.get_memo_key(path, _args)] = _resp
+
+    def invalidate(self, path):
+        # Drop the uri itself, its parents (collections, settings owner) and its children
+        _base                       = self.get_memo_key(path.split('?')[0])
+        if '/Actions/' in _base:
+            _base                   = _base.split('/Actions/')[0]
+        with self.memo_lock:
+            for _key in list(self.memo):
+                _uri                = _key.split('?')[0]
+                if _uri.startswith(_base) or _base.startswith(_uri):
+                    del self.memo[_key]
+
+
+    # ----------------- logout or hand the session back to the cache
+    def logout(self):
+        if self.session_cache is not None:
+            self.session_cache.release(self.ilo_ip, self.username)
+        else:
+            self.redfish_client.logout()
+
+
+    # ----------------- check $expand and $select support in service root
+    def expand_supported(self):
+        if self.expand is None:
+            _expand                 = self.get_features().get('ExpandQuery', {})
+            # $expand=. requires either NoLinks or ExpandAll
+            self.expand             = bool(_expand.get('NoLinks') or _expand.get('ExpandAll'))
+        return self.expand
+
+    def select_supported(self):
+        if self.select is None:
+            self.select             = bool(self.get_features().get('SelectQuery'))
+        return self.select
+
+    def get_features(self):
+        _root                       = getattr(self.redfish_client, 'root', None)
+        if _root is None:
+            _root                   = self.get(self.SERVICE_ROOT)
+        return (_root.dict or {}).get('ProtocolFeaturesSupported', {})
+
+
+    # ----------------- GET only some properties - nested paths use '/', e.g. Oem/Hpe/PostState
+    def get_selected(self, uri, properties, uncached=False):
+        if uncached:
+            self.invalidate(uri)
+        _args                       = self.get_select_args(properties)
+        with self.memo_lock:
+            _loaded                 = self.get_memo_key(uri) in self.memo
+        # Projected locally when the full resource is on hand already
+        if self.select_supported() and not _loaded:
+            return self.get(uri, args=_args)
+        return self.get_projected(uri, properties, self.get_memo_key(uri, _args))
+
+    # ----------------- GET in full, keep only properties in the memo under key
+    def get_projected(self, path, properties, key):
+        with self.memo_lock:
+            _resp                   = self.memo.get(key) or self.memo.get(self.get_memo_key(path))
+        if _resp is None:
+            _resp                   = self.get_conditional(path)
+        if _resp.status == 200:
+            _resp                   = RedfishResponse(200, json.dumps(project(_resp.obj, properties)))
+            with self.memo_lock:
+                self.memo[key]      = _resp
+        return _resp
+
+    def get_select_args(self, properties):
+        return {'$select': ','.join(properties)}
+
+
+    # ----------------- GET collection with members inline when possible - only properties of the members if given
+    def get_expanded(self, uri, properties=None):
+        _path                       = self.get_expanded_path(uri, properties)
+        if properties and not self.select_supported():
+            return self.get_projected(_path, properties, self.get_memo_key(_path, self.get_select_args(properties)))
+        return self.get(_path)
+
+    def get_expanded_path(self, uri, properties=None):
+        _query                      = []
+        if self.expand_supported():
+            _query.append(self.EXPAND_QUERY)
+        if properties and self.select_supported():
+            # Built in the uri - python-ilorest appends args after a second '?'
+            _query.append('$select=' + ','.join(properties))
+        if not _query:
+            return uri
+        return uri + ('&' if '?' in uri else '?') + '&'.join(_query)
+
+
+    # ----------------- get members of a collection
+    def get_members(self, collection, properties=None):
+        __members                   = []
+        __members_uris              = []
+        __pending                   = []                    # index of members not expanded inline
+
+        for __m in collection.get('Members', []):
+            __m_uri                 = __m['@odata.id']
+            __members_uris.append(__m_uri)
+
+            # Only @odata.id present --> member was not expanded inline
+            if len(__m) > 1:
+                __members.append(__m)
+                self.remember(__m_uri, __m, properties)
+            else:
+                __members.append(None)
+                __pending.append(len(__members) - 1)
+
+        __responses                 = self.get_many([__members_uris[i] for i in __pending], properties)
+        for i, __response in zip(__pending, __responses):
+            __members[i]            = __response.obj
+
+        return __members, __members_uris
+
+
+    # ----------------- GET many uris in parallel - responses in the same order as uris
+    def get_many(self, uris, properties=None):
+        _get                        = lambda _uri: self.get_selected(_uri, properties) if properties else self.get(_uri)
+        if ThreadPoolExecutor is None or self.max_concurrency <= 1 or len(uris) <= 1:
+            return [_get(_uri) for _uri in uris]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(uris))) as _executor:
+            return list(_executor.map(_get, uris))
+
+
+    # ----------------- one GET on the wire within the per-iLO concurrency limit
+    def get_bounded(self, path, args=None, headers=None):
+        with self.limit:
+            return self.redfish_client.get(path, args=args, headers=headers)
+
+
+    # ----------------- per-iLO limit - a client asking for a smaller cap lowers it for all
+    @classmethod
+    def get_limit(cls, ilo_ip, max_concurrency):
+        with cls._limits_lock:
+            if ilo_ip not in cls._limits:
+                cls._limits[ilo_ip]     = ConcurrencyLimit(max_concurrency)
+            cls._limits[ilo_ip].shrink(max_concurrency)
+            return cls._limits[ilo_ip]
+
+
+    # ----------------- get collection members and uris
+    def get_collection(self, uri, properties=None):
+        __response                  = self.get_expanded(uri, properties)
+        return self.get_members(__response.obj, properties)
+
+
+#-------------------------------------------------
+
+
+class ConcurrencyLimit(object):
+    '''
+    Semaphore whose size can be lowered while in use - at most size holders at once
+    '''
+
+    def __init__(self, size):
+        self.size                   = size
+        self.inflight               = 0
+        self.condition              = threading.Condition()
+
+    def shrink(self, size):
+        with self.condition:
+            self.size               = min(self.size, size)
+
+    def __enter__(self):
+        with self.condition:
+            while self.inflight >= self.size:
+                self.condition.wait()
+            self.inflight           = self.inflight + 1
+        return self
+
+    def __exit__(self, *args):
+        with self.condition:
+            self.inflight           = self.inflight - 1
+            self.condition.notify()
@@ -36,7 +36,23 @@ except ImportError:
 
 
 from redfish import RedfishClient
-from redfish.rest.v1 import ServerDownOrUnreachableError
+from redfish.rest.v1 import ServerDownOrUnreachableError, InvalidCredentialsError
+try:
+    from redfish.rest.connections import RetriesExhaustedError
+except ImportError:
+    from redfish.rest.v1 import RetriesExhaustedError
+
+from ansible.module_utils.iloClient import IloRedfishClient
+from ansible.module_utils.sessions import SessionCache
+from ansible.module_utils.responseCache import ResponseCache
+from ansible.module_utils.metrics import RedfishMetrics, MeteredClient
+from ansible.module_utils.httpapiClient import HttpApiRedfishClient
+
+# asyncio transport - Python 3.5 or later
+try:
+    from ansible.module_utils.asyncClient import IloAsyncRedfishClient
+except (ImportError, SyntaxError):
+    IloAsyncRedfishClient = None
 
 #Instantiating module class        
 from ansible.module_utils.basic import *
@@ -57,6 +73,83 @@ TASKS                     ='/redfish/v1/TaskService'
 TELEMETRYSERVICE          ='/redfish/v1/TelemetryService'  
 UPDATESERVICE             ='/redfish/v1/UpdateService'  
 
+# Connection options shared by every ilo_* module - merged into each module argument_spec
+REDFISH_CONNECTION_ARGS   = dict(
+        session_cache       = dict(type="bool", required=False, default=False),
+        session_cache_dir   = dict(type="path", required=False, default=None),
+        session_cache_ttl   = dict(type="int",  required=False, default=SessionCache.DEFAULT_TTL),
+        max_concurrency     = dict(type="int",  required=False, default=IloRedfishClient.DEFAULT_CONCURRENCY),
+        response_cache      = dict(type="bool", required=False, default=False),
+        response_cache_dir  = dict(type="path", required=False, default=None),
+        response_cache_size = dict(type="int",  required=False, default=ResponseCache.DEFAULT_SIZE),
+        redfish_metrics     = dict(type="bool", required=False, default=False),
+        transport           = dict(type="str",  required=False, default='urllib3', choices=['urllib3', 'asyncio']),
+        wait_timeout        = dict(type="int",  required=False, default=None)
+)
+
+# Result options shared by every ilo_* module - how the payload is returned
+REDFISH_RESULT_ARGS       = dict(
+        result_format       = dict(type="str",  required=False, default='json', choices=['json', 'native']),
+        compact             = dict(type="bool", required=False, default=False),
+        set_facts           = dict(type="bool", required=False, default=False)
+)
+
+def set_result(result, key, payload, params, fact_name=None):
+    """
+    Puts the module payload in the result.
+
+    The payload is returned under key as indented JSON text (the default), as JSON text without
+    whitespace with compact, or as data with result_format native. With set_facts and fact_name given,
+    it is returned as data under ansible_facts[fact_name] instead, to be kept by the fact cache.
+
+    :arg dict result: module result, updated in place
+    :arg str key: result key of the payload, e.g. system
+    :arg payload: dict or list built by the helper classes
+    :arg dict params: AnsibleModule params
+    :arg str fact_name: name of the fact for set_facts - None for modules that do not return facts
+    :return: dict: result
+    """
+    if fact_name is not None and params.get('set_facts'):
+        result['ansible_facts'] = {fact_name: payload}
+    elif params.get('result_format') == 'native':
+        result[key] = payload
+    elif params.get('compact'):
+        result[key] = json.dumps(payload, separators=(',', ':'))
+    else:
+        result[key] = json.dumps(payload, indent=4)
+    return result
+
+def set_metrics(result, connection):
+    """
+    Puts the redfish_metrics summary of the connection in the result, when metrics are collected.
+
+    :arg dict result: module result, updated in place
+    :arg connection: client returned by RedFishModule
+    :return: dict: result
+    """
+    if connection.metrics is not None:
+        result['redfish_metrics'] = connection.metrics.summary()
+    return result
+
+def get_connection_args(params, module=None):
+    """
+    Extracts the shared connection options from the module parameters.
+
+    With the module given, also returns socket_path of the ilo_redfish httpapi persistent connection
+    and fails the module when it runs without one and ilo_ip, ilo_username or ilo_password is missing.
+
+    :arg dict params: AnsibleModule params
+    :arg AnsibleModule module: module being run
+    :return: dict: connection options, keyed as in REDFISH_CONNECTION_ARGS
+    """
+    _args = dict((_key, params.get(_key)) for _key in REDFISH_CONNECTION_ARGS)
+    if module is not None:
+        _args['socket_path'] = getattr(module, '_socket_path', None)
+        _missing = [_key for _key in ('ilo_ip', 'ilo_username', 'ilo_password') if params.get(_key) is None]
+        if _args['socket_path'] is None and _missing:
+            module.fail_json(msg='missing required arguments: {0} - only optional with connection httpapi'.format(', '.join(_missing)))
+    return _args
+
 def transform_list_to_dict(list_):
     """
     Transforms a list into a dictionary, putting values as keys.
@@ -139,6 +232,41 @@ def _standardize_value(value):
     return str(value)
 
 
+class LazyCollection(object):
+    """
+    Class attribute that loads a (collection, uris) pair on first access and memoizes it per instance.
+
+    Both halves of the pair share one load, so declaring the collection and its uris costs a single walk.
+
+    :arg str loader: name of the method returning (collection, uris)
+    :arg int index: 0 for the collection, 1 for the uris
+    :arg args: arguments passed to the loader
+    """
+
+    def __init__(self, loader, index, *args):
+        self.loader = loader
+        self.index = index
+        self.args = args
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        loaded = obj.__dict__.setdefault('_loaded_collections', dict())
+        key = (self.loader,) + self.args
+        if key not in loaded:
+            loaded[key] = getattr(obj, self.loader)(*self.args)
+
+        return loaded[key][self.index]
+
+    @staticmethod
+    def get_loaded(obj, loader, *args):
+        """
+        Returns the (collection, uris) pair of loader(*args) if already loaded on obj, None otherwise.
+        """
+        return obj.__dict__.get('_loaded_collections', dict()).get((loader,) + args)
+
+
 class RedFishModuleException(Exception):
     """
     RedFish base Exception.
@@ -185,36 +313,112 @@ class RedFishModule:
 
         
 
-    def __init__(self, module_args):
+    MSG_CONNECTION_FAILED       = 'Cannot connect to iLO {0}: {1}'
+
+    def __init__(self, module_args, module=None):
         """
        module init function
 
+       With module, an iLO that cannot be reached or rejects the credentials fails the module
+       instead of raising
         """
-        self.redfish_client         = self.create_redfish_client(module_args)
+        try:
+            self.redfish_client     = self.create_redfish_client(module_args)
+        except (RedFishModuleException, InvalidCredentialsError, ServerDownOrUnreachableError, RetriesExhaustedError) as exception:
+            if module is None:
+                raise
+            # RetriesExhaustedError comes without message
+            module.fail_json(msg=self.MSG_CONNECTION_FAILED.format(module_args.get('ilo_ip'), to_native(exception) or type(exception).__name__))
 
 
     def create_redfish_client(self, module_args):
 
+        # Persistent connection - the session and keep-alive socket belong to the ilo_redfish httpapi plugin
+        if module_args.get('socket_path'):
+            return self.create_httpapi_client(module_args)
 
         SYSTEM_URL          = "https://" + module_args['ilo_ip']
         LOGIN_ACCOUNT       = module_args['ilo_username']  
         LOGIN_PASSWORD      = module_args['ilo_password'] 
 
+        _session_cache      = None
+        _response_cache     = None
+        _metrics            = None
+        _asyncio            = module_args.get('transport') == 'asyncio'
+
+        # Optional per-request timeout in seconds - python-ilorest otherwise waits 4800s and retries 50 times
+        _client_args        = dict()
+        if module_args.get('timeout'):
+            _client_args    = dict(timeout=module_args['timeout'], retries=1)
+
+        if _asyncio and IloAsyncRedfishClient is None:
+            raise RedFishModuleException('transport asyncio requires Python 3.5 or later')
+
+        # Record every request made on behalf of the module if requested - session create and delete included
+        if module_args.get('redfish_metrics'):
+            _metrics                = RedfishMetrics()
+
         try:
-            # Create a Redfish client object
-            redfish_client = RedfishClient(base_url=SYSTEM_URL, username=LOGIN_ACCOUNT, password=LOGIN_PASSWORD)
-            redfish_client.login()
+            # Create a Redfish client object - reuse a cached session if requested
+            if module_args.get('session_cache'):
+                _session_cache      = SessionCache(cache_dir=module_args.get('session_cache_dir'), ttl=module_args.get('session_cache_ttl'), metrics=_metrics)
+                redfish_client, _   = _session_cache.acquire(SYSTEM_URL, module_args['ilo_ip'], LOGIN_ACCOUNT, LOGIN_PASSWORD, **_client_args)
+            elif not _asyncio:
+                redfish_client = RedfishClient(base_url=SYSTEM_URL, username=LOGIN_ACCOUNT, password=LOGIN_PASSWORD, **_client_args)
+                (MeteredClient(redfish_client, _metrics) if _metrics is not None else redfish_client).login()
+                # python-ilorest returns without a session when iLO answers NoValidSession
+                if not redfish_client.session_key:
+                    raise InvalidCredentialsError('Login to {0} failed for {1}'.format(module_args['ilo_ip'], LOGIN_ACCOUNT))
+                # Session path kept as is - python-ilorest mangles it when iLO is not on port 443, and logout misses
+                SessionCache.set_location(redfish_client, redfish_client.session_location)
+
+            # Conditional GETs against an on-disk ETag cache if requested
+            if module_args.get('response_cache'):
+                _response_cache     = ResponseCache(cache_dir=module_args.get('response_cache_dir'), max_size=module_args.get('response_cache_size'))
+
+            # asyncio transport - pooled keep-alive connections, the cached session token is handed over
+            if _asyncio:
+                _session_key        = redfish_client.session_key if _session_cache is not None else None
+                _session_location   = redfish_client.session_location if _session_cache is not None else None
+                return IloAsyncRedfishClient.connect(SYSTEM_URL, LOGIN_ACCOUNT, LOGIN_PASSWORD, session_key=_session_key, session_location=_session_location,
+                                                     session_cache=_session_cache, ilo_ip=module_args['ilo_ip'], pool_size=module_args.get('max_concurrency'),
+                                                     timeout=module_args.get('timeout'), response_cache=_response_cache, metrics=_metrics,
+                                                     wait_timeout=module_args.get('wait_timeout'))
+
+            if _metrics is not None:
+                redfish_client      = MeteredClient(redfish_client, _metrics)
 
 
         except ServerDownOrUnreachableError as exception:
             error_msg       = '; '.join(to_native(e) for e in exception.args)
-            self.module.fail_json(msg=error_msg, exception=traceback.format_exc())
+            raise RedFishModuleException(error_msg)
+
+        return IloRedfishClient(redfish_client, session_cache=_session_cache, ilo_ip=module_args['ilo_ip'], username=LOGIN_ACCOUNT,
+                                max_concurrency=module_args.get('max_concurrency'), response_cache=_response_cache, metrics=_metrics,
+                                wait_timeout=module_args.get('wait_timeout'))
+
+    def create_httpapi_client(self, module_args):
+
+        _response_cache     = None
+        _metrics            = None
+
+        redfish_client      = HttpApiRedfishClient(module_args['socket_path'])
+        _ilo_ip             = module_args.get('ilo_ip') or redfish_client.get_host()
+
+        if module_args.get('response_cache'):
+            _response_cache = ResponseCache(cache_dir=module_args.get('response_cache_dir'), max_size=module_args.get('response_cache_size'))
+
+        if module_args.get('redfish_metrics'):
+            _metrics        = RedfishMetrics()
+            redfish_client  = MeteredClient(redfish_client, _metrics)
 
-        return redfish_client
+        return IloRedfishClient(redfish_client, ilo_ip=_ilo_ip, username=module_args.get('ilo_username'),
+                                max_concurrency=module_args.get('max_concurrency'), response_cache=_response_cache, metrics=_metrics,
+                                wait_timeout=module_args.get('wait_timeout'))
 
     def get(self, endpoint):
         '''
             return object 
         '''            
-        response            = self.redfish_client(endpoint)
+        response            = self.redfish_client.get(endpoint)
         return response.obj
\ No newline at end of file
@@ -25,6 +25,7 @@ short_description: Common routines and class for ilo_managers and ilo_manager_fa
 description:
     - get_all                       : query iLO to get collection of system resources
     - get_manager_info              : ilo Information
+    - get_all_selected              : managers with only the given properties, unless already loaded in full
     - get_interface_info            : get IPv4, IPv6, host name
     - get_firmware_info             : get firmware
     - set_ipv4_interface            : set IPv4
@@ -59,55 +60,64 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #from ansible.module_utils.basic import *
 #from ansible.module_utils.basic import AnsibleModule
 
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, LazyCollection
 
 
 #-------------------------------------------------
 
 
-class MANAGERS:
+class MANAGERS(object):
 
     MSG_MAINTENANCE_EXISTED                     = 'iLO - Maintenance Window already exists'
     MSG_MAINTENANCE_ATTRIBUTE_ERROR             = 'iLO - Error in attribute specified for maintenance window. Value is {0}'    
 
+    MAINTENANCE                                 = '/redfish/v1/UpdateService/MaintenanceWindows'
+
+    # Properties read by get_manager_info - fetched with $select, or trimmed, unless the collection is loaded in full
+    MANAGER_INFO_PROPERTIES                     = ['FirmwareVersion', 'Model', 'Oem/Hpe/License', 'Oem/Hpe/iLOSelfTestResults', 'Oem/Hpe/Links']
+
+    # All members of /redfish/v1/Managers - fetched on first access only
+    collection                                  = LazyCollection('get_all', 0)
+    collection_uris                             = LazyCollection('get_all', 1)
+
+    # Sub collections - fetched on first access only
+    maintenance_collection                      = LazyCollection('get_sub_collection_by', 0, MAINTENANCE)
+    maintenance_collection_uris                 = LazyCollection('get_sub_collection_by', 1, MAINTENANCE)
+
     def __init__(self, connection):
 
         self.endpoint                                                   = '/redfish/v1/Managers' 
         self.updateservice                                              = '/redfish/v1/UpdateService'
-        self.maintenance                                                = '/redfish/v1/UpdateService/MaintenanceWindows'
+        self.maintenance                                                = self.MAINTENANCE
 
         self.connection                                                 = connection
           
         self.main_interface                                             = None                  # Main network interface
-        self.collection,self.collection_uris                            = self.get_all()                  # All members of self.endpoint
-        self.maintenance_collection, self.maintenance_collection_uris   = self.get_sub_collection_by(self.maintenance)
          
 
 
     
     # ----------------- get all members uri    
-    def get_all(self):
+    def get_all(self, properties=None):
         __collection                = []
         __collection_uris           = []
 
-        __response                  = self.connection.get(self.endpoint)
-
-
-
-        for __uri in __response.obj['Members']:
-            __collection_uris.append(__uri['@odata.id'])
-            __acc                   = self.connection.get(__uri['@odata.id'])
-            __collection.append(__acc.obj) 
+        # Members are returned inline with $expand when supported
+        __collection, __collection_uris = self.connection.get_collection(self.endpoint, properties)
 
         return __collection, __collection_uris
 
+    # ----------------- members with only properties - the full collection when already loaded
+    def get_all_selected(self, properties):
+        _loaded                     = LazyCollection.get_loaded(self, 'get_all')
+        if _loaded is not None:
+            return _loaded[0]
+        return self.get_all(properties)[0]
+
     # ----------------- get iLO iformation
 
     def get_manager_info(self):
-        if self.collection is None:
-            self.collection,self.collection_uris = self.get_all()
-    
-        for _m in self.collection:
+        for _m in self.get_all_selected(self.MANAGER_INFO_PROPERTIES):
             _oem                        = _m['Oem']['Hpe']
             _ilo_info                   = dict(
                 Firmware                = _m['FirmwareVersion'],
@@ -254,13 +264,7 @@ class MANAGERS:
         __sub_collection_uris           = []
 
         if uri is not None:
-            __resp                      = self.connection.get(uri)
-            for __sm in __resp.obj['Members']:
-                    __sm_uri            = __sm['@odata.id']
-                    __sub_collection_uris.append(__sm_uri)
-
-                    __response          = self.connection.get(__sm_uri)
-                    __sub_collection.append(__response.obj)
+            __sub_collection, __sub_collection_uris = self.connection.get_collection(uri)
         
         return __sub_collection, __sub_collection_uris
   
@@ -0,0 +1,179 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: metrics
+short_description: Per-request instrumentation of the Redfish calls made by a module
+description:
+    - RedfishMetrics                : collect method, uri, status, latency, size, retries and cache outcome per request
+    - MeteredClient                 : wrapper around redfish.RedfishClient recording every HTTP call into RedfishMetrics,
+                                      with its query string, and the session create and delete of login and logout
+    - get_uri                       : uri of a request as sent, with args as query string
+
+    - The summary is returned by the modules under the redfish_metrics key when redfish_metrics is true
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+
+import threading
+import time
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+
+#-------------------------------------------------
+
+
+def get_uri(path, args=None):
+    if not args:
+        return path
+    return path + ('&' if '?' in path else '?') + urlencode(args)
+
+
+class RedfishMetrics:
+
+    CACHE_HIT                   = 'hit'
+    CACHE_MISS                  = 'miss'
+
+    def __init__(self):
+
+        self.requests               = []
+        self.lock                   = threading.Lock()
+        self.started                = time.time()
+
+
+    # ----------------- record one request - size is the number of bytes received from the iLO
+    def record(self, method, uri, status, elapsed, size, retries=0, cache=None):
+        _request                    = dict(
+            method                  = method,
+            uri                     = uri,
+            status                  = status,
+            latency_ms              = round(elapsed * 1000, 1),
+            size                    = size,
+            retries                 = retries,
+            cache                   = cache
+        )
+        with self.lock:
+            self.requests.append(_request)
+
+
+    # ----------------- requests and totals
+    def summary(self):
+        with self.lock:
+            _requests               = list(self.requests)
+
+        _by_method                  = dict()
+        for _r in _requests:
+            _by_method[_r['method']] = _by_method.get(_r['method'], 0) + 1
+
+        # Memo hits never reach the iLO - 304 revalidations do
+        _memo                       = [_r for _r in _requests if _r['cache'] == self.CACHE_HIT and _r['status'] != 304]
+        _totals                     = dict(
+            requests                = len(_requests),
+            http_requests           = len(_requests) - len(_memo),
+            by_method               = _by_method,
+            bytes                   = sum(_r['size'] for _r in _requests),
+            latency_ms              = round(sum(_r['latency_ms'] for _r in _requests), 1),
+            retries                 = sum(_r['retries'] for _r in _requests),
+            cache_hits              = len([_r for _r in _requests if _r['cache'] == self.CACHE_HIT]),
+            cache_misses            = len([_r for _r in _requests if _r['cache'] == self.CACHE_MISS]),
+            wall_time_ms            = round((time.time() - self.started) * 1000, 1)
+        )
+
+        return dict(requests=_requests, totals=_totals)
+
+
+class MeteredClient:
+
+    def __init__(self, client, metrics):
+
+        self.redfish_client         = client
+        self.metrics                = metrics
+
+
+    def __getattr__(self, name):
+        return getattr(self.redfish_client, name)
+
+
+    def get(self, path, args=None, headers=None):
+        return self.call('GET', path, self.redfish_client.get, path, args=args, headers=headers)
+
+    def post(self, path, body, args=None, headers=None):
+        return self.call('POST', path, self.redfish_client.post, path, body, args=args, headers=headers)
+
+    def put(self, path, body, args=None, headers=None):
+        return self.call('PUT', path, self.redfish_client.put, path, body, args=args, headers=headers)
+
+    def patch(self, path, body, args=None, headers=None):
+        return self.call('PATCH', path, self.redfish_client.patch, path, body, args=args, headers=headers)
+
+    def delete(self, path, headers=None):
+        return self.call('DELETE', path, self.redfish_client.delete, path, headers=headers)
+
+
+    # ----------------- session create - the service root GET made by login is timed with it
+    def login(self, *args, **kwargs):
+        _start                      = time.time()
+        try:
+            self.redfish_client.login(*args, **kwargs)
+        finally:
+            _status                 = getattr(self.redfish_client, 'login_return_code', None)
+            _read                   = getattr(self.redfish_client, 'login_response', None)
+            if _status is not None:
+                self.metrics.record('POST', self.redfish_client.login_url, _status, time.time() - _start, len(_read or ''))
+
+    # ----------------- session delete - sent through this wrapper to be recorded
+    def logout(self):
+        _location                   = self.redfish_client.session_location
+        if _location:
+            self.delete(_location)
+        self.redfish_client.session_key         = None
+        self.redfish_client.session_location    = None
+
+
+    # ----------------- time the call and record it
+    def call(self, method, path, function, *args, **kwargs):
+        _start                      = time.time()
+        _resp                       = function(*args, **kwargs)
+        _elapsed                    = time.time() - _start
+
+        _read                       = _resp.read
+        _size                       = len(_read) if _read else 0
+
+        # urllib3 keeps the retry history on the raw response
+        _retries                    = getattr(getattr(_resp, '_http_response', None), 'retries', None)
+        _retries                    = len(_retries.history) if _retries is not None and _retries.history else 0
+
+        _cache                      = None
+        if method == 'GET':
+            _cache                  = RedfishMetrics.CACHE_HIT if _resp.status == 304 else RedfishMetrics.CACHE_MISS
+
+        # $select / $expand are passed in args
+        self.metrics.record(method, get_uri(path, kwargs.get('args')), _resp.status, _elapsed, _size, retries=_retries, cache=_cache)
+        return _resp
@@ -0,0 +1,183 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: responseCache
+short_description: On-disk ETag cache of iLO Redfish GET responses
+description:
+    - load                          : return the cached etag and body for (ilo_ip, uri)
+    - store                         : save a response body with its etag
+    - touch                         : mark an entry as recently used after a 304 Not Modified
+    - evict                         : when a store takes the cache over max_size, recount the entries on disk and
+                                      remove least recently used ones until it is back under the low water mark
+
+    - Entries are stored one file per (ilo_ip, uri). The file modification time is the LRU clock.
+    - The size on disk is kept in the size file, updated by every store, so opening the cache reads one
+      file instead of listing the directory. Only a missing size file or an eviction walks the entries.
+    - max_size is the budget of the whole cache directory, shared by every iLO that uses it.
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+#-------------------------------------------------
+
+
+class ResponseCache:
+
+    DEFAULT_DIR                 = '~/.ansible/tmp/ilo_redfish_responses'
+    DEFAULT_SIZE                = 64                    # MB
+    LOW_WATER                   = 0.9                   # evict down to this fraction of max_size
+    SIZE_FILE                   = 'size'                # bytes of the entries on disk, shared by the module runs
+
+    def __init__(self, cache_dir=None, max_size=None):
+
+        self.cache_dir              = os.path.expanduser(cache_dir or self.DEFAULT_DIR)
+        self.max_size               = (max_size if max_size is not None else self.DEFAULT_SIZE) * 1024 * 1024
+        self.size                   = 0                     # bytes on disk, as last read or written in the size file
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, 0o700)
+        if self.update_size(0) is None:
+            # No size file yet - count the entries once
+            self.evict()
+
+
+    # ----------------- get cached entry
+    def load(self, ilo_ip, uri):
+        try:
+            with open(self.get_path(ilo_ip, uri), 'r') as _f:
+                return json.load(_f)
+        except (IOError, OSError, ValueError):
+            return None
+
+
+    # ----------------- save entry
+    def store(self, ilo_ip, uri, etag, read, headers=None):
+        if not etag or read is None:
+            return
+
+        _path                       = self.get_path(ilo_ip, uri)
+        try:
+            _replaced               = os.path.getsize(_path)
+        except OSError:
+            _replaced               = 0
+        _entry                      = dict(
+            uri                     = uri,
+            etag                    = etag,
+            read                    = read,
+            headers                 = dict(headers or {})
+        )
+        # Write aside then rename - readers in other forks never see a partial entry
+        _fd, _tmp                   = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(_fd, 'w') as _f:
+            json.dump(_entry, _f)
+            _written                = _f.tell()
+        os.rename(_tmp, _path)
+
+        # The directory is only walked when this write takes the cache over max_size
+        if self.update_size(_written - _replaced) is None or self.size > self.max_size:
+            self.evict()
+
+
+    # ----------------- mark entry as recently used
+    def touch(self, ilo_ip, uri):
+        try:
+            os.utime(self.get_path(ilo_ip, uri), None)
+        except OSError:
+            pass
+
+
+    # ----------------- drop least recently used entries, then write the recounted size
+    def evict(self):
+        _entries                    = []
+        _total                      = 0
+        for _name in os.listdir(self.cache_dir):
+            if not _name.endswith('.json'):
+                continue
+            _path                   = os.path.join(self.cache_dir, _name)
+            try:
+                _stat               = os.stat(_path)
+            except OSError:
+                continue
+            _entries.append((_stat.st_mtime, _stat.st_size, _path))
+            _total                  = _total + _stat.st_size
+
+        if _total > self.max_size:
+            _entries.sort()
+            for _mtime, _size, _path in _entries:
+                if _total <= self.max_size * self.LOW_WATER:
+                    break
+                try:
+                    os.remove(_path)
+                except OSError:
+                    pass
+                _total              = _total - _size
+
+        self.update_size(_total, absolute=True)
+
+
+    # ----------------- add delta to the size file - or set it with absolute - and return the new size
+    def update_size(self, value, absolute=False):
+        # Returns None when there is no size file to add to
+        _path                       = os.path.join(self.cache_dir, self.SIZE_FILE)
+        try:
+            _fd                     = os.open(_path, os.O_RDWR | (os.O_CREAT if absolute else 0), 0o600)
+        except OSError:
+            return None
+        try:
+            if fcntl is not None:
+                fcntl.flock(_fd, fcntl.LOCK_EX)
+            _size                   = value
+            if not absolute:
+                try:
+                    _size           = int(os.read(_fd, 32) or 0) + value
+                except ValueError:
+                    _size           = value
+            if value or absolute:
+                os.lseek(_fd, 0, os.SEEK_SET)
+                os.ftruncate(_fd, 0)
+                os.write(_fd, str(max(_size, 0)).encode('ascii'))
+        finally:
+            os.close(_fd)
+        self.size                   = max(_size, 0)
+        return self.size
+
+
+    # ----------------- helpers
+    def get_path(self, ilo_ip, uri):
+        _key                        = '{0}|{1}'.format(ilo_ip, uri.rstrip('/')).encode('utf-8')
+        return os.path.join(self.cache_dir, hashlib.sha256(_key).hexdigest() + '.json')
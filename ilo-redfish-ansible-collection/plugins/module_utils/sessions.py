@@ -0,0 +1,308 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: sessions
+short_description: On-disk cache of iLO Redfish sessions shared across module runs
+description:
+    - acquire                       : return a logged-in RedfishClient, reusing a cached X-Auth-Token when valid
+    - release                       : refresh the expiry of a cached session at the end of a module run - a session
+                                      replaced in the cache meanwhile is logged out instead
+    - evict                         : remove expired entries and keep the cache under MAX_ENTRIES, logging out
+                                      their sessions so they do not hold iLO session slots until the idle timeout
+
+    - Entries are stored one file per (ilo_ip, username) and guarded by an exclusive file lock,
+      so parallel forks against the same iLO wait for a single login instead of each opening a session.
+    - A module holds a shared lock on the .use file of its entry from acquire to release. Sessions of entries
+      shared-locked are never logged out by evict or by a login replacing them, however long the module runs.
+    - Lock files are removed with their entry - a lock taken on a file removed meanwhile is taken again.
+    - With metrics, the logins and the logouts of the cache are recorded with the requests of the module.
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+
+import hashlib
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from redfish import RedfishClient
+from redfish.rest.v1 import InvalidCredentialsError
+
+from ansible.module_utils.metrics import MeteredClient
+
+
+#-------------------------------------------------
+
+
+class SessionCache:
+
+    DEFAULT_DIR                 = '~/.ansible/tmp/ilo_redfish_sessions'
+    DEFAULT_TTL                 = 600                   # seconds - iLO default idle timeout is 30 minutes
+    MAX_ENTRIES                 = 512
+
+    def __init__(self, cache_dir=None, ttl=None, metrics=None):
+
+        self.cache_dir              = os.path.expanduser(cache_dir or self.DEFAULT_DIR)
+        self.ttl                    = ttl if ttl is not None else self.DEFAULT_TTL
+        self.held                   = dict()                # entry path --> [dict(fd, entry, client_args)] of this process
+        self.metrics                = metrics               # Optional RedfishMetrics of the module
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, 0o700)
+
+
+    # ----------------- return a logged-in client, reusing a cached session when possible
+    def acquire(self, base_url, ilo_ip, username, password, **client_args):
+
+        _path                       = self.get_path(ilo_ip, username)
+        _digest                     = self.get_digest(ilo_ip, username, password)
+        _client                     = None
+        _reused                     = False
+
+        _lock                       = self.lock(_path)
+        try:
+            _entry                  = self.read(_path)
+            if _entry is not None and _entry.get('digest') == _digest and _entry.get('expires', 0) > time.time():
+                _client             = RedfishClient(base_url=base_url, **client_args)
+                _client.session_key         = _entry['token']
+                self.set_location(_client, _entry['location'])
+                if self.validate(_client, _entry['location']):
+                    _reused         = True
+                else:
+                    _client         = None
+
+            if _client is None:
+                # Expired, rejected or for another password - the session replaced is logged out unless still in use
+                if _entry is not None:
+                    self.retire(_path, _entry, **client_args)
+                _client             = RedfishClient(base_url=base_url, username=username, password=password, **client_args)
+                self.metered(_client).login()
+                # python-ilorest returns without a session when iLO answers NoValidSession
+                if not _client.session_key:
+                    raise InvalidCredentialsError('Login to {0} failed for {1}'.format(ilo_ip, username))
+                self.set_location(_client, _client.session_location)
+
+            _now                    = time.time()
+            _entry                  = dict(
+                base_url            = base_url,
+                ilo_ip              = ilo_ip,
+                username            = username,
+                digest              = _digest,
+                token               = _client.session_key,
+                location            = _client.session_location,
+                created             = _entry['created'] if _reused else _now,
+                expires             = _now + self.ttl
+            )
+            self.write(_path, _entry)
+
+            # Shared until release - taken under the entry lock, which evict and retire also take first
+            _use                    = self.lock(_path, shared=True, suffix='.use')
+            self.held.setdefault(_path, []).append(dict(fd=_use, entry=_entry, client_args=client_args))
+        finally:
+            self.unlock(_lock)
+
+        self.evict(**client_args)
+
+        return _client, _reused
+
+
+    # ----------------- refresh expiry of a cached session, or log it out when no longer the cached one
+    def release(self, ilo_ip, username):
+
+        _path                       = self.get_path(ilo_ip, username)
+        _held                       = (self.held.get(_path) or [None]).pop(0)
+        _lock                       = self.lock(_path)
+        try:
+            _entry                  = self.read(_path)
+            if _held is None or (_entry is not None and _entry.get('token') == _held['entry']['token']):
+                if _entry is not None:
+                    _entry['expires'] = time.time() + self.ttl
+                    self.write(_path, _entry)
+            else:
+                # Replaced by another login while this module ran - nobody else knows the session
+                self.logout(_held['entry'], **_held['client_args'])
+        finally:
+            if _held is not None:
+                self.unlock(_held['fd'])
+            self.unlock(_lock)
+
+
+    # ----------------- log out the session of an entry about to be replaced - called with the entry lock held
+    def retire(self, path, entry, **client_args):
+        _use                        = self.lock(path, blocking=False, suffix='.use')
+        if _use is None:
+            return                                          # in use - its module logs it out at release
+        try:
+            self.logout(entry, **client_args)
+        finally:
+            self.unlock(_use)
+
+
+    # ----------------- remove expired entries and bound the cache size - their sessions are logged out
+    def evict(self, **client_args):
+
+        _now                        = time.time()
+        _entries                    = []
+        _evicted                    = []
+        for _name in os.listdir(self.cache_dir):
+            if not _name.endswith('.json'):
+                continue
+            _path                   = os.path.join(self.cache_dir, _name)
+            _entry                  = self.read(_path)
+            if _entry is None or _entry.get('expires', 0) <= _now:
+                _evicted.append(_path)
+            else:
+                _entries.append((_entry['expires'], _path))
+
+        # Oldest entries go first when the cache grows beyond MAX_ENTRIES
+        _entries.sort()
+        _evicted.extend(_path for _expires, _path in _entries[:max(0, len(_entries) - self.MAX_ENTRIES)])
+
+        for _path in _evicted:
+            # An entry locked by another fork, or shared-locked by a running module, is in use - left to a later eviction
+            _lock                   = self.lock(_path, blocking=False)
+            if _lock is None:
+                continue
+            _use                    = self.lock(_path, blocking=False, suffix='.use')
+            try:
+                if _use is not None:
+                    self.logout(self.read(_path), **client_args)
+                    self.remove_entry(_path)
+            finally:
+                if _use is not None:
+                    self.unlock(_use)
+                self.unlock(_lock)
+
+    # ----------------- DELETE the session of an entry with its own token - failures are ignored
+    def logout(self, entry, **client_args):
+        if not entry or not entry.get('token') or not entry.get('location'):
+            return
+        try:
+            _client                 = RedfishClient(base_url=entry.get('base_url') or 'https://' + entry['ilo_ip'], **client_args)
+            _client.session_key     = entry['token']
+            self.set_location(_client, entry['location'])
+            self.metered(_client).logout()
+        except Exception:
+            pass
+
+
+    # ----------------- client recording its requests when the module collects metrics
+    def metered(self, client):
+        return MeteredClient(client, self.metrics) if self.metrics is not None else client
+
+
+    # ----------------- cheap check that a cached token is still accepted
+    def validate(self, client, location):
+        if not location:
+            return False
+        try:
+            _resp                   = client.get(location)
+        except Exception:
+            return False
+        return _resp.status == 200
+
+
+    # ----------------- helpers
+    @staticmethod
+    def set_location(client, location):
+        # The session_location setter of python-ilorest rewrites the host and drops it when iLO is not on port 443 -
+        # the path alone is kept, and is all GET and DELETE need
+        client._session_location    = urlsplit(location).path if location else location
+
+    def get_path(self, ilo_ip, username):
+        _key                        = '{0}|{1}'.format(ilo_ip, username).encode('utf-8')
+        return os.path.join(self.cache_dir, hashlib.sha256(_key).hexdigest() + '.json')
+
+    def get_digest(self, ilo_ip, username, password):
+        # Never reuse a session for a caller presenting different credentials
+        _key                        = '{0}|{1}|{2}'.format(ilo_ip, username, password).encode('utf-8')
+        return hashlib.sha256(_key).hexdigest()
+
+    def read(self, path):
+        try:
+            with open(path, 'r') as _f:
+                return json.load(_f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def write(self, path, entry):
+        _tmp                        = '{0}.{1}.tmp'.format(path, os.getpid())
+        _fd                         = os.open(_tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(_fd, 'w') as _f:
+            json.dump(entry, _f)
+        os.rename(_tmp, path)
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # ----------------- entry and its lock files - called with both locks held
+    def remove_entry(self, path):
+        self.remove(path)
+        self.remove(path + '.use')
+        self.remove(path + '.lock')
+
+    # ----------------- exclusive or shared lock - None when blocking is False and the lock is held elsewhere
+    def lock(self, path, blocking=True, shared=False, suffix='.lock'):
+        while True:
+            _fd                     = os.open(path + suffix, os.O_RDWR | os.O_CREAT, 0o600)
+            if fcntl is None:
+                return _fd
+            _mode                   = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(_fd, _mode if blocking else _mode | fcntl.LOCK_NB)
+            except (IOError, OSError):
+                os.close(_fd)
+                if blocking:
+                    raise
+                return None
+
+            # The lock file was removed with its entry while we waited - lock the new one
+            try:
+                if os.fstat(_fd).st_ino == os.stat(path + suffix).st_ino:
+                    return _fd
+            except OSError:
+                pass
+            fcntl.flock(_fd, fcntl.LOCK_UN)
+            os.close(_fd)
+
+    def unlock(self, fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -28,6 +28,22 @@ description:
     - get_processor_info            : Get details on CPU
     - get_memory_info               : Get details on memory
     - get_storage_info              : Get details on LocalStorage and SmartStorage
+    - get_storage_facts             : get_storage_info as dict(local_storage, smart_array, host_bus_adapter)
+    - get_smart_array               : every Smart Array or Host Bus Adapter controller keyed by location, their physical and
+                                      logical drives fetched concurrently
+    - get_ethernet_info             : Get details on EthernetInterfaces
+    - get_gather_subset             : gather_subset values with 'all' and '!' exclusions resolved
+    - gather                        : facts of several subsets, from one pass planned by plan
+    - plan                          : fetch the systems and sub collections the subsets read, once and concurrently
+    - get_all_selected              : systems with only the given properties, unless already loaded in full
+    - get_sub_collection_selected   : sub collection of the given systems with only the given properties
+    - poweron_and_wait_post         : power on a server that is Off and wait for POST
+    - wait_post                     : poll PostState / DeviceDiscovery with $select, backing off until POST completes or wait_timeout
+    - apply_logical_drives          : create and delete several logical drives with one SmartStorageConfig settings PUT,
+                                      so at most one reboot
+    - erase_physical_drives         : erase several physical drives with one PhysicalDriveErase action and one reboot
+    - wait_erase                    : one poll loop for all erased drives, returning complete, failed and pending bays -
+                                      drives are read once POST is seen to start and complete, within one deadline
 
 version_added: "1.0"
 requirements:
@@ -43,7 +59,11 @@ author:
 import collections
 import sys
 import json
-import time
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
 
 from redfish import RedfishClient
 from redfish.rest.v1 import ServerDownOrUnreachableError
@@ -54,40 +74,99 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #from ansible.module_utils.basic import *
 #from ansible.module_utils.basic import AnsibleModule
 
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, LazyCollection
+from ansible.module_utils.wait import Waiter, WaitTimeoutError, is_not_ready
 
 
 #-------------------------------------------------
 
 
-class SYSTEMS:
+class SYSTEMS(object):
 
-    MSG_PHYSICAL_DRIVE_IN_USE           = 'Physical Drives already in logical drives'
+    MSG_PHYSICAL_DRIVE_IN_USE           = 'Physical Drives already in logical drives: {0}'
     MSG_PHYSICAL_DRIVE_NOT_EXISTED      = 'Drive in the list {0} does not exist in the controller'    
     MSG_LOGICAL_DISK_NOT_SPECIFIED      = 'Raid not specified or list of drives empty'
     MSG_LOGICAL_DISK_NOT_FOUND          = 'Logical disk not found'
+    MSG_LOGICAL_DISK_NAME_CONFLICT      = 'Logical drive {0} exists with {1} on {2} - delete it first to change its drives or raid'
+    MSG_ERASE_NOT_SPECIFIED             = 'List of drives to erase empty'
+    MSG_ERASE_PATTERN_INVALID           = 'Erase pattern {0} not in {1}'
+    MSG_ERASE_NOT_COMPLETE              = 'Erase failed on {0}, not complete on {1}'
+
+    POST_PROPERTIES                     = ['Oem/Hpe/PostState', 'Oem/Hpe/DeviceDiscoveryComplete']
+    POST_DONE_STATES                    = ('InPostDiscoveryComplete', 'FinishedPost')
+
+    # Properties read by the fact builders - fetched with $select, or trimmed, unless the collection is loaded in full
+    SYSTEM_INFO_PROPERTIES              = ['Model', 'SerialNumber', 'SKU', 'MemorySummary/TotalSystemMemoryGiB', 'ProcessorSummary/Model',
+                                           'ProcessorSummary/Count', 'Oem/Hpe/Bios/Current', 'Processors', 'EthernetInterfaces']
+    SYSTEM_INFO_PROCESSOR_PROPERTIES    = ['Oem/Hpe/CoresEnabled']
+    SYSTEM_INFO_ETHERNET_PROPERTIES     = ['MACAddress']
+    PROCESSOR_PROPERTIES                = ['Id', 'Model', 'Status/Health', 'TotalCores', 'TotalThreads', 'Oem/Hpe/RatedSpeedMHz', 'Oem/Hpe/Cache']
+    MEMORY_PROPERTIES                   = ['DeviceLocator', 'CapacityMiB', 'Oem/Hpe/DIMMStatus', 'Oem/Hpe/BaseModuleType']
+    ETHERNET_PROPERTIES                 = ['Id', 'Name', 'MACAddress', 'LinkStatus', 'SpeedMbps', 'IPv4Addresses', 'IPv6Addresses', 'Status/Health']
+    PHYSICAL_DRIVE_PROPERTIES           = ['Location', 'Status/Health', 'SerialNumber', 'CapacityMiB', 'FirmwareVersion/Current/VersionString',
+                                           'DiskDriveUse', 'EncryptedDrive']
+    LOCAL_DRIVE_PROPERTIES              = ['MediaType', 'Model', 'SerialNumber', 'Location', 'CapacityBytes', 'Oem/Hpe/DriveStatus',
+                                           'Oem/Hpe/TemperatureStatus', 'Oem/Hpe/WearStatus']
+    LOGICAL_DRIVE_PROPERTIES            = ['LogicalDriveNumber', 'Raid', 'Status/Health', 'CapacityMiB', 'Links/DataDrives']
+    ERASE_PROPERTIES                    = ['Location', 'DiskDriveStatusReasons']
+
+    # ErasePattern of PhysicalDriveErase - the first one is the default
+    ERASE_PATTERNS                      = ['SanitizeRestrictedBlockErase', 'SanitizeUnrestrictedBlockErase', 'SanitizeRestrictedOverwrite',
+                                           'SanitizeUnrestrictedOverwrite', 'SanitizeRestrictedCryptoScramble',
+                                           'SanitizeUnrestrictedCryptoScramble', 'OnePass', 'TwoPass', 'ThreePass']
+
+    # gather_subset --> (systems properties, [(sub collection, member properties)]) its builder reads
+    # None for the full systems - Storage and Network read PowerState and may power on the server
+    GATHER_SUBSETS                      = collections.OrderedDict([
+        ('summary',     (SYSTEM_INFO_PROPERTIES,    [('Processors', SYSTEM_INFO_PROCESSOR_PROPERTIES),
+                                                     ('EthernetInterfaces', SYSTEM_INFO_ETHERNET_PROPERTIES)])),
+        ('processors',  (['Processors'],            [('Processors', PROCESSOR_PROPERTIES)])),
+        ('memory',      (['Memory'],                [('Memory', MEMORY_PROPERTIES)])),
+        ('storage',     (None,                      [])),
+        ('network',     (None,                      [])),
+        ('ethernet',    (['EthernetInterfaces'],    [('EthernetInterfaces', ETHERNET_PROPERTIES)]))
+    ])
+    GATHER_BUILDERS                     = dict(
+        summary                         = 'get_system_info',
+        processors                      = 'get_processor_info',
+        memory                          = 'get_memory_info',
+        storage                         = 'get_storage_facts',
+        network                         = 'get_network_adapter_info',
+        ethernet                        = 'get_ethernet_info'
+    )
+
+    # All members of /redfish/v1/Systems - fetched on first access only
+    collection                          = LazyCollection('get_all', 0)
+    collection_uris                     = LazyCollection('get_all', 1)
+
+    # Sub collections - fetched on first access only, so each option pays for its own subtree
+    processor_collection                = LazyCollection('get_sub_collection_per', 0, 'Processors')
+    processor_collection_uris           = LazyCollection('get_sub_collection_per', 1, 'Processors')
+    memory_collection                   = LazyCollection('get_sub_collection_per', 0, 'Memory')
+    memory_collection_uris              = LazyCollection('get_sub_collection_per', 1, 'Memory')
+    ethernet_collection                 = LazyCollection('get_sub_collection_per', 0, 'EthernetInterfaces')
+    ethernet_collection_uris            = LazyCollection('get_sub_collection_per', 1, 'EthernetInterfaces')
+
+    # Local Storage and Network Adapters - may power on the server and wait for POST
+    storage_collection                  = LazyCollection('get_sub_collection_per', 0, 'Storage')
+    storage_collection_uris             = LazyCollection('get_sub_collection_per', 1, 'Storage')
+    network_adapter_collection          = LazyCollection('get_sub_collection_per', 0, 'NetworkAdapters')
+    network_adapter_collection_uris     = LazyCollection('get_sub_collection_per', 1, 'NetworkAdapters')
+
+    # Smart Storage
+    array_controller                    = LazyCollection('get_smart_storage_controllers', 0, 'ArrayControllers')
+    array_controller_uris               = LazyCollection('get_smart_storage_controllers', 1, 'ArrayControllers')
+    host_bus_adapter                    = LazyCollection('get_smart_storage_controllers', 0, 'HostBusAdapters')
+    host_bus_adapter_uris               = LazyCollection('get_smart_storage_controllers', 1, 'HostBusAdapters')
+    smstorage_config_collection         = LazyCollection('get_smart_storage_config_setting', 0)
+    smstorage_config_collection_uris    = LazyCollection('get_smart_storage_config_setting', 1)
 
     def __init__(self, connection):
 
         self.endpoint                   = '/redfish/v1/Systems' 
         self.connection                 = connection
-
-        self.collection,self.collection_uris                                        = self.get_all()                  # All members of self.endpoint
-                
-
-        self.processor_collection , self.processor_collection_uris                  = self.get_sub_collection_per(type='Processors')            # All processor collection   
-        self.memory_collection , self.memory_collection_uris                        = self.get_sub_collection_per(type='Memory')                 # All memory collection
-
-        # Local Storage
-        self.storage_collection , self.storage_collection_uris                      = self.get_sub_collection_per(type='Storage')                  # All storage collection
- 
-        # Smart Storage
-        self.array_controller , self.array_controller_uris                          = self.get_smart_storage_controllers(type='ArrayControllers') 
-        self.host_bus_adapter , self.host_bus_adapter_uris                          = self.get_smart_storage_controllers(type='HostBusAdapters')  
-        self.smstorage_config_collection , self.smstorage_config_collection_uris    = self.get_smart_storage_config_setting()
-        
-        # Network Adapters
-        self.network_adapter_collection , self.network_adapter_collection_uris      = self.get_sub_collection_per(type='NetworkAdapters')                 # All network Adapters
+        self.waits                      = []                    # what, elapsed and polls of every wait for POST or readiness
+        self.projections                = dict()                # name --> (properties, members) of the projected walks
 
         self.actions                                                                = [
                 "On",
@@ -101,34 +180,111 @@ class SYSTEMS:
         # target": "/redfish/v1/Systems/1/Actions/ComputerSystem.Reset/"
 
 
-        self.ethernet_collection        = None                  # All ethernet collection
-        self.ethernet_collection_uris   = None
-
-
     
     # ----------------- get all members uri    
-    def get_all(self):
+    def get_all(self, properties=None):
         __collection                = []
         __collection_uris           = []
 
-        __response                  = self.connection.get(self.endpoint)
-
-
-
-        for __uri in __response.obj['Members']:
-            __collection_uris.append(__uri['@odata.id'])
-            __acc                   = self.connection.get(__uri['@odata.id'])
-            __collection.append(__acc.obj) 
+        # Members are returned inline with $expand when supported
+        __collection, __collection_uris = self.connection.get_collection(self.endpoint, properties)
 
         return __collection, __collection_uris
 
+    # ----------------- members with only properties - the full collection when already loaded
+    def get_all_selected(self, properties):
+        _loaded                     = LazyCollection.get_loaded(self, 'get_all')
+        if _loaded is not None:
+            return _loaded[0]
+        return self.get_projection('Systems', properties, lambda: self.get_all(properties)[0])
+
+    def get_sub_collection_selected(self, systems, type, properties):
+        _loaded                     = LazyCollection.get_loaded(self, 'get_sub_collection_per', type)
+        if _loaded is not None:
+            return _loaded[0]
+        return self.get_projection(type, properties, lambda: self.walk_selected(systems, type, properties))
+
+    def walk_selected(self, systems, type, properties):
+        __sub_collection            = []
+        for _m in systems:
+            __members, _            = self.connection.get_collection(_m[type]['@odata.id'], properties)
+            __sub_collection.extend(__members)
+        return __sub_collection
+
+    # ----------------- reuse a projection fetched with at least these properties, e.g. by plan
+    def get_projection(self, name, properties, load):
+        _projection                 = self.projections.get(name)
+        if _projection is None or not set(properties) <= _projection[0]:
+            _projection             = (set(properties), load())
+            self.projections[name]  = _projection
+        return _projection[1]
+
+
+    # ----------------- gather_subset - e.g. ['processors', 'memory'] or ['!storage']
+    @classmethod
+    def get_gather_subset(cls, values):
+        '''
+        Returns (subsets in GATHER_SUBSETS order, unknown values) - 'all' or exclusions alone select every subset
+        '''
+        _include                    = set()
+        _exclude                    = set()
+        for _value in values:
+            _value                  = _value.strip().lower()
+            if _value.startswith('!'):
+                _exclude.add(_value[1:])
+            else:
+                _include.add(_value)
+
+        _unknown                    = sorted((_include | _exclude) - set(cls.GATHER_SUBSETS) - set(['all']))
+        if not _include or 'all' in _include:
+            _include                = set(cls.GATHER_SUBSETS)
+        return [_s for _s in cls.GATHER_SUBSETS if _s in _include and _s not in _exclude], _unknown
+
+    # ----------------- facts of several subsets - keyed by subset
+    def gather(self, subsets):
+        self.plan(subsets)
+
+        __facts                     = dict()
+        for _subset in subsets:
+            __facts[_subset]        = getattr(self, self.GATHER_BUILDERS[_subset])()
+        return __facts
+
+    # ----------------- fetch what the builders of subsets read - each resource once, the walks concurrently
+    def plan(self, subsets):
+        _full                       = False
+        _properties                 = set()
+        _walks                      = collections.OrderedDict()       # sub collection --> union of member properties
+        for _subset in subsets:
+            _system_properties, _sub_collections = self.GATHER_SUBSETS[_subset]
+            if _system_properties is None:
+                _full               = True
+            else:
+                _properties.update(_system_properties)
+            for _type, _sub_properties in _sub_collections:
+                _walks.setdefault(_type, set()).update(_sub_properties)
+
+        if _full:
+            self.collection
+        if not _walks:
+            return
+
+        _systems                    = self.get_all_selected(sorted(_properties))
+        _walk                       = lambda _type: self.get_sub_collection_selected(_systems, _type, sorted(_walks[_type]))
+        if ThreadPoolExecutor is None or len(_walks) <= 1:
+            for _type in _walks:
+                _walk(_type)
+        else:
+            with ThreadPoolExecutor(max_workers=len(_walks)) as _executor:
+                list(_executor.map(_walk, _walks))
+
 
     # ----------------- get system info    
     def get_system_info(self):
-        if self.collection is None:
-            self.collection,self.collection_uris = self.get_all()
+        _systems                    = self.get_all_selected(self.SYSTEM_INFO_PROPERTIES)
+        _processors                 = self.get_sub_collection_selected(_systems, 'Processors', self.SYSTEM_INFO_PROCESSOR_PROPERTIES)
+        _ethernets                  = self.get_sub_collection_selected(_systems, 'EthernetInterfaces', self.SYSTEM_INFO_ETHERNET_PROPERTIES)
     
-        for _m in self.collection:
+        for _m in _systems:
             _bios                   = _m['Oem']['Hpe']['Bios']['Current']
             _biosVersion            = _bios['VersionString']
             biosDate                = _bios['Date']
@@ -141,18 +297,13 @@ class SYSTEMS:
             _processor              = _cpu['Model']
             _processor_count        = _cpu['Count']
 
-            # Get CPU core --> ensure that get_subcollection(type='Processors') is called first
-            if self.processor_collection is None:
-                self.processor_collection,self.processor_collection_uris    = self.get_sub_collection_per(type='Processors')
-            _cores                  = self.processor_collection[0]['Oem']['Hpe']['CoresEnabled']
+            # Get CPU core
+            _cores                  = _processors[0]['Oem']['Hpe']['CoresEnabled']
 
 
-            # Get MACs --> ensure that get_subcollection(type='EthernetInterfaces') is called first
-            if self.ethernet_collection is None:
-                self.ethernet_collection,self.ethernet_collection_uris    = self.get_sub_collection_per(type='EthernetInterfaces')
-            
+            # Get MACs
             _macs                    = []
-            for __eth in self.ethernet_collection:
+            for __eth in _ethernets:
                 _macs.append(__eth['MACAddress'])
             
             # Get Network Interfaces
@@ -178,7 +329,8 @@ class SYSTEMS:
     def get_processor_info(self):
     
         _processors                 = []
-        for _m in self.processor_collection:
+        _systems                    = self.get_all_selected(['Processors'])
+        for _m in self.get_sub_collection_selected(_systems, 'Processors', self.PROCESSOR_PROPERTIES):
             _id                     = _m['Id']
             _health                 = _m['Status']['Health']
             _cores                  = _m['TotalCores']
@@ -207,7 +359,8 @@ class SYSTEMS:
     def get_memory_info(self):
     
         # Get Memory Summary
-        for _m in self.collection:
+        _systems                    = self.get_all_selected(['Memory'])
+        for _m in _systems:
             _mem_uri                = _m['Memory']['@odata.id']
             _mem                    = self.connection.get(_mem_uri)
             _oem                    = _mem.obj['Oem']['Hpe']
@@ -233,7 +386,7 @@ class SYSTEMS:
 
         # Get physical memopry
         _physical_memory            = []
-        for _ph in self.memory_collection:
+        for _ph in self.get_sub_collection_selected(_systems, 'Memory', self.MEMORY_PROPERTIES):
             _status              = _ph['Oem']['Hpe']['DIMMStatus'] 
             if _status == 'GoodInUse':      
                 _dimm                   = dict(
@@ -288,6 +441,27 @@ class SYSTEMS:
         return _net_list
 
 
+    # ----------------- get EthernetInterfaces info    
+    def get_ethernet_info(self):
+
+        _interfaces                     = []
+        _systems                        = self.get_all_selected(['EthernetInterfaces'])
+        for _m in self.get_sub_collection_selected(_systems, 'EthernetInterfaces', self.ETHERNET_PROPERTIES):
+            _eth                        = dict(
+                Id                      = _m['Id'],
+                Name                    = _m.get('Name'),
+                Mac                     = _m.get('MACAddress'),
+                LinkStatus              = _m.get('LinkStatus'),
+                SpeedMbps               = _m.get('SpeedMbps'),
+                IPv4                    = _m.get('IPv4Addresses', []),
+                IPv6                    = _m.get('IPv6Addresses', []),
+                Health                  = _m.get('Status', {}).get('Health')
+            )
+            _interfaces.append(_eth)
+
+        return _interfaces
+
+
     # ----------------- get all storage  info    
     def get_storage_info(self):
         _local      = self.get_local_storage()
@@ -295,57 +469,40 @@ class SYSTEMS:
 
         return _local, _sma, _hba
 
+    def get_storage_facts(self):
+        _local, _sma, _hba          = self.get_storage_info()
+        return dict(
+            local_storage           = _local,
+            smart_array             = _sma,
+            host_bus_adapter        = _hba
+        )
+
     # ----------------- get local storage info    
     def get_local_storage(self):
 
+        # Drives belong to the storage subsystem - each is fetched once, all of them concurrently
+        _drive_uris                 = collections.OrderedDict()
+        for _m in self.storage_collection:
+            for _dr_list in _m.get('Drives', []):
+                _drive_uris[_dr_list['@odata.id']] = None
+        _responses                  = self.connection.get_many(list(_drive_uris), self.LOCAL_DRIVE_PROPERTIES)
+        _drives                     = dict((_uri, self.build_local_drive(_resp.obj)) for _uri, _resp in zip(_drive_uris, _responses))
+
         _controllers                = []
         for _m in self.storage_collection:
             _ss_name                = _m['Name']
             _health                 = _m['Status']['Health']
             _ct_list               = _m['StorageControllers']
+
+            # get physical drives
+            _physical_drives        = [_drives[_dr_list['@odata.id']] for _dr_list in _m.get('Drives', [])]
+
             for _sc in _ct_list:
                 _fw                 = _sc['FirmwareVersion']
                 _sn                 = _sc['SerialNumber']
                 _model              = _sc['Model']
                 _location           = _sc['Location']['PartLocation']['ServiceLabel']
 
-                # get physical drives
-                _physical_drives    = []
-                for _dr_list in _m['Drives']:
-                    _uri            = _dr_list['@odata.id']                    
-                    _resp           = self.connection.get(_uri)                   
-                    _dr             = _resp.obj
-
-                    _dr_type        = _dr['MediaType']
-                    _dr_model       = _dr['Model']
-                    _dr_sn          = _dr['SerialNumber']
-                    
-                    _lc_list         = _dr['Location']
-                    for _lc in _lc_list:
-                        _lc         = _lc['Info'].split(':')    # format:Box:Bay
-                        _dr_location= 'Box {0}:Bay {1}'.format(_lc[0],_lc[1])
-
-                    _dr_health      = _dr['Oem']['Hpe']['DriveStatus']['Health']
-                    _dr_temp_health = _dr['Oem']['Hpe']['TemperatureStatus']['Health']
-                    _dr_wear_health = _dr['Oem']['Hpe']['WearStatus']
-
-                    if 'CapacityBytes' in _dr :
-                        _dr_size    = str(round(_dr['CapacityBytes'] / pow(1000,4) , 1)) + ' GB'
-                    else:
-                        _dr_size    = 'Unknown'
-
-                    _drive      = dict(
-                        Type            = _dr_type,
-                        Model           = _dr_model,
-                        SerialNumber    = _dr_sn,
-                        Location        = _dr_location,
-                        Size            = _dr_size,
-                        Health          = _dr_health,
-                        Temperature     = _dr_temp_health,
-                        WearHealth      = _dr_wear_health
-                    )
-                    _physical_drives.append(_drive)
-
                 _ct                 = dict(
                     Firmware        = _fw,
                     SerialNumber    = _sn,
@@ -357,6 +514,28 @@ class SYSTEMS:
 
         return _controllers
 
+    def build_local_drive(self, dr):
+        _dr_location                = None
+        for _lc in dr.get('Location', []):
+            _lc                     = _lc['Info'].split(':')    # format:Box:Bay
+            _dr_location            = 'Box {0}:Bay {1}'.format(_lc[0],_lc[1])
+
+        if 'CapacityBytes' in dr :
+            _dr_size                = str(round(dr['CapacityBytes'] / pow(1000,4) , 1)) + ' GB'
+        else:
+            _dr_size                = 'Unknown'
+
+        return dict(
+            Type                    = dr['MediaType'],
+            Model                   = dr['Model'],
+            SerialNumber            = dr['SerialNumber'],
+            Location                = _dr_location,
+            Size                    = _dr_size,
+            Health                  = dr['Oem']['Hpe']['DriveStatus']['Health'],
+            Temperature             = dr['Oem']['Hpe']['TemperatureStatus']['Health'],
+            WearHealth              = dr['Oem']['Hpe']['WearStatus']
+        )
+
     # ----------------- get controllers info    
     def get_smart_storage(self):
 
@@ -365,118 +544,127 @@ class SYSTEMS:
 
         return _smart_array_collection, _hba_collection
 
-    # ----------------- get Smart Array config
+    # ----------------- get Smart Array or Host Bus Adapter controllers - keyed by controller location
     def get_smart_array(self,type):
 
-        _contr                      = dict()
-
-        if type == 'ArrayControllers':
-                _m                      = self.array_controller
-                _id                     = _m['Id']
-                _model                  = _m['Model']
-                _sn                     = _m['SerialNumber'].strip()
-                _health                 = _m['Status']['Health']
-                _location               = _m['Location']
-                _pn                     = _m['ControllerPartNumber']
-                _fw                     = _m['FirmwareVersion']['Current']['VersionString']
-                _ld_uri                 = _m['Links']['LogicalDrives']['@odata.id']
-                _pd_uri                 = _m['Links']['PhysicalDrives']['@odata.id']
-
-                # get Physical drives
-                _physical_drives        = []
-                _pd_collection, _pd_collection_uris = self.get_sub_collection_by(_pd_uri)
-                for _uri in _pd_collection_uris:
-                    _pd                 = self.get_physical_drive_by(_uri)
-                    _physical_drives.append(_pd)
-
-                # get Logical drives
-                _logical_drives        = []
-                _ld_collection, _ld_collection_uris = self.get_sub_collection_by(_ld_uri)
-                for _uri in _ld_collection_uris:
-                    _ld                 = self.get_logical_drive_by(_uri)
-                    _logical_drives.append(_ld)
-
-                _contr                  = dict(
-                    Id                  = _id,
-                    Model               = _model,
-                    SerialNumber        = _sn,
-                    PartNumber          = _pn,
-                    Location            = _location,
-                    Status              = _health,
-                    Firmware            = _fw,
-                    LogicalDrives       = _logical_drives,
-                    PhysicalDrives      = _physical_drives 
-                )
+        __controllers               = collections.OrderedDict()
+        _controllers                = self.array_controller if type == 'ArrayControllers' else self.host_bus_adapter
+
+        # PhysicalDrives and LogicalDrives subtrees of every controller at once
+        _jobs                       = []
+        for _m in _controllers:
+            _links                  = _m.get('Links') or {}
+            for _subtree in ('PhysicalDrives', 'LogicalDrives'):
+                if _subtree in _links:
+                    _jobs.append((_m['@odata.id'], _subtree, _links[_subtree]['@odata.id']))
+
+        _subtrees                   = dict()
+        _workers                    = min(self.connection.max_concurrency, len(_jobs))
+        if ThreadPoolExecutor is None or _workers <= 1:
+            __results               = [self.get_controller_subtree(*_job[1:]) for _job in _jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=_workers) as _executor:
+                __results           = list(_executor.map(lambda _job: self.get_controller_subtree(*_job[1:]), _jobs))
+        for _job, _result in zip(_jobs, __results):
+            _subtrees[_job[:2]]     = _result
+
+        for _m in _controllers:
+            _fw                     = ((_m.get('FirmwareVersion') or {}).get('Current') or {}).get('VersionString')
+            _pds                    = _subtrees.get((_m['@odata.id'], 'PhysicalDrives'), collections.OrderedDict())
+            _lds                    = _subtrees.get((_m['@odata.id'], 'LogicalDrives'), [])
+
+            # Data drives of a logical drive are links into the physical drives already fetched
+            _logical_drives         = []
+            for _ld, _dd_uris in _lds:
+                _ld['physicaldrives'] = [_pds.get(_uri) or self.get_physical_drive_by(_uri) for _uri in _dd_uris]
+                _logical_drives.append(_ld)
+
+            _contr                  = dict(
+                Id                  = _m['Id'],
+                Model               = _m.get('Model'),
+                SerialNumber        = (_m.get('SerialNumber') or '').strip(),
+                PartNumber          = _m.get('ControllerPartNumber'),
+                Location            = _m.get('Location'),
+                Status              = (_m.get('Status') or {}).get('Health'),
+                Firmware            = _fw,
+                LogicalDrives       = _logical_drives,
+                PhysicalDrives      = list(_pds.values())
+            )
+            __controllers[_m.get('Location') or _m['Id']] = _contr
 
+        return __controllers
 
+    # ----------------- one subtree of a controller
+    # PhysicalDrives --> physical drive uri --> drive, LogicalDrives --> [(logical drive, data drive uris)]
+    def get_controller_subtree(self, subtree, uri):
+        if subtree == 'PhysicalDrives':
+            _members, _uris         = self.connection.get_collection(uri, self.PHYSICAL_DRIVE_PROPERTIES)
+            return collections.OrderedDict((_uri.rstrip('/'), self.build_physical_drive(_m)) for _m, _uri in zip(_members, _uris))
 
-        return _contr
+        __logical_drives            = []
+        _members, _uris             = self.connection.get_collection(uri, self.LOGICAL_DRIVE_PROPERTIES)
+        _dd_uris                    = [_m['Links']['DataDrives']['@odata.id'] for _m in _members]
+        for _m, __response in zip(_members, self.connection.get_many(_dd_uris)):
+            _dd                     = [_d['@odata.id'].rstrip('/') for _d in __response.obj.get('Members', [])]
+            __logical_drives.append((self.build_logical_drive(_m), _dd))
+        return __logical_drives
 
 
-    # ----------------- get controllers info    
+    # ----------------- get controllers info - every controller of every system
     def get_smart_storage_controllers(self, type):
         # type = HostBusAdapters or ArrayControllers
-        _sub_collection                 = []
-        _sub_collection_uri             = []
-        
-
-        for _m in self.collection:
-            _sst_uri                = _m['Oem']['Hpe']['Links']['SmartStorage']['@odata.id']
-            _resp                   = self.connection.get(_sst_uri)
-            _controller_uri         = _resp.obj['Links'][type]['@odata.id']
+        __sub_collection                = []
+        __sub_collection_uris           = []
 
-            _resp                   = self.connection.get(_controller_uri)
-            _count                  = _resp.obj['Members@odata.count']
-            if _count >= 1:
-                _members            = _resp.obj['Members']
-                for _s in _members:
-                    _sub_collection_uri = _s['@odata.id']
-                    _resp               = self.connection.get(_sub_collection_uri)
-                    _sub_collection     = _resp.obj
+        _sst_uris                       = [_m['Oem']['Hpe']['Links']['SmartStorage']['@odata.id'] for _m in self.collection]
+        for __response in self.connection.get_many(_sst_uris):
+            _controller_uri             = __response.obj['Links'][type]['@odata.id']
+            __members, __members_uris   = self.connection.get_collection(_controller_uri)
+            __sub_collection.extend(__members)
+            __sub_collection_uris.extend(__members_uris)
 
-        return _sub_collection, _sub_collection_uri
+        return __sub_collection, __sub_collection_uris
 
 
     # ----------------- get logical drive info    
     def get_logical_drive_by(self, uri):
         _ld                            = None
         if uri is not None:
-            __resp                      = self.connection.get(uri)
-            __obj                       = __resp.obj
-
-
-            _physical_drives        = []
-            _pd_collection, _pd_collection_uris = self.get_sub_collection_by(__obj['Links']['DataDrives']['@odata.id'])
-            for _uri in _pd_collection_uris :
-                _pd                     = self.get_physical_drive_by(_uri)
-                _physical_drives.append(_pd)
-
-            _ld                         = dict(
-                id                      = __obj['LogicalDriveNumber'],
-                raid                    = __obj['Raid'],
-                health                  = __obj['Status']['Health'],
-                size                    = str(int(__obj['CapacityMiB'] / 1024)) + ' GB',
-                physicaldrives          = _physical_drives
-            )         
+            __resp                      = self.connection.get_selected(uri, self.LOGICAL_DRIVE_PROPERTIES)
+            _ld                         = self.build_logical_drive(__resp.obj)
+
+            _pd_collection, _pd_collection_uris = self.get_sub_collection_by(__resp.obj['Links']['DataDrives']['@odata.id'])
+            _ld['physicaldrives']       = [self.get_physical_drive_by(_uri) for _uri in _pd_collection_uris]
         return _ld
+
+    def build_logical_drive(self, obj):
+        return dict(
+            id                          = obj['LogicalDriveNumber'],
+            raid                        = obj['Raid'],
+            health                      = obj['Status']['Health'],
+            size                        = str(int(obj['CapacityMiB'] / 1024)) + ' GB',
+            physicaldrives              = []
+        )
     
     # ----------------- get physical drive info    
     def get_physical_drive_by(self, uri):
         _pd                             = None
         if uri is not None:
-            __resp                      = self.connection.get(uri)
-            __obj                       = __resp.obj
-            _pd                         = dict(
-                location                = __obj['Location'],
-                health                  = __obj['Status']['Health'],
-                serialnumber            = __obj['SerialNumber'],
-                size                    = str(int(__obj['CapacityMiB'] / 1024)) + ' GB',
-                firmware                = __obj['FirmwareVersion']['Current']['VersionString'],
-                diskdriveuse            = __obj['DiskDriveUse'],
-                encrypteddrive          = __obj['EncryptedDrive']
-            )
+            __resp                      = self.connection.get_selected(uri, self.PHYSICAL_DRIVE_PROPERTIES)
+            _pd                         = self.build_physical_drive(__resp.obj)
         return _pd
 
+    def build_physical_drive(self, obj):
+        return dict(
+            location                    = obj['Location'],
+            health                      = obj['Status']['Health'],
+            serialnumber                = obj['SerialNumber'],
+            size                        = str(int(obj['CapacityMiB'] / 1024)) + ' GB',
+            firmware                    = obj['FirmwareVersion']['Current']['VersionString'],
+            diskdriveuse                = obj['DiskDriveUse'],
+            encrypteddrive              = obj['EncryptedDrive']
+        )
+
     # ----------------- get Smart Storage Config and settings info    
     def get_smart_storage_config_setting(self):
         #/redfish/v1/Systems/1/SmartStorageConfig
@@ -492,63 +680,54 @@ class SYSTEMS:
 
         return  __sub_collection, __sub_collection_uris 
 
-    # ----------------- create a logical drive    
+    # ----------------- create a logical drive - validated against the SmartStorageConfig already fetched, no extra GET
     def create_logical_drive(self, raid, name, drive_list=[]):
 
-        _config                         = self.smstorage_config_collection 
-        
-        if drive_list is not None and raid is not None:
-            _smart_array                = self.get_smart_array('ArrayControllers')
-            _physical_drives_list       = _smart_array ['PhysicalDrives']
-            _pd_list                    = []
-            for _pd in _physical_drives_list :
-                _pd_list.append(_pd['Location'])
-
-            __existed                   = True
-            for _drive in drive_list:
-                __existed               = __existed and ( _drive in _pd_list)
-
-            if __existed:
-                for _config in self.smstorage_config_collection:
-                    _ld_list                        = _config['LogicalDrives']
-                    # Check if drive_list already in existing logical drives
-                    _unconfigured               = True
-                    for _ld in _ld_list:
-                        if _ld['DataDrives'] == drive_list:
-                            _unconfigured       = False
-                            break
+        if not drive_list or raid is None:
+            return None, False, self.MSG_LOGICAL_DISK_NOT_SPECIFIED
 
-                    if _unconfigured:
-                        # Build body for create request 
-                        _new_ld                     = dict(
-                                Raid                    = raid ,
-                                DataDrives              = drive_list
-                            )
-                        if name is not None:
-                            _new_ld['LogicalDriveName'] = name
-
-                        _body                       = _config.copy()
-
-                        _body['DataGuard']          = 'Disabled'            # Set to disabled to allow config change
-                        _ld_list.append(_new_ld)                            # Add new logical drive to list
-                            
-                        _resp                       = self.logical_drive_action(_body)
-                        _msg                        = ''
-                        _status                     = True
-                    else:
-                        _resp                       = None
-                        _msg                        = self.MSG_PHYSICAL_DRIVE_IN_USE
-                        _status                     = False
-            else:
-                _resp                   = None
-                _msg                    = self.MSG_PHYSICAL_DRIVE_NOT_EXISTED.format(drive_list) 
-                _status                 = False 
-        else:
-            _resp                       = None
-            _msg                        = self.MSG_LOGICAL_DISK_NOT_SPECIFIED
-            _status                     = False
+        # One computer system per iLO
+        _config                         = self.smstorage_config_collection[0]
+        _locations, _in_use             = self.get_drive_index(_config['LogicalDrives'])
+
+        _msg                            = self.check_name(_config['LogicalDrives'], name) or self.check_drives(drive_list, _locations, _in_use)
+        if _msg:
+            return None, False, _msg
 
-        return  _resp,  _status, _msg
+        # Build body for create request 
+        _new_ld                         = dict(
+                Raid                    = raid ,
+                DataDrives              = drive_list
+            )
+        if name is not None:
+            _new_ld['LogicalDriveName'] = name
+
+        _body                           = _config.copy()
+        _body['DataGuard']              = 'Disabled'            # Set to disabled to allow config change
+        _body['LogicalDrives']          = _config['LogicalDrives'] + [_new_ld]
+
+        _resp                           = self.logical_drive_action(_body)
+        return _resp, True, ''
+
+    # ----------------- bays of the controller and bay --> logical drive using it
+    def get_drive_index(self, logical_drives):
+        _config                         = self.smstorage_config_collection[0]
+        _locations                      = set(_pd['Location'] for _pd in _config.get('PhysicalDrives', []))
+        _in_use                         = dict()
+        for _ld in logical_drives:
+            for _drive in (_ld.get('DataDrives') or []) + (_ld.get('SpareDrives') or []):
+                _in_use[_drive]         = _ld.get('LogicalDriveName') or _ld.get('VolumeUniqueIdentifier')
+        return _locations, _in_use
+
+    # ----------------- message when a bay is missing or already in a logical drive, '' otherwise
+    def check_drives(self, drive_list, locations, in_use):
+        _missing                        = set(drive_list) - locations
+        if _missing:
+            return self.MSG_PHYSICAL_DRIVE_NOT_EXISTED.format(sorted(_missing))
+        _used                           = set(drive_list) & set(in_use)
+        if _used:
+            return self.MSG_PHYSICAL_DRIVE_IN_USE.format(', '.join('{0} ({1})'.format(_d, in_use[_d]) for _d in sorted(_used)))
+        return ''
 
 
     # ----------------- create a logical drive    
@@ -601,6 +780,194 @@ class SYSTEMS:
         
 
 
+    # ----------------- create and delete several logical drives with one settings PUT - at most one reboot
+    def apply_logical_drives(self, specs, check_mode=False):
+        '''
+        specs is a list of dict(state, raid, name, physical_drives) - state present creates, absent deletes
+        Returns (resp, status, msg, changes). Logical drives already as specified give no change.
+        '''
+        _body, _changes, _msg           = self.get_logical_drives_body(specs)
+        if _msg:
+            return None, False, _msg, _changes
+        if check_mode or not _changes:
+            return None, True, '', _changes
+
+        _resp                           = self.logical_drive_action(_body)
+        return _resp, True, '', _changes
+
+    # ----------------- one SmartStorageConfig settings body for all specs
+    def get_logical_drives_body(self, specs):
+        # One computer system per iLO
+        _config                         = self.smstorage_config_collection[0]
+
+        _kept                           = [dict(_ld) for _ld in _config['LogicalDrives']]
+        _locations, _in_use             = self.get_drive_index(_kept)
+        _deleted                        = []
+        _created                        = []
+        __changes                       = []
+
+        for _spec in specs:
+            _name                       = _spec.get('name')
+            _drives                     = _spec.get('physical_drives')
+
+            if (_spec.get('state') or 'present') == 'absent':
+                _ld                     = self.find_logical_drive(_kept, _name, _drives)
+                if _ld is not None:
+                    _kept.remove(_ld)
+                    for _drive in (_ld.get('DataDrives') or []) + (_ld.get('SpareDrives') or []):
+                        _in_use.pop(_drive, None)
+                    _deleted.append(dict(Actions=[dict(Action='LogicalDriveDelete')], VolumeUniqueIdentifier=_ld['VolumeUniqueIdentifier']))
+                    __changes.append(dict(action='delete', name=_ld.get('LogicalDriveName'), physical_drives=_ld['DataDrives'],
+                                          raid=_ld['Raid'], VolumeUniqueIdentifier=_ld['VolumeUniqueIdentifier']))
+                continue
+
+            if not _drives or _spec.get('raid') is None:
+                return None, __changes, self.MSG_LOGICAL_DISK_NOT_SPECIFIED
+
+            # Already there as specified - nothing to do
+            _ld                         = self.find_logical_drive(_kept, _name, _drives)
+            if _ld is not None and set(_ld['DataDrives']) == set(_drives) and _ld['Raid'] == _spec['raid']:
+                continue
+
+            # Same name with other drives or raid - never a second logical drive of that name
+            _msg                        = self.check_name(_kept + _created, _name)
+            if _msg:
+                return None, __changes, _msg
+
+            _msg                        = self.check_drives(_drives, _locations, _in_use)
+            if _msg:
+                return None, __changes, _msg
+
+            _new_ld                     = dict(Raid=_spec['raid'], DataDrives=_drives)
+            if _name is not None:
+                _new_ld['LogicalDriveName'] = _name
+            _created.append(_new_ld)
+            for _drive in _drives:
+                _in_use[_drive]         = _name or 'new logical drive'
+            __changes.append(dict(action='create', name=_name, physical_drives=_drives, raid=_spec['raid']))
+
+        _body                           = _config.copy()
+        _body['LogicalDrives']          = _kept + _deleted + _created
+        # Disabled to allow new logical drives, Permissive is enough for deletes
+        _body['DataGuard']              = 'Disabled' if _created else 'Permissive'
+        return _body, __changes, ''
+
+    # ----------------- message when a logical drive already has this name, '' otherwise
+    def check_name(self, logical_drives, name):
+        for _ld in logical_drives:
+            if name is not None and _ld.get('LogicalDriveName') == name:
+                return self.MSG_LOGICAL_DISK_NAME_CONFLICT.format(name, _ld.get('Raid'), _ld.get('DataDrives'))
+        return ''
+
+    # ----------------- logical drive by name, else by data drives
+    def find_logical_drive(self, logical_drives, name=None, drive_list=None):
+        for _ld in logical_drives:
+            if name is not None and _ld.get('LogicalDriveName') == name:
+                return _ld
+        for _ld in logical_drives:
+            if drive_list and set(_ld['DataDrives']) == set(drive_list):
+                return _ld
+        return None
+
+    # ----------------- erase several physical drives with one settings PUT and one reboot, then wait for all of them
+    def erase_physical_drives(self, drive_list, pattern=None, wait=True, check_mode=False):
+        '''
+        Returns (resp, status, msg, summary) - summary is dict(pattern, drives, completed, failed, pending, elapsed, polls,
+        post_complete) with drives as bay --> complete, failed or pending. Drives in a logical drive are refused.
+        '''
+        _pattern                        = pattern or self.ERASE_PATTERNS[0]
+        if not drive_list:
+            return None, False, self.MSG_ERASE_NOT_SPECIFIED, None
+        if _pattern not in self.ERASE_PATTERNS:
+            return None, False, self.MSG_ERASE_PATTERN_INVALID.format(_pattern, ', '.join(self.ERASE_PATTERNS)), None
+
+        # One computer system per iLO
+        _config                         = self.smstorage_config_collection[0]
+        _locations, _in_use             = self.get_drive_index(_config['LogicalDrives'])
+        _msg                            = self.check_drives(drive_list, _locations, _in_use)
+        if _msg:
+            return None, False, _msg, None
+
+        __summary                       = self.get_erase_summary(_pattern, dict((_d, 'pending') for _d in drive_list))
+        if check_mode:
+            return None, True, '', __summary
+
+        _body                           = dict(
+                Actions                 = [dict(Action='PhysicalDriveErase', ErasePattern=_pattern, PhysicalDriveList=drive_list)],
+                DataGuard               = 'Disabled'            # Set to disabled to allow the erase
+            )
+        _resp                           = self.logical_drive_action(_body)
+        if not wait:
+            return _resp, True, '', __summary
+
+        __summary                       = self.wait_erase(_pattern, drive_list)
+        if __summary['failed'] or __summary['pending']:
+            return _resp, False, self.MSG_ERASE_NOT_COMPLETE.format(__summary['failed'], __summary['pending']), __summary
+        return _resp, True, '', __summary
+
+    # ----------------- one poll loop for all drives - one PhysicalDrives GET per controller and poll
+    def wait_erase(self, pattern, drive_list):
+        _pd_uris                        = [_m['Links']['PhysicalDrives']['@odata.id'] for _m in self.array_controller
+                                           if 'PhysicalDrives' in (_m.get('Links') or {})]
+        _drives                         = dict((_d, 'pending') for _d in drive_list)
+
+        # Erase starts when POST applies the settings - drive statuses read before are those of a previous erase.
+        # PostState still reads FinishedPost from the previous boot right after the reset, so POST must be seen
+        # to start (reset), then to complete (post), before the drives are read (done)
+        _phases                         = collections.OrderedDict((_uri, 'reset') for _uri in self.collection_uris)
+
+        def _poll():
+            for _uri, _phase in _phases.items():
+                if _phase == 'done':
+                    continue
+                _resp                   = self.connection.get_selected(_uri, self.POST_PROPERTIES, uncached=True)
+                _post_state             = (((_resp.obj or {}).get('Oem') or {}).get('Hpe') or {}).get('PostState')
+                if _phase == 'reset' and _post_state not in self.POST_DONE_STATES:
+                    _phases[_uri]       = 'post'
+                elif _phase == 'post' and self.is_post_complete(_resp):
+                    _phases[_uri]       = 'done'
+            if set(_phases.values()) != set(['done']):
+                return _drives
+
+            for _uri in _pd_uris:
+                self.connection.invalidate(_uri)
+                _members, _uris         = self.connection.get_collection(_uri, self.ERASE_PROPERTIES)
+                for _m in _members:
+                    if _m.get('Location') in _drives:
+                        _drives[_m['Location']] = self.get_erase_status(_m)
+            return _drives
+
+        # POST and erase share the deadline
+        _waiter                         = Waiter('erase of {0} drives'.format(len(drive_list)), deadline=self.connection.wait_timeout)
+        try:
+            _waiter.until(_poll, lambda _d: set(_phases.values()) == set(['done']) and 'pending' not in _d.values())
+        except WaitTimeoutError:
+            pass                                                # drives still pending are reported in the summary
+        finally:
+            self.waits.append(_waiter.report())
+
+        __summary                       = self.get_erase_summary(pattern, _drives)
+        __summary.update(elapsed=round(_waiter.elapsed, 1), polls=_waiter.polls,
+                         post_complete=set(_phases.values()) == set(['done']))
+        return __summary
+
+    def get_erase_status(self, drive):
+        _reasons                        = drive.get('DiskDriveStatusReasons') or []
+        if 'EraseComplete' in _reasons:
+            return 'complete'
+        if set(_reasons) & set(['EraseError', 'EraseAborted']):
+            return 'failed'
+        return 'pending'
+
+    def get_erase_summary(self, pattern, drives):
+        return dict(
+                pattern                 = pattern,
+                drives                  = drives,
+                completed               = sorted(_d for _d, _s in drives.items() if _s == 'complete'),
+                failed                  = sorted(_d for _d, _s in drives.items() if _s == 'failed'),
+                pending                 = sorted(_d for _d, _s in drives.items() if _s == 'pending')
+            )
+
     # ----------------- define system action   
     def logical_drive_action(self,  body):
         _config                     = self.smstorage_config_collection 
@@ -629,13 +996,7 @@ class SYSTEMS:
         __sub_collection_uris           = []
 
         if uri is not None:
-            __resp                      = self.connection.get(uri)
-            for __sm in __resp.obj['Members']:
-                    __sm_uri            = __sm['@odata.id']
-                    __sub_collection_uris.append(__sm_uri)
-
-                    __response          = self.connection.get(__sm_uri)
-                    __sub_collection.append(__response.obj)
+            __sub_collection, __sub_collection_uris = self.connection.get_collection(uri)
         
         return __sub_collection, __sub_collection_uris
   
@@ -646,9 +1007,6 @@ class SYSTEMS:
         __sub_collection                = []
         __sub_collection_uris           = []
 
-        if self.collection is None:
-            self.collection,self.collection_uris = self.get_all()
-
         if type is not None:
             for _m in self.collection:
 
@@ -664,37 +1022,28 @@ class SYSTEMS:
                 else:
                     __entry_point       = _m[type]['@odata.id']    
 
-                __response              = self.connection.get(__entry_point)
-
-                # Check if __response.obj is ready
-                _msg                    = ''
-                if 'error' in __response.obj:
-                    for _info in __response.obj['error']['@Message.ExtendedInfo']:
-                        _msg                    = _info['MessageId'].split()[-1]
-                while  'ResourceNotReadyRetry' in _msg:
-                    time.sleep(2)
-                    # Re-query again
-                    __response              = self.connection.get(__entry_point)
-                    # Check if __response.obj is ready
-                    if 'error' in __response.obj:
-                        for _info in __response.obj['error']['@Message.ExtendedInfo']:
-                            _msg                    = _info['MessageId'].split()[-1]
-                
-                for __sm in __response.obj['Members']:
-                    __sm_uri            = __sm['@odata.id']
-                    __sub_collection_uris.append(__sm_uri)
-
-                    __response          = self.connection.get(__sm_uri)
-                    __sub_collection.append(__response.obj)
+                # Storage and NetworkAdapters answer ResourceNotReadyRetry until device discovery completes
+                __response              = self.connection.get_expanded(__entry_point)
+                if is_not_ready(__response.obj):
+                    _waiter             = Waiter('{0} ready'.format(__entry_point), deadline=self.connection.wait_timeout)
+                    try:
+                        __response      = _waiter.until(lambda: self.connection.get_expanded(__entry_point),
+                                                        lambda _r: not is_not_ready(_r.obj))
+                    finally:
+                        self.waits.append(_waiter.report())
+
+                __members, __members_uris   = self.connection.get_members(__response.obj)
+                __sub_collection.extend(__members)
+                __sub_collection_uris.extend(__members_uris)
         
         return __sub_collection, __sub_collection_uris
 
 
     # ------------------- Power on server and wait for POSt to complete
     def poweron_and_wait_post(self):
-        # Check server power status
+        # Check server power status - polled resources must bypass the request memo
         for __uri in self.collection_uris:
-            __resp              = self.connection.get(__uri)
+            __resp              = self.connection.get_selected(__uri, ['PowerState'], uncached=True)
             _m                  = __resp.obj
             _power_state        = _m["PowerState"]
 
@@ -704,30 +1053,22 @@ class SYSTEMS:
                 _action_endpoint    = __uri + '/Actions/ComputerSystem.Reset/'
                 __resp              = self.connection.post(_action_endpoint, _action)
 
-                time.sleep(5)
-
-                ### Query PostState
-                __resp              = self.connection.get(__uri)
-                _m                  = __resp.obj
-                _oem                = _m['Oem']['Hpe']
-                _post_state         = _oem['PostState']
-                _device_discover    = _oem['DeviceDiscoveryComplete']['DeviceDiscovery']
-                
-                # Wait for POST to complete
-                _iteration          = 0
-                _device_discover    = ''
-
-                while  'DeviceDiscoveryComplete' not in _device_discover:
-                    time.sleep(1)
-                    _iteration  = _iteration + 1 
-
-                    __resp              = self.connection.get(__uri)
-                    _m                  = __resp.obj
-
-                    ### PostState
-                    _oem                = _m['Oem']['Hpe']
-                    _post_state         = _oem['PostState']
-                    _device_discover    = _oem['DeviceDiscoveryComplete']['DeviceDiscovery']
+                self.wait_post(__uri)
+
+    # ------------------- Wait for POST to complete - only PostState and DeviceDiscovery are polled
+    def wait_post(self, uri):
+        _waiter                 = Waiter('{0} POST'.format(uri), deadline=self.connection.wait_timeout)
+        try:
+            _waiter.until(lambda: self.connection.get_selected(uri, self.POST_PROPERTIES, uncached=True), self.is_post_complete)
+        finally:
+            self.waits.append(_waiter.report())
+        return _waiter.elapsed
+
+    def is_post_complete(self, response):
+        _oem                    = ((response.obj or {}).get('Oem') or {}).get('Hpe') or {}
+        _post_state             = _oem.get('PostState')
+        _device_discover        = (_oem.get('DeviceDiscoveryComplete') or {}).get('DeviceDiscovery')
+        return _device_discover == 'vMainDeviceDiscoveryComplete' or _post_state in self.POST_DONE_STATES
 
 
     # ----------------- generate error message    
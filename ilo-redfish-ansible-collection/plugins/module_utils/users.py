@@ -24,9 +24,12 @@ module: users
 short_description: Common routines and class for ilo_user_facts and ilo_users modules
 description:
     - get_all           : query iLO to get list of accounts
-    _ get_by(type, name): query iLo for users with filter : UserName or RoleId
+    _ get_by(type, name): query iLo for users with filter : UserName, LoginName or RoleId
     - create_user       : create an iLO accoutn with username,password,loginname,roleid, privileges
     - delete_user       : delete iLOm account based on UserName
+    - get_index         : accounts by UserName, LoginName and RoleId - one crawl, then kept up to date by the writes
+    - get_changes       : create / patch / delete needed to reach a desired list of accounts
+    - reconcile         : apply get_changes, at most max_concurrency requests at once
 
 version_added: "1.0"
 requirements:
@@ -39,6 +42,18 @@ author:
 import collections
 import sys
 import json
+import threading
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
 from redfish import RedfishClient
 from redfish.rest.v1 import ServerDownOrUnreachableError
 
@@ -60,6 +75,10 @@ class USERS:
     MSG_UPDATED                 = 'Resource updated successfully.'
     MSG_DELETED                 = 'Account {0} deleted successfully.'
     MSG_NOT_EXISTED             = 'Account {0} does not exist.'
+    MSG_DUPLICATE               = 'Accounts listed more than once: {0}'
+    MSG_PASSWORD_REQUIRED       = 'Password required to create account {0}'
+
+    INDEX_TYPES                 = ('UserName', 'LoginName', 'RoleId')
 
     def __init__(self, connection):
 
@@ -69,6 +88,10 @@ class USERS:
 
         self.connection             = connection
 
+        self.index                  = None                  # UserName / LoginName / RoleId --> value --> [uri]
+        self.accounts               = None                  # uri --> account
+        self.index_lock             = threading.RLock()
+
 
  
     # ----------------- get all members uri    
@@ -76,30 +99,64 @@ class USERS:
         __collection                = []
         __collection_uris           = []
 
-        __response                  = self.connection.get(self.endpoint)
-        for __uri in __response.obj['Members']:
-            __collection_uris.append(__uri['@odata.id'])
-            __acc                   = self.connection.get(__uri['@odata.id'])
-            __collection.append(__acc.obj) 
+        # Members are returned inline with $expand when supported
+        __collection, __collection_uris = self.connection.get_collection(self.endpoint)
 
         return __collection, __collection_uris
 
+    # ----------------- accounts indexed by UserName, LoginName and RoleId - built once per USERS
+    def get_index(self):
+        with self.index_lock:
+            if self.index is None:
+                self.index          = dict((_type, collections.OrderedDict()) for _type in self.INDEX_TYPES)
+                self.accounts       = collections.OrderedDict()
+                __collection, __collection_uris = self.get_all()
+                for __acc, __uri in zip(__collection, __collection_uris):
+                    self.index_add(__acc, __uri)
+            return self.index
+
+    def index_add(self, account, uri):
+        with self.index_lock:
+            self.accounts[uri]      = account
+            for _type in self.INDEX_TYPES:
+                _value              = self.get_value(account, _type)
+                if _value is not None:
+                    self.index[_type].setdefault(_value, []).append(uri)
+
+    def index_remove(self, uri):
+        with self.index_lock:
+            self.accounts.pop(uri, None)
+            for _type in self.INDEX_TYPES:
+                for _value, _uris in list(self.index[_type].items()):
+                    if uri in _uris:
+                        _uris.remove(uri)
+                    if not _uris:
+                        del self.index[_type][_value]
+
+    @staticmethod
+    def get_value(account, type):
+        # LoginName is an HPE extension
+        if type == 'LoginName':
+            return ((account.get('Oem') or {}).get('Hpe') or {}).get('LoginName')
+        return account.get(type)
+
     # ---------------------- Get by name. role,...
     def get_by(self,type = None, name = None ):
 
         if type == 'name':
             type = 'UserName' 
 
-        __collection, __collection_uris    = self.get_all()
         __acc   = None
         __uri   = None
         if type is not None:
-            for i in range(len(__collection)):
-                __m     = __collection[i]
-                if __m[type] == name:
-                    __acc = __m
-                    __uri = __collection_uris[i]
-                    break
+            self.get_index()
+            if type in self.INDEX_TYPES:
+                __uris  = self.index[type].get(name) or []
+            else:
+                __uris  = [_uri for _uri, _acc in self.accounts.items() if _acc.get(type) == name]
+            if __uris:
+                __uri   = __uris[0]
+                __acc   = self.accounts[__uri]
         return __acc, __uri
 
 
@@ -116,33 +173,16 @@ class USERS:
             _this, _this_uri       = self.get_by(type='UserName', name = username)
             if _this is None:
                 # Configure body 
-                body                                = dict()
-
-                if loginname is not None or privileges is not None:
-                    body.update({'Oem': {'Hpe': dict() }}) 
-
-                body['UserName']                    = username
-                body['Password']                    = password
-                
-                if loginname is not None:
-                    body['Oem']['Hpe']['LoginName'] = loginname
-                
-                if roleid is not None:
-                    body['RoleId']                  = roleid
-                else:
-                    if (privileges is not None) :
-                        privs = dict()
-                        for _priv in privileges:
-                            privs.update({_priv :True})
-                        body['Oem']['Hpe']['Privileges']    = privs 
-                
+                body                = self.get_body(username, password, roleid, loginname, privileges)
 
                 __response          = self.connection.post(self.endpoint, body)
                 _resp               = __response.obj
                 _status             = True
                 if 'error' in _resp.keys():
-                    _msg            = _new['error']['@Message.ExtendedInfo'][0]['MessageId']
+                    _msg            = _resp['error']['@Message.ExtendedInfo'][0]['MessageId']
                     _status         = False
+                else:
+                    self.index_add(*self.get_created(__response, body))
 
             else :
                 _msg                = self.MSG_ALREADY_PRESENT.format(username)
@@ -152,6 +192,41 @@ class USERS:
 
         return   _resp, _status, _msg
 
+    # ---------------------- POST body of a new account
+    def get_body(self, username, password, roleid, loginname, privileges):
+        body                                = dict()
+
+        if loginname is not None or privileges is not None:
+            body.update({'Oem': {'Hpe': dict() }}) 
+
+        body['UserName']                    = username
+        body['Password']                    = password
+        
+        if loginname is not None:
+            body['Oem']['Hpe']['LoginName'] = loginname
+        
+        if roleid is not None:
+            body['RoleId']                  = roleid
+        else:
+            if (privileges is not None) :
+                privs = dict()
+                for _priv in privileges:
+                    privs.update({_priv :True})
+                body['Oem']['Hpe']['Privileges']    = privs 
+
+        return body
+
+    # ---------------------- new account and its uri from the POST response
+    def get_created(self, response, body):
+        _account                    = response.obj
+        if 'UserName' not in _account:
+            # Extended info only - index what was sent
+            _account                = dict((_k, _v) for _k, _v in body.items() if _k != 'Password')
+        _uri                        = _account.get('@odata.id') or response.getheader('Location') or ''
+        if '://' in _uri:
+            _uri                    = urlsplit(_uri).path
+        return _account, _uri
+
 
     # ---------------------- Delete account...
     def delete_user(self,username):
@@ -165,6 +240,7 @@ class USERS:
                 _resp               = __response.obj               
                 _msg                = self.MSG_DELETED.format(username) 
                 _status             = True          
+                self.index_remove(_this_uri)
             else:
                     _msg            = self.MSG_NOT_EXISTED.format(username)
                     _status         = False
@@ -174,5 +250,145 @@ class USERS:
         return _resp, _status, _msg
 
 
+    # ---------------------- changes to reach the desired accounts
+    def get_changes(self, accounts, update_password='on_create'):
+        '''
+        accounts is a list of dict(username, password, loginname, roleid, privileges, state)
+        Returns a list of dict(username, action, uri, body) - action is create, patch or delete.
+        Accounts already as desired give no change. Raises ValueError, before any change is sent,
+        for a username listed twice or an account to create without password.
+        '''
+        __changes                   = []
+        _usernames                  = [_account['username'] for _account in accounts]
+        _duplicates                 = sorted(set(_u for _u in _usernames if _usernames.count(_u) > 1))
+        if _duplicates:
+            raise ValueError(self.MSG_DUPLICATE.format(', '.join(_duplicates)))
+
+        for _account in accounts:
+            _username               = _account['username']
+            _this, _this_uri        = self.get_by(type='UserName', name=_username)
+
+            if (_account.get('state') or 'present') == 'absent':
+                if _this is not None:
+                    __changes.append(dict(username=_username, action='delete', uri=_this_uri, body=None))
+                continue
 
-
+            if _this is None:
+                if _account.get('password') is None:
+                    raise ValueError(self.MSG_PASSWORD_REQUIRED.format(_username))
+                _body               = self.get_body(_username, _account.get('password'), _account.get('roleid'),
+                                                    _account.get('loginname'), _account.get('privileges'))
+                __changes.append(dict(username=_username, action='create', uri=self.endpoint, body=_body))
+                continue
+
+            _body                   = self.get_patch(_this, _account, update_password)
+            if _body:
+                __changes.append(dict(username=_username, action='patch', uri=_this_uri, body=_body))
+
+        return __changes
+
+    # ---------------------- PATCH body with only what differs from the account
+    def get_patch(self, this, account, update_password='on_create'):
+        _body                       = dict()
+        _hpe                        = dict()
+
+        # Passwords cannot be read back, so cannot be compared - sent on every run only with always
+        if account.get('password') is not None and update_password == 'always':
+            _body['Password']       = account['password']
+
+        if account.get('loginname') is not None and account['loginname'] != self.get_value(this, 'LoginName'):
+            _hpe['LoginName']       = account['loginname']
+
+        if account.get('roleid') is not None:
+            if account['roleid'] != this.get('RoleId'):
+                _body['RoleId']     = account['roleid']
+        elif account.get('privileges') is not None:
+            _current                = ((this.get('Oem') or {}).get('Hpe') or {}).get('Privileges') or {}
+            _wanted                 = set(account['privileges'])
+            _privs                  = dict()
+            for _priv in set(_current) | _wanted:
+                if bool(_current.get(_priv)) != (_priv in _wanted):
+                    _privs[_priv]   = _priv in _wanted
+            if _privs:
+                _hpe['Privileges']  = _privs
+
+        if _hpe:
+            _body['Oem']            = {'Hpe': _hpe}
+        return _body
+
+
+    # ---------------------- apply the changes of get_changes - at most max_concurrency at once
+    def reconcile(self, accounts, update_password='on_create', check_mode=False):
+        '''
+        Returns the changes of get_changes, with status and msg once applied
+        '''
+        __changes                   = self.get_changes(accounts, update_password)
+        if check_mode or not __changes:
+            return __changes
+
+        _workers                    = min(getattr(self.connection, 'max_concurrency', 1) or 1, len(__changes))
+        if ThreadPoolExecutor is None or _workers <= 1:
+            for _change in __changes:
+                self.apply(_change)
+        else:
+            with ThreadPoolExecutor(max_workers=_workers) as _executor:
+                list(_executor.map(self.apply, __changes))
+        return __changes
+
+    def apply(self, change):
+        _action                     = change['action']
+        if _action == 'create':
+            __response              = self.connection.post(change['uri'], change['body'])
+        elif _action == 'patch':
+            __response              = self.connection.patch(change['uri'], change['body'])
+        else:
+            __response              = self.connection.delete(change['uri'])
+
+        change['status']            = __response.status < 400
+        change['msg']               = ''
+        if not change['status']:
+            try:
+                change['msg']       = __response.obj['error']['@Message.ExtendedInfo'][0]['MessageId']
+            except (KeyError, IndexError, TypeError):
+                change['msg']       = 'HTTP {0}'.format(__response.status)
+            return change
+
+        # Keep the index as on the iLO - no crawl after the writes
+        if _action == 'create':
+            self.index_add(*self.get_created(__response, change['body']))
+        elif _action == 'patch':
+            with self.index_lock:
+                _this               = self.patched(self.accounts[change['uri']], change['body'])
+                self.index_remove(change['uri'])
+                self.index_add(_this, change['uri'])
+        else:
+            self.index_remove(change['uri'])
+        return change
+
+    @classmethod
+    def patched(cls, account, body):
+        _this                       = dict(account)
+        for _key, _value in body.items():
+            if isinstance(_value, dict):
+                _this[_key]         = cls.patched(_this.get(_key) or {}, _value)
+            elif _key != 'Password':
+                _this[_key]         = _value
+        return _this
+
+    # ---------------------- change as returned by the modules - property paths, never the password
+    @classmethod
+    def describe(cls, change):
+        return dict(username=change['username'], action=change['action'], properties=cls.get_paths(change['body'] or {}),
+                    password='Password' in (change['body'] or {}), status=change.get('status'), msg=change.get('msg', ''))
+
+    @classmethod
+    def get_paths(cls, body, prefix=''):
+        __paths                     = []
+        for _key in sorted(body):
+            if _key in ('UserName', 'Password'):
+                continue
+            if isinstance(body[_key], dict):
+                __paths.extend(cls.get_paths(body[_key], prefix + _key + '/'))
+            else:
+                __paths.append(prefix + _key)
+        return __paths
@@ -0,0 +1,116 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: wait
+short_description: Wait engine for iLO polling - exponential backoff with jitter and a deadline
+description:
+    - Waiter                        : one wait - poll, back off, give up at the deadline
+    - until                         : call poll() until done(result), return the last result
+    - delays                        : the sleeps of the backoff, for callers that sleep themselves (asyncio)
+    - report                        : what, elapsed seconds and number of polls of the wait
+    - is_not_ready                  : check a response body for ResourceNotReadyRetry
+
+    - Delays start at initial seconds and grow by factor up to max_delay, each randomized by jitter,
+      so many servers waited on at once do not poll the iLOs in lockstep.
+    - WaitTimeoutError is raised when the deadline passes before done(result).
+
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+
+import random
+import time
+
+
+#-------------------------------------------------
+
+
+class WaitTimeoutError(Exception):
+    pass
+
+
+class Waiter(object):
+
+    DEFAULT_DEADLINE            = 1200                  # seconds - a large server can POST for 15 minutes
+    DEFAULT_INITIAL             = 2                     # seconds before the second poll
+    DEFAULT_MAX_DELAY           = 30
+    DEFAULT_FACTOR              = 1.5
+    DEFAULT_JITTER              = 0.5                   # a delay d is drawn in [d * (1 - jitter), d]
+
+    def __init__(self, what, deadline=None, initial=None, max_delay=None, factor=None, jitter=None):
+
+        self.what                   = what
+        self.deadline               = deadline or self.DEFAULT_DEADLINE
+        self.initial                = initial or self.DEFAULT_INITIAL
+        self.max_delay              = max_delay or self.DEFAULT_MAX_DELAY
+        self.factor                 = factor or self.DEFAULT_FACTOR
+        self.jitter                 = self.DEFAULT_JITTER if jitter is None else jitter
+
+        self.start                  = None
+        self.elapsed                = 0
+        self.polls                  = 0
+
+
+    # ----------------- poll until done - raise WaitTimeoutError at the deadline
+    def until(self, poll, done):
+        _delays                     = self.delays()
+        while True:
+            _result                 = poll()
+            if done(_result):
+                self.elapsed        = time.time() - self.start
+                return _result
+            time.sleep(next(_delays))
+
+    # ----------------- sleeps between polls, the last one ending at the deadline - the clock starts now
+    def delays(self):
+        self.start                  = time.time()
+        self.elapsed                = 0
+        self.polls                  = 1
+        return self.backoff()
+
+    def backoff(self):
+        _delay                      = self.initial
+        while True:
+            self.elapsed            = time.time() - self.start
+            _remaining              = self.deadline - self.elapsed
+            if _remaining <= 0:
+                raise WaitTimeoutError('{0}: not done after {1:.0f}s and {2} polls'.format(self.what, self.elapsed, self.polls))
+
+            # the sleep before the next poll
+            self.polls              = self.polls + 1
+            yield min(_remaining, random.uniform(_delay * (1 - self.jitter), _delay))
+            _delay                  = min(self.max_delay, _delay * self.factor)
+
+    def report(self):
+        return dict(what=self.what, elapsed=round(self.elapsed, 1), polls=self.polls)
+
+
+# ----------------- ResourceNotReadyRetry - e.g. Storage and NetworkAdapters while the server is in POST
+def is_not_ready(obj):
+    for _info in ((obj or {}).get('error') or {}).get('@Message.ExtendedInfo', []):
+        if 'ResourceNotReadyRetry' in _info.get('MessageId', ''):
+            return True
+    return False
@@ -79,26 +79,29 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #Instantiating module class        
 from ansible.module_utils.basic import *
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, REDFISH_CONNECTION_ARGS, REDFISH_RESULT_ARGS, get_connection_args, set_result, set_metrics
 from ansible.module_utils.firmware import FIRMWARE
 
 class FirmwareFactsModule(object):
     def __init__(self):        
         self.connection       = None
         REDFISH_COMMON_ARGS   = dict(
-                ilo_ip        =dict(type="str", required=True),
-                ilo_username  =dict(type="str", required=True),
-                ilo_password  =dict(type="str", required=True, default=None),
+                ilo_ip        =dict(type="str", required=False),
+                ilo_username  =dict(type="str", required=False),
+                ilo_password  =dict(type="str", required=False, default=None),
                 option        =dict(type="str", required=True, choices=['firmware_inventory','component_repository', 'maintenance_window', 'install_set']),
         )
+        REDFISH_COMMON_ARGS.update(REDFISH_CONNECTION_ARGS)
+        REDFISH_COMMON_ARGS.update(REDFISH_RESULT_ARGS)
         _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True)
         REDFISH_COMMON_ARGS     = dict(
             ilo_ip              = _module.params['ilo_ip'],
             ilo_username        = _module.params['ilo_username'],
             ilo_password        = _module.params['ilo_password']
         )
+        REDFISH_COMMON_ARGS.update(get_connection_args(_module.params, _module))
 
-        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS) 
+        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS, module=_module)
 
         self.redfish_client     = _redfish.redfish_client
         self.module             = _module
@@ -131,10 +134,14 @@ def run_module():
            _fw        = firmware.install_set_collection  
            _fw_result = dict(install_set=_fw) 
 
-    result = dict(changed= False, ilo=json.dumps(_fw_result, indent=4))
+    result = set_result(dict(changed= False), 'ilo', _fw_result, _module.params, fact_name='ilo_firmware_facts')
 
-    # Logout redfish and exit
+    # Logout redfish
     _connection.logout()
+
+    # Add per-request metrics if requested - the logout included
+    set_metrics(result, _connection)
+
     _module.exit_json(**result)
 
 
@@ -0,0 +1,113 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: ilo_fleet_facts
+short_description: Retrieve system summary facts of many iLOs from a single task
+description:
+    - Retrieve the ilo_system_facts summary of every iLO in hosts, at most parallelism iLOs at once
+    - Results are returned per ilo_ip. A host that fails is reported with failed and msg, the task itself does not fail
+version_added: "1.0"
+requirements:
+    - iLO 5
+author:
+    - Dung K Hoang
+'''
+
+EXAMPLES = '''
+- name: Gather facts about all systems of the fleet
+  ilo_fleet_facts:
+    ilo_username: {{'ilo_username'}}
+    ilo_password: {{'ilo_password'}}
+    parallelism:  64
+    timeout:      30
+    hosts:
+      - ilo_ip:       {{'ilo_ip_1'}}
+      - ilo_ip:       {{'ilo_ip_2'}}
+        ilo_username: {{'other_username'}}
+        ilo_password: {{'other_password'}}
+  register: result
+- debug: var=result['systems']
+- debug: var=result['failed_hosts']
+
+'''
+
+import sys
+import json
+from redfish import RedfishClient
+from redfish.rest.v1 import ServerDownOrUnreachableError
+#Instantiating module class
+from ansible.module_utils.basic import *
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.iloRedfish import REDFISH_CONNECTION_ARGS, get_connection_args
+from ansible.module_utils.fleet import FLEET
+
+class FleetFactsModule(object):
+    def __init__(self):
+        REDFISH_COMMON_ARGS   = dict(
+                hosts         =dict(type="list", required=True, elements="dict", options=dict(
+                        ilo_ip        =dict(type="str", required=True),
+                        ilo_username  =dict(type="str", required=False, default=None),
+                        ilo_password  =dict(type="str", required=False, default=None, no_log=True)
+                )),
+                ilo_username  =dict(type="str", required=False, default=None),
+                ilo_password  =dict(type="str", required=False, default=None, no_log=True),
+                parallelism   =dict(type="int", required=False, default=FLEET.DEFAULT_PARALLELISM),
+                timeout       =dict(type="int", required=False, default=None)
+        )
+        REDFISH_COMMON_ARGS.update(REDFISH_CONNECTION_ARGS)
+        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True)
+
+        # Credentials of a host default to the task level ones
+        _hosts                  = []
+        for _host in _module.params['hosts']:
+            _hosts.append(dict(
+                ilo_ip          = _host['ilo_ip'],
+                ilo_username    = _host.get('ilo_username') or _module.params['ilo_username'],
+                ilo_password    = _host.get('ilo_password') or _module.params['ilo_password']
+            ))
+        _missing                = [_h['ilo_ip'] for _h in _hosts if _h['ilo_username'] is None or _h['ilo_password'] is None]
+        if _missing:
+            _module.fail_json(msg='ilo_username and ilo_password required for hosts: {0}'.format(', '.join(_missing)))
+
+        _connection_args        = get_connection_args(_module.params)
+        _connection_args['timeout'] = _module.params['timeout']
+
+        self.fleet              = FLEET(_hosts, connection_args=_connection_args, parallelism=_module.params['parallelism'])
+        self.module             = _module
+        if self.fleet.duplicates:
+            _module.warn('hosts listed more than once, queried once: {0}'.format(', '.join(self.fleet.duplicates)))
+
+def run_module():
+    fleetFactsModule    = FleetFactsModule()
+    _module             = fleetFactsModule.module
+
+    _systems            = fleetFactsModule.fleet.get_system_info()
+    _failed_hosts       = [_ip for _ip, _r in _systems.items() if _r['failed']]
+
+    result = dict(changed= False, systems=_systems, failed_hosts=_failed_hosts)
+
+    _module.exit_json(**result)
+
+
+
+if __name__ == "__main__":
+    run_module()
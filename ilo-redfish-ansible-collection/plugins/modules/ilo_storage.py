@@ -21,9 +21,11 @@ ANSIBLE_METADATA = {'metadata_version': '1.1',
 DOCUMENTATION = '''
 ---
 module: ilo_storage.py
-short_description: Create and delete storage
+short_description: Create and delete storage, erase physical drives
 description:
     - Create and delete storage
+    - State erase sanitizes the physical drives of data with one SmartStorageConfig action and one reboot, then
+      polls all of them together until each is complete or failed, or wait_timeout
 version_added: "1.0"
 requirements:
     - iLO 5
@@ -67,6 +69,47 @@ EXAMPLES = '''
 
    - debug: var=result['system'] 
 
+   - name: ilo storage - logical drive layout in one settings PUT and at most one reboot
+     ilo_storage:
+        ilo_ip            : "{{ilo_ip}}"
+        ilo_username      : "{{ username }}"
+        ilo_password      : "{{ password }}"
+
+        type              : SmartStorage
+        controller        : SmartArrayController
+        logical_drives:
+          - name          : old_scratch
+            state         : absent
+          - raid          : Raid1
+            physical_drives : ["1I:1:3", "1I:1:4"]
+            name          : 'data1'
+          - raid          : Raid10
+            physical_drives : ["1I:1:5", "1I:1:6", "1I:1:7", "1I:1:8"]
+            name          : 'data2'
+
+     register: result
+
+   - debug: var=result['system']['logical_drives']
+
+   - name: ilo storage - erase physical drives not in a logical drive
+     ilo_storage:
+        ilo_ip            : "{{ilo_ip}}"
+        ilo_username      : "{{ username }}"
+        ilo_password      : "{{ password }}"
+
+        type              : SmartStorage
+        controller        : SmartArrayController
+        state             : erase
+        wait_timeout      : 7200                      # Sanitize of large drives takes hours
+        data:
+          physical_drives : ["1I:1:5", "1I:1:6", "1I:1:7", "1I:1:8"]
+          erase_pattern   : SanitizeRestrictedBlockErase   # Optional - Sanitize[Un]Restricted{BlockErase,Overwrite,CryptoScramble}, OnePass, TwoPass, ThreePass
+          wait            : true                      # Optional - false returns once the erase is submitted
+
+     register: result
+
+   - debug: var=result['system']['erase']            # completed, failed and pending bays
+
 
 
 
@@ -80,29 +123,39 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #Instantiating module class        
 from ansible.module_utils.basic import *
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, REDFISH_CONNECTION_ARGS, REDFISH_RESULT_ARGS, get_connection_args, set_result, set_metrics
 from ansible.module_utils.systems import SYSTEMS
 
 class SystemFactsModule(object):
     def __init__(self):        
         self.connection       = None
         REDFISH_COMMON_ARGS   = dict(
-                ilo_ip        =dict(type="str", required=True),
-                ilo_username  =dict(type="str", required=True),
-                ilo_password  =dict(type="str", required=True, default=None),
+                ilo_ip        =dict(type="str", required=False),
+                ilo_username  =dict(type="str", required=False),
+                ilo_password  =dict(type="str", required=False, default=None),
                 type          =dict(type="str", required=False, choices=['SmartStorage','LocalStorage' ]),
                 controller    =dict(type="str", required=False, choices=['SmartArrayController','HostBusAdapter' ]),
                 state         =dict(type="str", required=False, choices=['present','absent','erase','init' ]),
-                data          =dict(type="dict", required=False, default=None)
+                data          =dict(type="dict", required=False, default=None),
+                logical_drives=dict(type="list", elements="dict", required=False, default=None, options=dict(
+                        state           =dict(type="str", required=False, default='present', choices=['present', 'absent']),
+                        raid            =dict(type="str", required=False, default=None),
+                        name            =dict(type="str", required=False, default=None),
+                        physical_drives =dict(type="list", elements="str", required=False, default=None)
+                ))
         )
-        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True)
+        REDFISH_COMMON_ARGS.update(REDFISH_CONNECTION_ARGS)
+        REDFISH_COMMON_ARGS.update(REDFISH_RESULT_ARGS)
+        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True,
+                                                mutually_exclusive=[['logical_drives', 'data'], ['logical_drives', 'state']])
         REDFISH_COMMON_ARGS     = dict(
             ilo_ip              = _module.params['ilo_ip'],
             ilo_username        = _module.params['ilo_username'],
             ilo_password        = _module.params['ilo_password']
         )
+        REDFISH_COMMON_ARGS.update(get_connection_args(_module.params, _module))
 
-        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS) 
+        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS, module=_module)
 
         self.redfish_client     = _redfish.redfish_client
         self.module             = _module
@@ -120,6 +173,9 @@ def run_module():
     _controller         = _module.params.get('controller')
     _state              = _module.params.get('state')
     _data               = _module.params.get('data')
+    _logical_drives     = _module.params.get('logical_drives')
+    _status             = False
+    _msg                = 'Nothing to do for type {0}, controller {1} and state {2}'.format(_type, _controller, _state)
 
     if _data is not None:
       _raid             = None
@@ -130,7 +186,7 @@ def run_module():
       if 'physical_drives' in _data.keys():
         _physical_drives  = _data['physical_drives']
 
-      _name             = _data['name']
+      _name             = _data.get('name')
 
     
     _sys_result = None
@@ -148,19 +204,42 @@ def run_module():
                 _sys, _status, _msg   = system.delete_logical_drive(name=_name, drive_list=_physical_drives)
                 _sys_result           = dict(storage=_sys)
 
+              # Erase physical drives - one action for all, polled together
+              if _state == 'erase':
+                _sys, _status, _msg, _erase = system.erase_physical_drives(_physical_drives, pattern=_data.get('erase_pattern'),
+                                                wait=_data.get('wait', True), check_mode=_module.check_mode)
+                _sys_result           = dict(storage=_sys, erase=_erase)
+
+            # Create and delete logical drives - one settings PUT
+            if _logical_drives is not None:
+              _sys, _status, _msg, _changes = system.apply_logical_drives(_logical_drives, check_mode=_module.check_mode)
+              _sys_result           = dict(storage=_sys, logical_drives=_changes)
+
 
           if _controller == 'HostBusAdapter':
             pass
 
-    result = dict(changed= _status, system=json.dumps(_sys_result, indent=4))
+    _changed = _status and (_logical_drives is None or bool(_sys_result['logical_drives']))
+    # Drives are changed once the erase is submitted, even when some fail or time out
+    _erase   = (_sys_result or {}).get('erase')
+    if _erase is not None:
+      _changed = _status or _sys_result['storage'] is not None
+    result = set_result(dict(changed= _changed), 'system', _sys_result, _module.params)
+
+    # Add the waits for POST or readiness if the server had to be powered on
+    if system.waits:
+        result['waits'] = system.waits
+
+    # Logout redfish
+    _connection.logout()
+
+    # Add per-request metrics if requested - the logout included
+    set_metrics(result, _connection)
 
-    # Logout redfish and exit
     if _status:
       _module.exit_json(**result)
     else:
-      _module.fail_json(msg = _msg)
-
-    _connection.logout()
+      _module.fail_json(msg = _msg, **(result if _erase is not None else {}))
 
 
 
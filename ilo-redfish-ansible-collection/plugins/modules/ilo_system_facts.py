@@ -67,6 +67,7 @@ EXAMPLES = '''
   register: result
 - debug: var=result['system']['storage']
 - debug: var=result['system']['storage']['local_storage']
+# smart_array and host_bus_adapter are keyed by controller location, e.g. 'Slot 0'
 - debug: var=result['system']['storage']['smart_array']
 - debug: var=result['system']['storage']['host_bus_adapter']
 
@@ -79,6 +80,35 @@ EXAMPLES = '''
   register: result
 - debug: var=result['system']['network']
 
+- name: Gather facts about CPU and memory in one pass
+  ilo_system_facts:
+    ilo_ip:       {{'ilo_ip'}}
+    ilo_username: {{'ilo_username'}}
+    password:     {{'ilo_password'}}
+    gather_subset:
+      - processors
+      - memory
+  register: result
+- debug: var=result['system']['processors']
+- debug: var=result['system']['memory']
+
+- name: Gather all facts but storage and network - does not power on the server
+  ilo_system_facts:
+    ilo_ip:       {{'ilo_ip'}}
+    ilo_username: {{'ilo_username'}}
+    password:     {{'ilo_password'}}
+    gather_subset: "!storage,!network"
+  register: result
+
+- name: Gather facts about CPU and memory as cached facts
+  ilo_system_facts:
+    ilo_ip:       {{'ilo_ip'}}
+    ilo_username: {{'ilo_username'}}
+    password:     {{'ilo_password'}}
+    gather_subset: processors,memory
+    set_facts:    true
+- debug: var=ilo_system_facts['processors']
+
 '''
 
 import sys
@@ -88,26 +118,40 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #Instantiating module class        
 from ansible.module_utils.basic import *
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, REDFISH_CONNECTION_ARGS, REDFISH_RESULT_ARGS, get_connection_args, set_result, set_metrics
 from ansible.module_utils.systems import SYSTEMS
+from ansible.module_utils.wait import WaitTimeoutError
 
 class SystemFactsModule(object):
     def __init__(self):        
         self.connection       = None
         REDFISH_COMMON_ARGS   = dict(
-                ilo_ip        =dict(type="str", required=True),
-                ilo_username  =dict(type="str", required=True),
-                ilo_password  =dict(type="str", required=True, default=None),
-                option        =dict(type="str", required=False, choices=['Processors','Memory','Storage','Network','EthernetInterfaces'])
+                ilo_ip        =dict(type="str", required=False),
+                ilo_username  =dict(type="str", required=False),
+                ilo_password  =dict(type="str", required=False, default=None),
+                option        =dict(type="str", required=False, choices=['Processors','Memory','Storage','Network','EthernetInterfaces']),
+                gather_subset =dict(type="list", elements="str", required=False, default=None)
         )
-        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True)
+        REDFISH_COMMON_ARGS.update(REDFISH_CONNECTION_ARGS)
+        REDFISH_COMMON_ARGS.update(REDFISH_RESULT_ARGS)
+        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True,
+                                                mutually_exclusive=[['option', 'gather_subset']])
+
+        # Check gather_subset before logging in
+        self.gather_subset      = None
+        if _module.params['gather_subset'] is not None:
+            self.gather_subset, _unknown = SYSTEMS.get_gather_subset(_module.params['gather_subset'])
+            if _unknown:
+                _module.fail_json(msg='gather_subset: unknown subset {0} - valid are all, {1}'.format(
+                    ', '.join(_unknown), ', '.join(SYSTEMS.GATHER_SUBSETS)))
         REDFISH_COMMON_ARGS     = dict(
             ilo_ip              = _module.params['ilo_ip'],
             ilo_username        = _module.params['ilo_username'],
             ilo_password        = _module.params['ilo_password']
         )
+        REDFISH_COMMON_ARGS.update(get_connection_args(_module.params, _module))
 
-        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS) 
+        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS, module=_module)
 
         self.redfish_client     = _redfish.redfish_client
         self.module             = _module
@@ -123,36 +167,57 @@ def run_module():
     # Get type of output for system: Processor, memory, Storage...
     _option         = _module.params.get('option')
     
-    if _option is not None:
-      if _option == 'Processors':
-          _sys        = system.get_processor_info()
-          _sys_result = dict(processors=_sys)
-
-      if _option == 'Memory':
-          _sys        = system.get_memory_info()  
-          _sys_result = dict(memory=_sys) 
+    try:
+      if sysFactsModule.gather_subset is not None:
+        # Several subsets from one pass
+        _sys_result = system.gather(sysFactsModule.gather_subset)
+
+      elif _option is not None:
+        if _option == 'Processors':
+            _sys        = system.get_processor_info()
+            _sys_result = dict(processors=_sys)
+
+        if _option == 'Memory':
+            _sys        = system.get_memory_info()  
+            _sys_result = dict(memory=_sys) 
       
-      if _option == 'Storage':
-          _local,_sma, _hba = system.get_storage_info()
-          _sys        = dict (
-              local_storage     = _local,
-              smart_array       = _sma,
-              host_bus_adapter  = _hba 
-          )          
-          _sys_result = dict(storage=_sys)
-
-      if _option == 'Network':
-        _sys        = system.get_network_adapter_info()
-        _sys_result = dict(network=_sys)
-
-
-    else:
-       _sys_result  = system.get_system_info()
+        if _option == 'Storage':
+            _local,_sma, _hba = system.get_storage_info()
+            _sys        = dict (
+                local_storage     = _local,
+                smart_array       = _sma,
+                host_bus_adapter  = _hba 
+            )          
+            _sys_result = dict(storage=_sys)
+
+        if _option == 'Network':
+          _sys        = system.get_network_adapter_info()
+          _sys_result = dict(network=_sys)
+
+        if _option == 'EthernetInterfaces':
+          _sys        = system.get_ethernet_info()
+          _sys_result = dict(ethernet=_sys)
+
+
+      else:
+         _sys_result  = system.get_system_info()
+    except WaitTimeoutError as exception:
+      # Server still in POST at wait_timeout
+      _connection.logout()
+      _module.fail_json(msg=str(exception), waits=system.waits)
+
+    result = set_result(dict(changed= False), 'system', _sys_result, _module.params, fact_name='ilo_system_facts')
+
+    # Add the waits for POST or readiness if the server had to be powered on
+    if system.waits:
+        result['waits'] = system.waits
+
+    # Logout redfish
+    _connection.logout()
 
-    result = dict(changed= False, system=json.dumps(_sys_result, indent=4))
+    # Add per-request metrics if requested - the logout included
+    set_metrics(result, _connection)
 
-    # Logout redfish and exit
-    _connection.logout()
     _module.exit_json(**result)
 
 
@@ -73,6 +73,45 @@ EXAMPLES = '''
   register: result
 - debug: var=result['ansible_facts']['accounts']
 
+   - name: desired service accounts - created, patched or deleted as needed, concurrently
+     ilo_user:
+        ilo_ip        : "10.1.1.7"
+        ilo_username  : "{{ username }}"
+        ilo_password  : "{{ password }}"
+
+        update_password             : on_create
+        accounts:
+          - username                : svc_backup
+            password                : "{{ svc_backup_password }}"
+            roleid                  : Operator
+          - username                : svc_monitor
+            password                : "{{ svc_monitor_password }}"
+            privileges:
+              - LoginPriv
+          - username                : old_account
+            state                   : absent
+     no_log: true
+     register: result
+- debug: var=result['accounts']
+
+   - name: rotate the password of admin on every iLO - rerun to resume, done hosts are skipped
+     ilo_user:
+        ilo_username  : admin
+        ilo_password  : "{{ old_password }}"
+
+        rotate:
+          username                  : admin
+          password                  : "{{ new_password }}"
+        hosts:
+          - ilo_ip                  : 10.1.1.7
+          - ilo_ip                  : 10.1.1.8
+        parallelism                 : 64
+        rate                        : 20
+        checkpoint                  : ~/rotation_2021q3.json
+     no_log: true
+     register: result
+- debug: var=result['failed_hosts']
+
    - name: delete user with state = absent
      ilo_user:
         ilo_ip        : "10.1.1.7"
@@ -92,47 +131,136 @@ from redfish.rest.v1 import ServerDownOrUnreachableError
 #Instantiating module class        
 from ansible.module_utils.basic import *
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.iloRedfish import RedFishModule
+from ansible.module_utils.iloRedfish import RedFishModule, REDFISH_CONNECTION_ARGS, REDFISH_RESULT_ARGS, get_connection_args, set_result, set_metrics
 from ansible.module_utils.users import USERS
+from ansible.module_utils.fleet import FLEET
 
 class UsersModule(object):
     def __init__(self):        
         self.connection        = None
         REDFISH_COMMON_ARGS   = dict(
-                ilo_ip        = dict(type="str", required=True),
-                ilo_username  = dict(type="str", required=True),
-                ilo_password  = dict(type="str", required=True, default=None),
-                state         = dict(type="str", required=True, choices=['present', 'absent']),
-                data          = dict(type="dict", required=False, default=None)
+                ilo_ip        = dict(type="str", required=False),
+                ilo_username  = dict(type="str", required=False),
+                ilo_password  = dict(type="str", required=False, default=None),
+                state         = dict(type="str", required=False, choices=['present', 'absent']),
+                data          = dict(type="dict", required=False, default=None),
+                accounts      = dict(type="list", elements="dict", required=False, default=None, options=dict(
+                                    username   = dict(type="str", required=True),
+                                    password   = dict(type="str", required=False, no_log=True),
+                                    loginname  = dict(type="str", required=False),
+                                    roleid     = dict(type="str", required=False),
+                                    privileges = dict(type="list", elements="str", required=False),
+                                    state      = dict(type="str", required=False, default='present', choices=['present', 'absent'])
+                                )),
+                update_password = dict(type="str", required=False, default='on_create', choices=['always', 'on_create']),
+                rotate        = dict(type="dict", required=False, default=None, options=dict(
+                                    username   = dict(type="str", required=True),
+                                    password   = dict(type="str", required=True, no_log=True)
+                                )),
+                hosts         = dict(type="list", elements="dict", required=False, default=None, options=dict(
+                                    ilo_ip       = dict(type="str", required=True),
+                                    ilo_username = dict(type="str", required=False, default=None),
+                                    ilo_password = dict(type="str", required=False, default=None, no_log=True)
+                                )),
+                parallelism   = dict(type="int", required=False, default=FLEET.DEFAULT_PARALLELISM),
+                rate          = dict(type="float", required=False, default=None),
+                checkpoint    = dict(type="path", required=False, default=None),
+                timeout       = dict(type="int", required=False, default=None)
         )
 
-        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True)
+        REDFISH_COMMON_ARGS.update(REDFISH_CONNECTION_ARGS)
+        REDFISH_COMMON_ARGS.pop('wait_timeout')             # accounts are never behind POST - nothing to wait for
+        REDFISH_COMMON_ARGS.update(REDFISH_RESULT_ARGS)
+        _module                 = AnsibleModule(argument_spec=REDFISH_COMMON_ARGS, supports_check_mode=True,
+                                                mutually_exclusive=[['accounts', 'state'], ['accounts', 'data'], ['rotate', 'state'],
+                                                                    ['rotate', 'data'], ['rotate', 'accounts']],
+                                                required_one_of=[['accounts', 'state', 'rotate']],
+                                                required_together=[['state', 'data'], ['rotate', 'hosts']])
+        self.module             = _module
+        self.fleet              = None
+        self.redfish_client     = None
+
+        # Rotation - many iLOs, each host logs in on its own
+        if _module.params['rotate'] is not None:
+            _hosts              = []
+            for _host in _module.params['hosts']:
+                _hosts.append(dict(
+                    ilo_ip      = _host['ilo_ip'],
+                    ilo_username= _host.get('ilo_username') or _module.params['ilo_username'],
+                    ilo_password= _host.get('ilo_password') or _module.params['ilo_password']
+                ))
+            _missing            = [_h['ilo_ip'] for _h in _hosts if _h['ilo_username'] is None or _h['ilo_password'] is None]
+            if _missing:
+                _module.fail_json(msg='ilo_username and ilo_password required for hosts: {0}'.format(', '.join(_missing)))
+
+            _connection_args    = get_connection_args(_module.params)
+            _connection_args['timeout'] = _module.params['timeout']
+            self.fleet          = FLEET(_hosts, connection_args=_connection_args, parallelism=_module.params['parallelism'])
+            if self.fleet.duplicates:
+                _module.warn('hosts listed more than once, rotated once: {0}'.format(', '.join(self.fleet.duplicates)))
+            return
+
         REDFISH_COMMON_ARGS     = dict(
             ilo_ip              = _module.params['ilo_ip'],
             ilo_username        = _module.params['ilo_username'],
             ilo_password        = _module.params['ilo_password']
         )
+        REDFISH_COMMON_ARGS.update(get_connection_args(_module.params, _module))
 
-        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS) 
+        _redfish                = RedFishModule(module_args=REDFISH_COMMON_ARGS, module=_module)
 
         self.redfish_client     = _redfish.redfish_client
-        self.module             = _module
+
+def rotate_password(usersModule):
+    _module         = usersModule.module
+    _rotate         = _module.params['rotate']
+
+    _hosts          = usersModule.fleet.rotate_password(_rotate['username'], _rotate['password'], checkpoint=_module.params['checkpoint'],
+                                                        rate=_module.params['rate'], check_mode=_module.check_mode)
+    _failed_hosts   = [_ip for _ip, _r in _hosts.items() if _r['failed']]
+    _skipped_hosts  = [_ip for _ip, _r in _hosts.items() if _r.get('skipped')]
+
+    result          = dict(changed=any(_r.get('changed') for _r in _hosts.values()), hosts=_hosts,
+                           failed_hosts=_failed_hosts, skipped_hosts=_skipped_hosts)
+    if _failed_hosts:
+        _module.fail_json(msg='Password of {0} not rotated on {1} of {2} hosts'.format(_rotate['username'], len(_failed_hosts), len(_hosts)), **result)
+    _module.exit_json(**result)
 
 def run_module():
 
     usersModule     = UsersModule()
     _module         = usersModule.module
+    if usersModule.fleet is not None:
+        rotate_password(usersModule)
+        return
+
     _connection     = usersModule.redfish_client
 
     users           = USERS(_connection)
 
     _state          = _module.params.get('state')
     _data           = _module.params.get('data')
+    _accounts       = _module.params.get('accounts')
 
     _msg            = ''
     _value          = None
     _status         = False
 
+    if _accounts is not None:
+        # One crawl of the accounts, then only the requests that change something
+        try:
+            _changes  = users.reconcile(_accounts, update_password=_module.params['update_password'], check_mode=_module.check_mode)
+        except ValueError as exception:
+            _connection.logout()
+            _module.fail_json(msg=str(exception))
+        _failed       = [_c for _c in _changes if _c.get('status') is False]
+        _status       = not _failed
+        _msg          = ', '.join('{0} {1}: {2}'.format(_c['action'], _c['username'], _c['msg']) for _c in _failed)
+
+        # Passwords stay out of the result
+        _value        = [USERS.describe(_c) for _c in _changes]
+        result        = set_result(dict(changed=bool(_changes)), 'accounts', _value, _module.params)
+
     if _state == 'present': 
         _roleid       = None
         _privileges   = []
@@ -148,19 +276,25 @@ def run_module():
         # Create user   username, password, roleid, loginname, privileges
         _new, _status, _msg  = users.create_user(username=_username, password=_password, roleid=_roleid, loginname=_loginname,privileges= _privileges )    
         
-        result = dict(changed= _status, user=json.dumps(_new, indent=4))
+        result = set_result(dict(changed= _status), 'user', _new, _module.params)
 
 
     if _state == 'absent': 
         _username             = _data['username']
         _resp, _status, _msg  = users.delete_user(_username)
-        result                = dict(changed=_status, user=json.dumps(_resp, indent=4))
+        result                = set_result(dict(changed=_status), 'user', _resp, _module.params)
         
       
-    # Logout redfish and exit
+    # Logout redfish
     _connection.logout()
+
+    # Add per-request metrics if requested - the logout included
+    set_metrics(result, _connection)
+
     if _status:
       _module.exit_json(**result)
+    elif _accounts is not None:
+      _module.fail_json(msg = _msg, **result)
     else:
       _module.fail_json(msg = _msg)
     
@@ -0,0 +1,72 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+'''
+Fixtures of the unit tests - modules and helpers run against the mock iLO of tools/mock_ilo
+
+    - ilo                           : a mock iLO started for the test, stopped after it
+    - module_args                   : ilo_ip, ilo_username and ilo_password of that mock iLO
+    - run                           : run a module with module_args and more arguments, return its result dict
+'''
+
+import os
+import sys
+import warnings
+
+import pytest
+
+
+TOOLS_DIR                       = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'tools', 'mock_ilo')
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+# run_module puts plugins/module_utils under ansible.module_utils, as ANSIBLE_MODULE_UTILS does
+import run_module
+import mock_ilo
+
+
+#-------------------------------------------------
+
+
+@pytest.fixture
+def ilo(request):
+    _options                    = getattr(request, 'param', None) or dict()
+    _server                     = mock_ilo.start(**_options)
+    yield _server
+    _server.shutdown()
+    _server.server_close()
+
+
+@pytest.fixture
+def module_args(ilo):
+    return dict(ilo_ip='127.0.0.1:{0}'.format(ilo.server_address[1]), ilo_username='admin', ilo_password='password')
+
+
+@pytest.fixture
+def run(module_args):
+    def _run(module_name, **args):
+        _args                   = dict(module_args)
+        _args.update(args)
+        return run_module.run(module_name, _args)
+    return _run
+
+
+@pytest.fixture(autouse=True)
+def no_insecure_warnings():
+    # The mock iLO certificate is self-signed
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
@@ -0,0 +1,60 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.plugins.loader import inventory_loader
+
+from ansible.module_utils.fleet import FLEET
+
+
+INVENTORY_DIR                   = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))),
+                                               'plugins', 'inventory')
+
+
+@pytest.fixture
+def parse(tmp_path):
+    inventory_loader.add_directory(INVENTORY_DIR)
+
+    def _parse(hosts):
+        _path                   = tmp_path / 'hosts.ilo_redfish.yml'
+        _path.write_text('plugin: ilo_redfish\nilo_username: admin\nilo_password: password\nhosts:\n' +
+                         ''.join('  - "{0}"\n'.format(_h) for _h in hosts))
+        _inventory              = InventoryData()
+        inventory_loader.get('ilo_redfish').parse(_inventory, DataLoader(), str(_path), cache=False)
+        return _inventory
+    return _parse
+
+
+def test_groups_and_failed_hosts(ilo, module_args, parse):
+    _inventory                  = parse([module_args['ilo_ip'], '127.0.0.1:1'])
+    assert set(_inventory.groups['ilo_failed'].hosts) == set([_inventory.hosts['127.0.0.1:1']])
+    assert 'ilo_model_proliant_dl380_gen10' in _inventory.groups
+    assert _inventory.hosts[module_args['ilo_ip']].vars['ilo_system']['Model'] == 'ProLiant DL380 Gen10'
+
+
+def test_missing_fact_skips_its_group(parse, monkeypatch):
+    _results                    = {'10.1.1.7': dict(failed=False, system=dict(Model='ProLiant DL360 Gen10', ProcessorCount=2), manager=dict())}
+    monkeypatch.setattr(FLEET, 'get_inventory', lambda self: _results)
+    _inventory                  = parse(['10.1.1.7'])
+    assert 'ilo_model_proliant_dl360_gen10' in _inventory.groups
+    assert 'ilo_processor_count_2' in _inventory.groups
+    assert not [_g for _g in _inventory.groups if _g.startswith(('ilo_bios', 'ilo_firmware'))]
@@ -0,0 +1,37 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import run_module
+
+
+@pytest.mark.parametrize('transport', ['urllib3', 'asyncio'])
+def test_wrong_password_fails_module(ilo, run, transport):
+    _result                     = run('ilo_user_facts', ilo_password='wrong', transport=transport)
+    assert _result['failed']
+    assert _result['msg'].startswith('Cannot connect to iLO')
+    assert 'exception' not in _result
+
+
+@pytest.mark.parametrize('transport', ['urllib3', 'asyncio'])
+def test_unreachable_ilo_fails_module(transport):
+    _result                     = run_module.run('ilo_system_facts', dict(ilo_ip='127.0.0.1:1', ilo_username='admin', ilo_password='password',
+                                                                          transport=transport))
+    assert _result['failed']
+    assert _result['msg'].startswith('Cannot connect to iLO 127.0.0.1:1')
+    assert 'exception' not in _result
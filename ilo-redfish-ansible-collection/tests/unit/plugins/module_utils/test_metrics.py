@@ -0,0 +1,37 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import pytest
+
+
+SESSIONS                        = '/redfish/v1/SessionService/Sessions/'
+
+
+@pytest.mark.parametrize('transport', ['urllib3', 'asyncio'])
+def test_session_create_and_delete_recorded(ilo, run, transport):
+    _result                     = run('ilo_user_facts', redfish_metrics=True, transport=transport)
+    _requests                   = _result['redfish_metrics']['requests']
+    assert [(_r['method'], _r['uri'], _r['status']) for _r in _requests if _r['method'] == 'POST'] == [('POST', SESSIONS, 201)]
+    assert _requests[-1]['method'] == 'DELETE' and _requests[-1]['uri'].startswith(SESSIONS)
+    assert _requests[-1]['status'] == 200
+    assert ilo.mock.sessions == {}
+
+
+def test_query_string_recorded(ilo, run):
+    _result                     = run('ilo_manager_facts', redfish_metrics=True)
+    _uris                       = [_r['uri'] for _r in _result['redfish_metrics']['requests']]
+    assert any('?$expand=.&$select=' in _uri for _uri in _uris), _uris
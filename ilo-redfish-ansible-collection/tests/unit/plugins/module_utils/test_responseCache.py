@@ -0,0 +1,49 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import os
+
+from ansible.module_utils.responseCache import ResponseCache
+
+
+def entry_sizes(cache_dir):
+    return sum(os.path.getsize(os.path.join(cache_dir, _n)) for _n in os.listdir(cache_dir) if _n.endswith('.json'))
+
+
+def test_size_kept_across_opens(tmp_path, monkeypatch):
+    _cache                      = ResponseCache(cache_dir=str(tmp_path))
+    _cache.store('10.1.1.7', '/redfish/v1/Systems/1', 'W/"1"', 'x' * 1000)
+    _cache.store('10.1.1.7', '/redfish/v1/Systems/1', 'W/"2"', 'y' * 500)
+    assert _cache.size == entry_sizes(str(tmp_path))
+
+    # Opened again - the size file is read, the entries are not walked
+    monkeypatch.setattr(ResponseCache, 'evict', lambda self: None)
+    assert ResponseCache(cache_dir=str(tmp_path)).size == entry_sizes(str(tmp_path))
+
+
+def test_evicts_least_recently_used_over_max_size(tmp_path):
+    _cache                      = ResponseCache(cache_dir=str(tmp_path), max_size=1)
+    _body                       = 'x' * (300 * 1024)
+    for _i in range(3):
+        _cache.store('10.1.1.7', '/redfish/v1/Chassis/{0}'.format(_i), 'W/"1"', _body)
+        os.utime(_cache.get_path('10.1.1.7', '/redfish/v1/Chassis/{0}'.format(_i)), (_i, _i))
+    assert _cache.load('10.1.1.7', '/redfish/v1/Chassis/0') is not None
+
+    _cache.store('10.1.1.7', '/redfish/v1/Chassis/3', 'W/"1"', _body)
+    assert _cache.load('10.1.1.7', '/redfish/v1/Chassis/0') is None
+    assert _cache.load('10.1.1.7', '/redfish/v1/Chassis/3') is not None
+    assert _cache.size == entry_sizes(str(tmp_path)) <= _cache.max_size * ResponseCache.LOW_WATER
@@ -0,0 +1,85 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from ansible.module_utils.sessions import SessionCache
+
+
+ACCOUNTS                        = '/redfish/v1/AccountService/Accounts/'
+
+
+def acquire(cache, module_args, password=None):
+    return cache.acquire('https://' + module_args['ilo_ip'], module_args['ilo_ip'], module_args['ilo_username'],
+                         password or module_args['ilo_password'])
+
+
+def test_reused_within_ttl(ilo, module_args, tmp_path):
+    _cache                      = SessionCache(cache_dir=str(tmp_path))
+    _first, _reused             = acquire(_cache, module_args)
+    assert not _reused
+    _cache.release(module_args['ilo_ip'], module_args['ilo_username'])
+
+    _second, _reused            = acquire(SessionCache(cache_dir=str(tmp_path)), module_args)
+    assert _reused
+    assert _second.session_key == _first.session_key
+    assert ilo.mock.stats['sessions_opened'] == 1
+
+
+def test_session_in_use_outlives_ttl(ilo, module_args, tmp_path):
+    # Module A runs longer than the ttl while module B starts and evicts
+    _cache_a                    = SessionCache(cache_dir=str(tmp_path), ttl=1)
+    _client_a, _                = acquire(_cache_a, module_args)
+    time.sleep(1.5)
+
+    _cache_b                    = SessionCache(cache_dir=str(tmp_path), ttl=1)
+    _client_b, _reused          = acquire(_cache_b, module_args)
+    assert not _reused
+    assert _client_a.get(ACCOUNTS).status == 200
+
+    # A's session was replaced in the cache - logged out when A is done, B's is kept
+    _cache_a.release(module_args['ilo_ip'], module_args['ilo_username'])
+    assert _client_a.session_key not in ilo.mock.sessions
+    assert _client_b.session_key in ilo.mock.sessions
+    _cache_b.release(module_args['ilo_ip'], module_args['ilo_username'])
+
+
+def test_expired_session_logged_out_on_evict(ilo, module_args, tmp_path):
+    _cache                      = SessionCache(cache_dir=str(tmp_path), ttl=1)
+    _client, _                  = acquire(_cache, module_args)
+    _cache.release(module_args['ilo_ip'], module_args['ilo_username'])
+    time.sleep(1.5)
+
+    _cache.evict()
+    assert _client.session_key not in ilo.mock.sessions
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_other_password_logs_out_old_session(ilo, module_args, tmp_path):
+    _cache                      = SessionCache(cache_dir=str(tmp_path))
+    _old, _                     = acquire(_cache, module_args)
+    _cache.release(module_args['ilo_ip'], module_args['ilo_username'])
+
+    _new, _reused               = acquire(_cache, module_args, password='password')
+    assert _reused
+    _cache.release(module_args['ilo_ip'], module_args['ilo_username'])
+
+    ilo.mock.passwords[module_args['ilo_username']] = 'rotated'
+    _new, _reused               = acquire(_cache, module_args, password='rotated')
+    assert not _reused
+    assert _old.session_key not in ilo.mock.sessions
+    _cache.release(module_args['ilo_ip'], module_args['ilo_username'])
@@ -0,0 +1,35 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ansible.module_utils.systems import SYSTEMS
+
+
+@pytest.mark.parametrize('values, subsets', [
+    (['all'],                       ['summary', 'processors', 'memory', 'storage', 'network', 'ethernet']),
+    (['memory', 'processors'],      ['processors', 'memory']),
+    (['!storage', '!network'],      ['summary', 'processors', 'memory', 'ethernet']),
+    (['all', '!storage'],           ['summary', 'processors', 'memory', 'network', 'ethernet']),
+    ([' Memory '],                  ['memory']),
+])
+def test_get_gather_subset(values, subsets):
+    assert SYSTEMS.get_gather_subset(values) == (subsets, [])
+
+
+def test_get_gather_subset_unknown():
+    assert SYSTEMS.get_gather_subset(['memory', '!disks', 'cpu'])[1] == ['cpu', 'disks']
@@ -0,0 +1,63 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import run_module
+
+from ansible.module_utils.fleet import FLEET
+
+
+def run_fleet(hosts, **args):
+    # Task level credentials, no ilo_ip - ilo_fleet_facts takes hosts instead
+    _args                       = dict(hosts=hosts, ilo_username='admin', ilo_password='password')
+    _args.update(args)
+    return run_module.run('ilo_fleet_facts', _args)
+
+
+def test_duplicates_queried_once_and_failed_hosts(ilo, module_args):
+    _ilo_ip                     = module_args['ilo_ip']
+    _other_name                 = _ilo_ip.replace('127.0.0.1', 'localhost')       # same mock iLO under another ilo_ip
+    _result                     = run_fleet([
+        dict(ilo_ip=_ilo_ip),
+        dict(ilo_ip='127.0.0.1:1'),
+        dict(ilo_ip=_ilo_ip),
+        dict(ilo_ip=_other_name, ilo_password='wrong')
+    ], timeout=5)
+    assert not _result.get('failed'), _result
+
+    # One query per ilo_ip
+    assert sorted(_result['systems']) == sorted([_ilo_ip, '127.0.0.1:1', _other_name])
+    assert ilo.mock.stats['sessions_opened'] == 1
+
+    # One unreachable iLO and one rejected login do not fail the others
+    assert sorted(_result['failed_hosts']) == sorted(['127.0.0.1:1', _other_name])
+    assert _result['systems'][_ilo_ip]['system']['Model'] == 'ProLiant DL380 Gen10'
+    assert _result['systems']['127.0.0.1:1']['msg']
+    assert ilo.mock.sessions == {}
+
+
+def test_missing_credentials_fail_before_any_query(ilo, module_args):
+    _result                     = run_fleet([dict(ilo_ip=module_args['ilo_ip'])], ilo_username=None, ilo_password=None)
+    assert _result['failed']
+    assert module_args['ilo_ip'] in _result['msg']
+    assert ilo.mock.stats['requests'] == 0
+
+
+def test_duplicates_reported_once():
+    _hosts, _duplicates         = FLEET.get_unique_hosts([dict(ilo_ip='10.1.1.7', ilo_username='a'), dict(ilo_ip='10.1.1.8'),
+                                                          dict(ilo_ip='10.1.1.7', ilo_username='b'), dict(ilo_ip='10.1.1.7')])
+    assert _hosts == [dict(ilo_ip='10.1.1.7', ilo_username='a'), dict(ilo_ip='10.1.1.8')]
+    assert _duplicates == ['10.1.1.7']
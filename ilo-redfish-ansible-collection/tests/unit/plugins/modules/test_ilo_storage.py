@@ -0,0 +1,82 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+import pytest
+
+
+CONFIG                          = '/redfish/v1/systems/1/smartstorageconfig'
+SETTINGS                        = '/redfish/v1/systems/1/smartstorageconfig/settings'
+
+
+@pytest.fixture
+def apply(run):
+    def _apply(logical_drives, **args):
+        return run('ilo_storage', result_format='native', type='SmartStorage', controller='SmartArrayController',
+                   logical_drives=logical_drives, **args)
+    return _apply
+
+
+def put_count(ilo):
+    return ilo.mock.stats['by_method'].get('PUT', 0)
+
+
+def test_one_put_for_deletes_and_creates(ilo, apply):
+    _os_volume                  = ilo.mock.tree[CONFIG]['LogicalDrives'][0]
+    _result                     = apply([dict(name='os_volume', state='absent'),
+                                         dict(name='data', raid='Raid1', physical_drives=['1I:1:5', '1I:1:6']),
+                                         dict(name='logs', raid='Raid0', physical_drives=['1I:1:7'])])
+    assert not _result.get('failed'), _result
+    assert [_c['action'] for _c in _result['system']['logical_drives']] == ['delete', 'create', 'create']
+    assert put_count(ilo) == 1
+
+    # Kept, then deleted, then created
+    _settings                   = ilo.mock.tree[SETTINGS]
+    assert _settings['LogicalDrives'] == [
+        dict(Actions=[dict(Action='LogicalDriveDelete')], VolumeUniqueIdentifier=_os_volume['VolumeUniqueIdentifier']),
+        dict(Raid='Raid1', DataDrives=['1I:1:5', '1I:1:6'], LogicalDriveName='data'),
+        dict(Raid='Raid0', DataDrives=['1I:1:7'], LogicalDriveName='logs')
+    ]
+    assert _settings['DataGuard'] == 'Disabled'
+
+
+def test_existing_logical_drive_kept_in_body(ilo, apply):
+    _os_volume                  = dict(ilo.mock.tree[CONFIG]['LogicalDrives'][0])
+    _result                     = apply([dict(name='os_volume', raid='Raid1', physical_drives=['1I:1:1', '1I:1:2']),
+                                         dict(name='data', raid='Raid1', physical_drives=['1I:1:5', '1I:1:6'])])
+    assert [(_c['action'], _c['name']) for _c in _result['system']['logical_drives']] == [('create', 'data')]
+    assert ilo.mock.tree[SETTINGS]['LogicalDrives'] == [_os_volume, dict(Raid='Raid1', DataDrives=['1I:1:5', '1I:1:6'], LogicalDriveName='data')]
+
+
+def test_already_as_specified_sends_nothing(ilo, apply):
+    _result                     = apply([dict(name='os_volume', raid='Raid1', physical_drives=['1I:1:1', '1I:1:2'])])
+    assert not _result.get('failed'), _result
+    assert not _result['changed']
+    assert put_count(ilo) == 0
+
+
+def test_check_mode_sends_nothing(ilo, apply):
+    _result                     = apply([dict(name='data', raid='Raid1', physical_drives=['1I:1:5', '1I:1:6'])], _ansible_check_mode=True)
+    assert _result['changed']
+    assert put_count(ilo) == 0
+
+
+def test_drive_in_use_fails_before_put(ilo, apply):
+    _result                     = apply([dict(name='data', raid='Raid1', physical_drives=['1I:1:5', '1I:1:6']),
+                                         dict(name='more', raid='Raid1', physical_drives=['1I:1:2', '1I:1:8'])])
+    assert _result['failed']
+    assert '1I:1:2' in _result['msg']
+    assert put_count(ilo) == 0
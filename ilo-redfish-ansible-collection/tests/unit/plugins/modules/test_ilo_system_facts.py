@@ -0,0 +1,43 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+
+def get_uris(result):
+    return [_r['uri'].split('?')[0] for _r in result['redfish_metrics']['requests'] if _r['method'] == 'GET']
+
+
+def test_gather_subset_walks_each_collection_once(ilo, run):
+    _result                     = run('ilo_system_facts', result_format='native', redfish_metrics=True, gather_subset=['summary', 'processors'])
+    assert not _result.get('failed'), _result
+    assert sorted(_result['system']) == ['processors', 'summary']
+
+    # summary and processors both read Processors - one walk with the union of their properties
+    _uris                       = get_uris(_result)
+    assert _uris == ['/redfish/v1/Systems', '/redfish/v1/Systems/1/Processors/', '/redfish/v1/Systems/1/EthernetInterfaces/']
+
+
+def test_gather_subset_exclusions(ilo, run):
+    _result                     = run('ilo_system_facts', result_format='native', redfish_metrics=True, gather_subset=['!storage', '!network'])
+    assert sorted(_result['system']) == ['ethernet', 'memory', 'processors', 'summary']
+    assert not [_u for _u in get_uris(_result) if 'Storage' in _u or 'NetworkAdapters' in _u]
+
+
+def test_unknown_subset_fails_before_login(ilo, run):
+    _result                     = run('ilo_system_facts', gather_subset=['processors', 'disks'])
+    assert _result['failed']
+    assert 'disks' in _result['msg']
+    assert ilo.mock.stats['sessions_opened'] == 0
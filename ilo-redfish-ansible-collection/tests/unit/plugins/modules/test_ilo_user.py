@@ -0,0 +1,70 @@
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+
+# -*- coding: utf-8 -*-
+
+
+ACCOUNTS                        = [
+    dict(username='svc_backup', password='Backup-Pass-1', roleid='Operator'),
+    dict(username='svc_read',   password='Read-Pass-1',   roleid='ReadOnly'),
+    dict(username='monitor',    state='absent'),
+]
+
+
+def test_accounts_diff(ilo, run):
+    _result                     = run('ilo_user', result_format='native', accounts=ACCOUNTS)
+    assert not _result.get('failed'), _result
+    assert _result['changed']
+    assert sorted((_c['username'], _c['action']) for _c in _result['accounts']) == \
+        [('monitor', 'delete'), ('svc_backup', 'create'), ('svc_read', 'create')]
+    assert ilo.mock.passwords['svc_backup'] == 'Backup-Pass-1'
+    assert 'monitor' not in ilo.mock.passwords
+
+
+def test_accounts_idempotent(ilo, run):
+    run('ilo_user', result_format='native', accounts=ACCOUNTS)
+    _result                     = run('ilo_user', result_format='native', accounts=ACCOUNTS)
+    assert not _result.get('failed'), _result
+    assert not _result['changed']
+    assert _result['accounts'] == []
+
+
+def test_accounts_patch_only_what_differs(ilo, run):
+    run('ilo_user', result_format='native', accounts=ACCOUNTS)
+    _accounts                   = [dict(ACCOUNTS[0], roleid='ReadOnly')] + ACCOUNTS[1:]
+    _result                     = run('ilo_user', result_format='native', accounts=_accounts)
+    assert [(_c['username'], _c['action']) for _c in _result['accounts']] == [('svc_backup', 'patch')]
+    assert not _result['accounts'][0]['password']
+
+
+def test_update_password_always(ilo, run):
+    run('ilo_user', result_format='native', accounts=ACCOUNTS)
+    _result                     = run('ilo_user', result_format='native', accounts=ACCOUNTS, update_password='always')
+    assert _result['changed']
+    assert sorted(_c['username'] for _c in _result['accounts']) == ['svc_backup', 'svc_read']
+
+
+def test_duplicate_usernames_rejected(ilo, run):
+    _result                     = run('ilo_user', result_format='native', accounts=ACCOUNTS + [dict(username='svc_read', state='absent')])
+    assert _result['failed']
+    assert 'svc_read' in _result['msg']
+    assert 'svc_backup' not in ilo.mock.passwords
+
+
+def test_create_without_password_rejected(ilo, run):
+    _result                     = run('ilo_user', result_format='native', accounts=[dict(username='svc_new', roleid='ReadOnly')] + ACCOUNTS)
+    assert _result['failed']
+    assert 'svc_new' in _result['msg']
+    assert 'svc_backup' not in ilo.mock.passwords
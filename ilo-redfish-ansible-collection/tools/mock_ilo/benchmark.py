@@ -0,0 +1,259 @@
+#!/usr/bin/python
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+'''
+Benchmark of the module run_module() paths against the mock iLO.
+
+    - CASES                         : module and arguments of every measured path
+    - run_case                      : run one path in a child process against a fresh mock iLO
+    - compare                       : flag cases whose request count or wall time grew against a previous result file
+
+    Per case:
+    - wall_time_ms                  : median over --repeat runs of the run_module() call
+    - requests / by_method          : requests served by the mock, login and logout included
+    - bytes_sent / bytes_received   : response and request bodies seen by the mock
+    - peak_rss_kb                   : peak resident set size of the child process
+
+Usage:
+    python benchmark.py --latency 20 --repeat 3 --output before.json
+    python benchmark.py --latency 20 --repeat 3 --output after.json --compare before.json
+    python benchmark.py --connection max_concurrency=1 --case ilo_system_facts:Storage
+'''
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import mock_ilo
+
+
+CREDENTIALS                     = dict(ilo_username='admin', ilo_password='password')
+
+CASES                           = [
+    ('ilo_system_facts',                        'ilo_system_facts',     dict()),
+    ('ilo_system_facts:Processors',             'ilo_system_facts',     dict(option='Processors')),
+    ('ilo_system_facts:Memory',                 'ilo_system_facts',     dict(option='Memory')),
+    ('ilo_system_facts:Storage',                'ilo_system_facts',     dict(option='Storage')),
+    ('ilo_system_facts:Network',                'ilo_system_facts',     dict(option='Network')),
+    ('ilo_system_facts:EthernetInterfaces',     'ilo_system_facts',     dict(option='EthernetInterfaces')),
+    ('ilo_firmware_facts:firmware_inventory',   'ilo_firmware_facts',   dict(option='firmware_inventory')),
+    ('ilo_firmware_facts:component_repository', 'ilo_firmware_facts',   dict(option='component_repository')),
+    ('ilo_firmware_facts:maintenance_window',   'ilo_firmware_facts',   dict(option='maintenance_window')),
+    ('ilo_firmware_facts:install_set',          'ilo_firmware_facts',   dict(option='install_set')),
+    ('ilo_user_facts',                          'ilo_user_facts',       dict()),
+    ('ilo_storage:present',                     'ilo_storage',          dict(type='SmartStorage', controller='SmartArrayController', state='present',
+                                                                             data=dict(name='bench', raid='Raid5', physical_drives=['1I:1:3', '1I:1:4', '1I:1:5']))),
+    ('ilo_storage:absent',                      'ilo_storage',          dict(type='SmartStorage', controller='SmartArrayController', state='absent',
+                                                                             data=dict(name='os_volume'))),
+]
+
+WALL_TOLERANCE                  = 0.20                  # wall time growth reported as a regression
+
+
+#-------------------------------------------------
+
+
+def run_child(module_name, args):
+    '''
+    Child side - run the module once and report timing and peak RSS on stdout
+    '''
+    import importlib
+    import run_module
+
+    # Import cost is not part of the measured path
+    importlib.import_module(module_name)
+
+    _start                      = time.time()
+    _result                     = run_module.run(module_name, args)
+    _elapsed                    = time.time() - _start
+
+    _rss                        = None
+    if resource is not None:
+        _rss                    = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            _rss                = _rss // 1024      # bytes on macOS, KB elsewhere
+
+    return dict(
+        wall_time_ms            = round(_elapsed * 1000, 1),
+        peak_rss_kb             = _rss,
+        failed                  = bool(_result.get('failed')),
+        msg                     = _result.get('msg')
+    )
+
+
+def run_case(name, module_name, args, latency, repeat, connection, options):
+    '''
+    Parent side - a fresh mock iLO per run so that writes do not leak between runs
+    '''
+    _runs                       = []
+    for _i in range(repeat):
+        _server                 = mock_ilo.start(latency=latency, **options)
+        _args                   = dict(CREDENTIALS, ilo_ip='127.0.0.1:{0}'.format(_server.server_address[1]))
+        _args.update(args)
+        _args.update(connection)
+        try:
+            _proc               = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', module_name, json.dumps(_args)],
+                                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        finally:
+            _server.shutdown()
+            _server.server_close()
+
+        try:
+            _run                = json.loads(_proc.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            _lines              = _proc.stderr.strip().splitlines()
+            _run                = dict(wall_time_ms=None, peak_rss_kb=None, failed=True, msg=_lines[-1] if _lines else 'no output')
+
+        _stats                  = _server.mock.stats
+        _run.update(
+            requests            = _stats['requests'],
+            by_method           = _stats['by_method'],
+            bytes_sent          = _stats['bytes_sent'],
+            bytes_received      = _stats['bytes_received'],
+            sessions_opened     = _stats['sessions_opened']
+        )
+        _runs.append(_run)
+
+    _walls                      = sorted(_r['wall_time_ms'] for _r in _runs if _r['wall_time_ms'] is not None)
+    _last                       = _runs[-1]
+    return dict(
+        name                    = name,
+        module                  = module_name,
+        args                    = args,
+        wall_time_ms            = _walls[len(_walls) // 2] if _walls else None,
+        wall_time_runs_ms       = [_r['wall_time_ms'] for _r in _runs],
+        requests                = _last['requests'],
+        by_method               = _last['by_method'],
+        bytes_sent              = _last['bytes_sent'],
+        bytes_received          = _last['bytes_received'],
+        sessions_opened         = _last['sessions_opened'],
+        peak_rss_kb             = max(_r['peak_rss_kb'] or 0 for _r in _runs) or None,
+        failed                  = _last['failed'],
+        msg                     = _last['msg'] if _last['failed'] else None
+    )
+
+
+def get_version():
+    _collection                 = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'], cwd=_collection,
+                                       stderr=subprocess.STDOUT, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current, tolerance=WALL_TOLERANCE):
+    '''
+    Return the list of regressions - more requests, more bytes or wall time beyond tolerance
+    '''
+    _old                        = dict((_c['name'], _c) for _c in previous['cases'])
+    _regressions                = []
+    _lines                      = ['{0:44} {1:>17} {2:>21} {3:>21}'.format('case', 'requests', 'wall ms', 'bytes sent')]
+    for _case in current['cases']:
+        _prev                   = _old.get(_case['name'])
+        if _prev is None:
+            continue
+        _lines.append('{0:44} {1:>8} -> {2:<6} {3:>10} -> {4:<8} {5:>10} -> {6:<8}'.format(
+            _case['name'], _prev['requests'], _case['requests'], str(_prev['wall_time_ms']), str(_case['wall_time_ms']),
+            _prev['bytes_sent'], _case['bytes_sent']))
+
+        if _case['failed'] and not _prev['failed']:
+            _regressions.append('{0}: now fails - {1}'.format(_case['name'], _case['msg']))
+        if _case['requests'] > _prev['requests']:
+            _regressions.append('{0}: {1} requests, was {2}'.format(_case['name'], _case['requests'], _prev['requests']))
+        if _case['bytes_sent'] > _prev['bytes_sent']:
+            _regressions.append('{0}: {1} bytes, was {2}'.format(_case['name'], _case['bytes_sent'], _prev['bytes_sent']))
+        if _prev['wall_time_ms'] and _case['wall_time_ms'] and _case['wall_time_ms'] > _prev['wall_time_ms'] * (1 + tolerance):
+            _regressions.append('{0}: {1} ms, was {2} ms'.format(_case['name'], _case['wall_time_ms'], _prev['wall_time_ms']))
+
+    print('\n'.join(_lines))
+    return _regressions
+
+
+def parse_values(values):
+    _values                     = dict()
+    for _value in values or []:
+        _key, _, _raw           = _value.partition('=')
+        try:
+            _values[_key]       = json.loads(_raw)
+        except ValueError:
+            _values[_key]       = _raw
+    return _values
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        print(json.dumps(run_child(sys.argv[2], json.loads(sys.argv[3]))))
+        return
+
+    _parser                     = argparse.ArgumentParser(description='Benchmark ilo_* modules against the mock iLO')
+    _parser.add_argument('--latency', type=float, default=20, help='milliseconds added to every request')
+    _parser.add_argument('--repeat', type=int, default=3)
+    _parser.add_argument('--case', action='append', help='case name, repeatable - default all')
+    _parser.add_argument('--connection', action='append', help='key=value added to every module call, e.g. max_concurrency=1')
+    _parser.add_argument('--mock', action='append', help='key=value passed to the mock, e.g. expand=false')
+    _parser.add_argument('--output', default='benchmark.json')
+    _parser.add_argument('--compare', default=None, help='previous result file')
+    _parser.add_argument('--tolerance', type=float, default=WALL_TOLERANCE)
+    _args                       = _parser.parse_args()
+
+    _connection                 = parse_values(_args.connection)
+    _options                    = parse_values(_args.mock)
+    _cases                      = [_c for _c in CASES if not _args.case or _c[0] in _args.case]
+
+    _results                    = []
+    for _name, _module, _module_args in _cases:
+        _result                 = run_case(_name, _module, _module_args, _args.latency / 1000.0, _args.repeat, _connection, _options)
+        _results.append(_result)
+        print('{0:44} {1:>5} requests {2:>9} ms {3:>9} bytes {4:>8} KB{5}'.format(
+            _name, _result['requests'], str(_result['wall_time_ms']), _result['bytes_sent'], str(_result['peak_rss_kb']),
+            '  FAILED: {0}'.format(_result['msg']) if _result['failed'] else ''))
+
+    _report                     = dict(
+        version                 = get_version(),
+        created                 = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        python                  = platform.python_version(),
+        latency_ms              = _args.latency,
+        repeat                  = _args.repeat,
+        connection              = _connection,
+        mock                    = _options,
+        cases                   = _results
+    )
+    with open(_args.output, 'w') as _f:
+        json.dump(_report, _f, indent=2, sort_keys=True)
+    print('Results written to {0}'.format(_args.output))
+
+    if _args.compare:
+        with open(_args.compare, 'r') as _f:
+            _regressions        = compare(json.load(_f), _report, _args.tolerance)
+        for _regression in _regressions:
+            print('REGRESSION ' + _regression)
+        if _regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
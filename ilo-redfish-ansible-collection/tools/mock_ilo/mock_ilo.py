@@ -0,0 +1,740 @@
+#!/usr/bin/python
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+'''
+Mock iLO 5 Redfish service serving a resource tree loaded from fixture JSON.
+
+    - MockIlo                       : resource tree, sessions, actions and SmartStorageConfig settings
+    - MockIloHandler                : HTTPS request handler (HTTP/1.1 keep-alive)
+    - start                         : run a mock iLO in a background thread, return the server
+    - create_certificate            : self-signed certificate - redfish.RedfishClient always uses https://
+
+    Behaviors:
+    - latency                       : seconds added to every request
+    - session_limit                 : POST to Sessions fails with SessionLimitExceeded beyond this number
+    - not_ready                     : Storage and NetworkAdapters answer ResourceNotReadyRetry this many times,
+                                      and while the server is in POST after a power on or a restart
+    - post_seconds                  : duration of POST after ComputerSystem.Reset
+    - erase_seconds                 : duration of a PhysicalDriveErase, started when POST completes
+    - expand / select               : advertise and honor $expand=. and $select in the service root
+    - ETag / If-None-Match          : 304 Not Modified when the resource did not change
+
+Usage:
+    python mock_ilo.py --port 8443 --latency 50
+    ilo_ip: 127.0.0.1:8443  ilo_username: admin  ilo_password: password
+'''
+
+import argparse
+import base64
+import copy
+import datetime
+import hashlib
+import json
+import os
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit, parse_qs, unquote
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit, parse_qs
+    from urllib import unquote
+
+
+FIXTURE_DIR                     = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_FIXTURE                 = os.path.join(FIXTURE_DIR, 'ilo5_dl380_gen10.json')
+
+
+#-------------------------------------------------
+
+
+def normalize(uri):
+    '''
+    iLO URIs are case insensitive and tolerate a trailing or doubled slash
+    '''
+    _path                       = urlsplit(uri).path
+    while '//' in _path:
+        _path                   = _path.replace('//', '/')
+    return unquote(_path).rstrip('/').lower()
+
+
+def extended_info(message_id, status=200, args=None):
+    _info                       = dict(MessageId=message_id)
+    if args is not None:
+        _info['MessageArgs']    = args
+    _body                       = dict(error=dict(
+        code                    = 'iLO.0.10.ExtendedInfo',
+        message                 = 'See @Message.ExtendedInfo for more information.'
+    ))
+    _body['error']['@Message.ExtendedInfo'] = [_info]
+    return status, _body
+
+
+def select(resource, properties):
+    '''
+    Keep @odata annotations and the selected properties - nested paths use '/', e.g. Oem/Hpe/PostState
+    '''
+    _result                     = dict((_k, _v) for _k, _v in resource.items() if _k.startswith('@odata'))
+    for _property in properties:
+        _keys                   = _property.split('/')
+        _src, _dst              = resource, _result
+        for _key in _keys[:-1]:
+            if not isinstance(_src.get(_key), dict):
+                _src            = None
+                break
+            _src                = _src[_key]
+            _dst                = _dst.setdefault(_key, dict())
+        if _src is not None and _keys[-1] in _src:
+            _dst[_keys[-1]]     = copy.deepcopy(_src[_keys[-1]])
+    return _result
+
+
+def merge(target, patch):
+    for _key, _value in patch.items():
+        if isinstance(_value, dict) and isinstance(target.get(_key), dict):
+            merge(target[_key], _value)
+        else:
+            target[_key]        = copy.deepcopy(_value)
+
+
+class MockIlo(object):
+
+    ROOT                        = '/redfish/v1'
+    SESSIONS                    = '/redfish/v1/sessionservice/sessions'
+    ACCOUNTS                    = '/redfish/v1/accountservice/accounts'
+    NOT_READY                   = ('/storage', '/basenetworkadapters')
+
+    def __init__(self, fixture=None, latency=0, session_limit=10, not_ready=0, post_seconds=3,
+                 expand=True, select=True, power_state='On', password='password', session_timeout=1800, erase_seconds=5):
+
+        self.latency                = latency
+        self.session_limit          = session_limit
+        self.not_ready              = not_ready
+        self.post_seconds           = post_seconds
+        self.erase_seconds          = erase_seconds
+        self.password               = password
+        self.session_timeout        = session_timeout
+
+        self.lock                   = threading.RLock()
+        self.tree                   = dict()                # normalized uri --> resource
+        self.sessions               = dict()                # token --> session
+        self.passwords              = dict()                # UserName --> password
+        self.in_post                = dict()                # system uri --> end of POST
+        self.not_ready_count        = dict()                # collection uri --> ResourceNotReadyRetry answers left
+        self.erasing                = dict()                # physical drive uri --> end of erase
+        self.stats                  = dict(requests=0, by_method=dict(), bytes_sent=0, bytes_received=0, sessions_opened=0, sessions_peak=0, not_modified=0)
+
+        with open(fixture or DEFAULT_FIXTURE, 'r') as _f:
+            for _uri, _resource in json.load(_f).items():
+                self.tree[normalize(_uri)] = _resource
+
+        _features                   = self.tree[normalize(self.ROOT)]['ProtocolFeaturesSupported']
+        if not expand:
+            _features['ExpandQuery'] = dict(ExpandAll=False, Levels=False, Links=False, MaxLevels=0, NoLinks=False)
+        _features['SelectQuery']    = bool(select)
+
+        for _account in self.get_members(self.ACCOUNTS):
+            self.passwords[_account['UserName']] = password
+
+        for _system in self.get_members(self.ROOT + '/systems'):
+            self.set_power(_system, power_state, in_post=False)
+
+
+    # ----------------- dispatch one request - returns status, headers, body (dict or None)
+    def handle(self, method, path, headers, body):
+        if self.latency:
+            time.sleep(self.latency)
+
+        _uri                        = normalize(path)
+        _query                      = parse_qs(urlsplit(path).query)
+
+        with self.lock:
+            self.stats['requests']  = self.stats['requests'] + 1
+            self.stats['by_method'][method] = self.stats['by_method'].get(method, 0) + 1
+            self.advance()
+
+            if method == 'POST' and _uri == self.SESSIONS:
+                return self.login(body)
+
+            if not (method in ('GET', 'HEAD') and _uri == normalize(self.ROOT)) and not self.authorized(headers):
+                _status, _body      = extended_info('Base.1.4.NoValidSession', 401)
+                return _status, {}, _body
+
+            if method in ('GET', 'HEAD'):
+                return self.get(_uri, _query, headers)
+            if method == 'POST':
+                return self.post(_uri, body)
+            if method == 'PATCH':
+                return self.patch(_uri, body)
+            if method == 'PUT':
+                return self.put(_uri, body)
+            if method == 'DELETE':
+                return self.delete(_uri, headers)
+
+        _status, _body              = extended_info('Base.1.4.ActionNotSupported', 405)
+        return _status, {}, _body
+
+
+    # ----------------- sessions
+    def login(self, body):
+        _username                   = (body or {}).get('UserName')
+        if _username is None or self.passwords.get(_username) != (body or {}).get('Password'):
+            _status, _body          = extended_info('Base.1.4.NoValidSession', 401)
+            return _status, {}, _body
+
+        if len(self.sessions) >= self.session_limit:
+            _status, _body          = extended_info('Base.1.4.SessionLimitExceeded', 503)
+            return _status, {}, _body
+
+        _token                      = uuid.uuid4().hex
+        _id                         = hashlib.sha1(_token.encode('utf-8')).hexdigest()[:16]
+        _uri                        = '/redfish/v1/SessionService/Sessions/{0}/'.format(_id)
+        _session                    = {
+            '@odata.id'             : _uri,
+            '@odata.type'           : '#Session.v1_0_0.Session',
+            'Id'                    : _id,
+            'Name'                  : 'User Session',
+            'UserName'              : _username,
+            'Oem'                   : {'Hpe': {'AccessTime': self.now(), 'LoginTime': self.now(), 'UserAccount': _username}}
+        }
+        self.sessions[_token]       = dict(uri=normalize(_uri), username=_username, expires=time.time() + self.session_timeout)
+        self.add_member(self.SESSIONS, _session)
+
+        self.stats['sessions_opened'] = self.stats['sessions_opened'] + 1
+        self.stats['sessions_peak'] = max(self.stats['sessions_peak'], len(self.sessions))
+
+        return 201, {'X-Auth-Token': _token, 'Location': _uri}, _session
+
+    def authorized(self, headers):
+        _token                      = headers.get('X-Auth-Token')
+        if _token:
+            _session                = self.sessions.get(_token)
+            if _session is None:
+                return False
+            if _session['expires'] < time.time():
+                self.logout(_token)
+                return False
+            _session['expires']     = time.time() + self.session_timeout
+            return True
+
+        _auth                       = headers.get('Authorization') or ''
+        if _auth.startswith('Basic '):
+            try:
+                _username, _password = base64.b64decode(_auth[6:]).decode('utf-8').split(':', 1)
+            except (ValueError, TypeError):
+                return False
+            return self.passwords.get(_username) == _password
+        return False
+
+    def logout(self, token):
+        _session                    = self.sessions.pop(token, None)
+        if _session is not None:
+            self.remove_member(self.SESSIONS, _session['uri'])
+
+
+    # ----------------- GET with $expand, $select and ETag
+    def get(self, uri, query, headers):
+        if uri.endswith(self.NOT_READY) and self.is_not_ready(uri):
+            # No Retry-After header - urllib3 would silently retry the request
+            _status, _body          = extended_info('iLO.2.14.ResourceNotReadyRetry', 503)
+            return _status, {}, _body
+
+        _resource                   = self.tree.get(uri)
+        if _resource is None:
+            _status, _body          = extended_info('Base.1.4.ResourceMissingAtURI', 404, [uri])
+            return _status, {}, _body
+
+        _resource                   = copy.deepcopy(_resource)
+        _features                   = self.tree[normalize(self.ROOT)]['ProtocolFeaturesSupported']
+        _expand                     = query.get('$expand', [None])[0]
+        _select                     = query.get('$select', [None])[0]
+
+        if _expand in ('.', '*', '.($levels=1)') and _features['ExpandQuery'].get('NoLinks') and 'Members' in _resource:
+            _resource['Members']    = [copy.deepcopy(self.tree.get(normalize(_m['@odata.id']), _m)) for _m in _resource['Members']]
+
+        if _select and _features.get('SelectQuery'):
+            _properties             = [_p.strip() for _p in _select.split(',') if _p.strip()]
+            if 'Members' in _resource:
+                _resource['Members'] = [select(_m, _properties) if len(_m) > 1 else _m for _m in _resource['Members']]
+                _properties         = _properties + ['Members', 'Members@odata.count']
+            _resource               = select(_resource, _properties)
+
+        _etag                       = 'W/"{0}"'.format(hashlib.md5(json.dumps(_resource, sort_keys=True).encode('utf-8')).hexdigest()[:8].upper())
+        if headers.get('If-None-Match') == _etag:
+            self.stats['not_modified'] = self.stats['not_modified'] + 1
+            return 304, {'ETag': _etag}, None
+        return 200, {'ETag': _etag}, _resource
+
+    def is_not_ready(self, uri):
+        for _system, _until in self.in_post.items():
+            if uri.startswith(_system):
+                return True
+        _left                       = self.not_ready_count.get(uri, self.not_ready)
+        self.not_ready_count[uri]   = max(0, _left - 1)
+        return _left > 0
+
+
+    # ----------------- POST - actions or new collection member
+    def post(self, uri, body):
+        body                        = body or dict()
+        if '/actions/' in uri:
+            return self.action(uri, body)
+
+        _collection                 = self.tree.get(uri)
+        if _collection is None or 'Members' not in _collection:
+            _status, _body          = extended_info('Base.1.4.ResourceMissingAtURI', 404, [uri])
+            return _status, {}, _body
+
+        # Member names are unique in accounts and maintenance windows
+        _key                        = 'UserName' if uri == self.ACCOUNTS else 'Name'
+        for _m in self.get_members(uri):
+            if body.get(_key) is not None and _m.get(_key) == body.get(_key):
+                _status, _body      = extended_info('Base.1.4.ResourceAlreadyExists', 400, [body.get(_key)])
+                return _status, {}, _body
+
+        _member                     = copy.deepcopy(body)
+        if uri == self.ACCOUNTS:
+            _ids                    = [int(_m['Id']) for _m in self.get_members(uri) if str(_m.get('Id', '')).isdigit()]
+            _member['Id']           = str(max(_ids + [0]) + 1)
+            self.passwords[_member['UserName']] = _member.pop('Password', None)
+            _member['Password']     = None
+            _member.setdefault('RoleId', 'ReadOnly')
+            _member.setdefault('Oem', dict()).setdefault('Hpe', dict()).setdefault('LoginName', _member['UserName'])
+        else:
+            _member['Id']           = uuid.uuid4().hex[:8]
+
+        _member['@odata.id']        = '{0}{1}/'.format(_collection['@odata.id'], _member['Id'])
+        self.add_member(uri, _member)
+        return 201, {'Location': _member['@odata.id']}, _member
+
+
+    # ----------------- ComputerSystem.Reset and Manager.Reset
+    def action(self, uri, body):
+        _target                     = uri.split('/actions/')[0]
+        _action                     = uri.split('/actions/')[-1]
+        _system                     = self.tree.get(_target)
+
+        if _action == 'computersystem.reset' and _system is not None:
+            _reset                  = body.get('ResetType')
+            if _reset in ('On', 'PushPowerButton') and _system['PowerState'] == 'Off':
+                self.set_power(_system, 'On')
+            elif _reset in ('ForceOff', 'GracefulShutdown', 'PushPowerButton'):
+                self.set_power(_system, 'Off')
+            elif _reset in ('ForceRestart', 'GracefulRestart'):
+                self.set_power(_system, 'On')
+            elif _reset not in ('On', 'Nmi'):
+                _status, _body      = extended_info('Base.1.4.ActionParameterValueNotInList', 400, [_reset, 'ResetType'])
+                return _status, {}, _body
+            _status, _body          = extended_info('Base.1.4.Success')
+            return _status, {}, _body
+
+        if _action == 'manager.reset':
+            # Every session is closed when iLO restarts
+            for _token in list(self.sessions):
+                self.logout(_token)
+            _status, _body          = extended_info('iLO.2.14.ResetInProgress')
+            return _status, {}, _body
+
+        _status, _body              = extended_info('Base.1.4.ActionNotSupported', 400, [_action])
+        return _status, {}, _body
+
+
+    # ----------------- PATCH - merge into resource
+    def patch(self, uri, body):
+        _resource                   = self.tree.get(uri)
+        if _resource is None:
+            _status, _body          = extended_info('Base.1.4.ResourceMissingAtURI', 404, [uri])
+            return _status, {}, _body
+
+        body                        = copy.deepcopy(body or dict())
+        if uri.startswith(self.ACCOUNTS + '/'):
+            _password               = body.pop('Password', None)
+            _username               = body.get('UserName', _resource['UserName'])
+            _old                    = self.passwords.pop(_resource['UserName'], None)
+            self.passwords[_username] = _password if _password is not None else _old
+
+        merge(_resource, body)
+        _status, _body              = extended_info('Base.1.4.Success')
+        return _status, {}, _body
+
+
+    # ----------------- PUT - SmartStorageConfig settings wait for the next reboot
+    def put(self, uri, body):
+        _resource                   = self.tree.get(uri)
+        if _resource is None:
+            _status, _body          = extended_info('Base.1.4.ResourceMissingAtURI', 404, [uri])
+            return _status, {}, _body
+
+        _new                        = dict((_k, _v) for _k, _v in _resource.items() if _k.startswith('@odata'))
+        _new.update(copy.deepcopy(body or dict()))
+        _resource.clear()
+        _resource.update(_new)
+
+        if uri.endswith('/smartstorageconfig/settings'):
+            _status, _body          = extended_info('iLO.2.14.SystemResetRequired')
+            return _status, {}, _body
+        _status, _body              = extended_info('Base.1.4.Success')
+        return _status, {}, _body
+
+
+    # ----------------- DELETE - sessions and collection members
+    def delete(self, uri, headers):
+        for _token, _session in list(self.sessions.items()):
+            if _session['uri'] == uri:
+                self.logout(_token)
+                _status, _body      = extended_info('Base.1.4.Success')
+                return _status, {}, _body
+
+        _parent                     = uri.rsplit('/', 1)[0]
+        if uri not in self.tree or 'Members' not in self.tree.get(_parent, {}):
+            _status, _body          = extended_info('Base.1.4.ResourceMissingAtURI', 404, [uri])
+            return _status, {}, _body
+
+        if _parent == self.ACCOUNTS:
+            self.passwords.pop(self.tree[uri].get('UserName'), None)
+        self.remove_member(_parent, uri)
+        _status, _body              = extended_info('Base.1.4.Success')
+        return _status, {}, _body
+
+
+    # ----------------- power and POST state
+    def set_power(self, system, state, in_post=True):
+        _uri                        = normalize(system['@odata.id'])
+        _oem                        = system['Oem']['Hpe']
+        system['PowerState']        = state
+        if state == 'Off':
+            self.in_post.pop(_uri, None)
+            _oem['PostState']       = 'PowerOff'
+            _oem['DeviceDiscoveryComplete']['DeviceDiscovery'] = 'vAuxDeviceDiscoveryComplete'
+        elif in_post:
+            self.in_post[_uri]      = time.time() + self.post_seconds
+            _oem['PostState']       = 'InPost'
+            _oem['DeviceDiscoveryComplete']['DeviceDiscovery'] = 'vMainDeviceDiscoveryRunning'
+        else:
+            _oem['PostState']       = 'FinishedPost'
+            _oem['DeviceDiscoveryComplete']['DeviceDiscovery'] = 'vMainDeviceDiscoveryComplete'
+
+    def advance(self):
+        # POST completes - pending SmartStorageConfig settings are applied during POST
+        for _uri, _until in list(self.in_post.items()):
+            if _until <= time.time():
+                del self.in_post[_uri]
+                self.set_power(self.tree[_uri], 'On', in_post=False)
+                self.tree[_uri]['Oem']['Hpe']['PostDiscoveryCompleteTimeStamp'] = self.now()
+                self.apply_storage_settings(_uri)
+
+        for _uri, _until in list(self.erasing.items()):
+            if _until <= time.time():
+                del self.erasing[_uri]
+                self.tree[_uri]['DiskDriveStatusReasons'] = ['EraseComplete']
+                self.tree[_uri]['Status']['State'] = 'Enabled'
+
+    def apply_storage_settings(self, system_uri):
+        _config                     = self.tree.get(system_uri + '/smartstorageconfig')
+        _settings                   = self.tree.get(system_uri + '/smartstorageconfig/settings')
+        if _config is None or _settings is None or not (_settings.get('LogicalDrives') or _settings.get('Actions')):
+            return
+
+        _controller                 = system_uri + '/smartstorage/arraycontrollers/0'
+        for _action in _settings.pop('Actions', None) or []:
+            if _action.get('Action') == 'PhysicalDriveErase':
+                self.erase_physical_drives(_controller, _action.get('PhysicalDriveList') or [])
+
+        for _ld in _settings.get('LogicalDrives') or []:
+            _actions                = [_a.get('Action') for _a in _ld.get('Actions', [])]
+            _vol_id                 = _ld.get('VolumeUniqueIdentifier')
+            if 'LogicalDriveDelete' in _actions:
+                self.delete_logical_drive(_config, _controller, _vol_id)
+            elif _vol_id is None or _vol_id not in [_l['VolumeUniqueIdentifier'] for _l in _config['LogicalDrives']]:
+                self.create_logical_drive(_config, _controller, _ld)
+
+        _config['DataGuard']        = _settings.get('DataGuard', _config['DataGuard'])
+        _settings['LogicalDrives']  = []
+
+    def create_logical_drive(self, config, controller, ld):
+        _numbers                    = [_l['LogicalDriveNumber'] for _l in config['LogicalDrives']]
+        _number                     = max(_numbers + [0]) + 1
+        _vol_id                     = '600508B1001C' + uuid.uuid4().hex[:20].upper()
+        _drives                     = self.get_physical_drives(controller)
+        _data                       = [_d for _d in _drives if _d['Location'] in ld.get('DataDrives', [])]
+        _capacity                   = sum(_d['CapacityMiB'] for _d in _data)
+        if ld.get('Raid') in ('Raid1', 'Raid10'):
+            _capacity               = _capacity // 2
+        elif ld.get('Raid') == 'Raid5' and _data:
+            _capacity               = _capacity * (len(_data) - 1) // len(_data)
+
+        _name                       = ld.get('LogicalDriveName') or 'Logical Drive {0}'.format(_number)
+        config['LogicalDrives'].append(dict(
+            LogicalDriveName        = _name,
+            LogicalDriveNumber      = _number,
+            Raid                    = ld.get('Raid'),
+            DataDrives              = list(ld.get('DataDrives', [])),
+            CapacityGiB             = _capacity // 1024,
+            StripSizeBytes          = 262144,
+            VolumeUniqueIdentifier  = _vol_id
+        ))
+
+        _collection                 = self.tree[controller + '/logicaldrives']
+        _uri                        = '{0}{1}/'.format(_collection['@odata.id'], _number)
+        self.add_member(controller + '/logicaldrives', {
+            '@odata.id'             : _uri,
+            '@odata.type'           : '#HpeSmartStorageLogicalDrive.v2_3_0.HpeSmartStorageLogicalDrive',
+            'Id'                    : str(_number),
+            'Name'                  : 'HpeSmartStorageLogicalDrive',
+            'CapacityMiB'           : _capacity,
+            'LogicalDriveName'      : _name,
+            'LogicalDriveNumber'    : _number,
+            'Raid'                  : ld.get('Raid'),
+            'Status'                : {'Health': 'OK', 'State': 'Enabled'},
+            'VolumeUniqueIdentifier': _vol_id,
+            'Links'                 : {'DataDrives': {'@odata.id': _uri + 'DataDrives/'}}
+        })
+        self.tree[normalize(_uri + 'DataDrives')] = {
+            '@odata.id'             : _uri + 'DataDrives/',
+            '@odata.type'           : '#HpeSmartStorageDiskDriveCollection.HpeSmartStorageDiskDriveCollection',
+            'Name'                  : 'HpeSmartStorageDiskDrives',
+            'Members'               : [{'@odata.id': _d['@odata.id']} for _d in _data],
+            'Members@odata.count'   : len(_data)
+        }
+        for _d in _data:
+            _d['DiskDriveUse']      = 'Data'
+
+    def delete_logical_drive(self, config, controller, vol_id):
+        _lds                        = [_l for _l in config['LogicalDrives'] if _l['VolumeUniqueIdentifier'] == vol_id]
+        config['LogicalDrives']     = [_l for _l in config['LogicalDrives'] if _l['VolumeUniqueIdentifier'] != vol_id]
+
+        for _member in self.get_members(controller + '/logicaldrives'):
+            if _member.get('VolumeUniqueIdentifier') == vol_id:
+                _uri                = normalize(_member['@odata.id'])
+                self.remove_member(controller + '/logicaldrives', _uri)
+                self.tree.pop(_uri + '/datadrives', None)
+
+        _released                   = set(_location for _l in _lds for _location in _l['DataDrives'])
+        for _d in self.get_physical_drives(controller):
+            if _d['Location'] in _released:
+                _d['DiskDriveUse']  = 'Raw'
+
+    def erase_physical_drives(self, controller, locations):
+        for _d in self.get_physical_drives(controller):
+            if _d['Location'] in locations:
+                _d['DiskDriveStatusReasons'] = ['EraseInProgress']
+                _d['Status']['State'] = 'Updating'
+                self.erasing[normalize(_d['@odata.id'])] = time.time() + self.erase_seconds
+
+    def get_physical_drives(self, controller):
+        _links                      = self.tree[controller]['Links']
+        return self.get_members(normalize(_links['PhysicalDrives']['@odata.id']))
+
+
+    # ----------------- tree helpers
+    def get_members(self, uri):
+        _collection                 = self.tree.get(normalize(uri), dict())
+        return [self.tree[normalize(_m['@odata.id'])] for _m in _collection.get('Members', []) if normalize(_m['@odata.id']) in self.tree]
+
+    def add_member(self, uri, member):
+        _collection                 = self.tree[uri]
+        self.tree[normalize(member['@odata.id'])] = member
+        _collection['Members'].append({'@odata.id': member['@odata.id']})
+        _collection['Members@odata.count'] = len(_collection['Members'])
+
+    def remove_member(self, uri, member_uri):
+        _collection                 = self.tree[uri]
+        self.tree.pop(member_uri, None)
+        _collection['Members']      = [_m for _m in _collection['Members'] if normalize(_m['@odata.id']) != member_uri]
+        _collection['Members@odata.count'] = len(_collection['Members'])
+
+    def now(self):
+        return datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class MockIloHandler(BaseHTTPRequestHandler):
+
+    protocol_version            = 'HTTP/1.1'            # keep-alive, as on iLO
+    server_version              = 'HPE-iLO-Server/1.30'
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_HEAD(self):
+        self.dispatch('HEAD')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PATCH(self):
+        self.dispatch('PATCH')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        _length                     = int(self.headers.get('Content-Length') or 0)
+        _body                       = None
+        if _length:
+            try:
+                _body               = json.loads(self.rfile.read(_length).decode('utf-8'))
+            except ValueError:
+                _body               = None
+
+        _mock                       = self.server.mock
+        with _mock.limit:
+            _status, _headers, _payload = _mock.handle(method, self.path, self.headers, _body)
+
+        _data                       = b''
+        if _payload is not None:
+            _data                   = json.dumps(_payload).encode('utf-8')
+
+        self.send_response(_status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('OData-Version', '4.0')
+        self.send_header('Content-Length', str(len(_data)))
+        for _key, _value in _headers.items():
+            self.send_header(_key, _value)
+        self.end_headers()
+        if method != 'HEAD' and _data:
+            self.wfile.write(_data)
+
+        with _mock.lock:
+            _mock.stats['bytes_sent'] = _mock.stats['bytes_sent'] + len(_data)
+            _mock.stats['bytes_received'] = _mock.stats['bytes_received'] + _length
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class Unbounded(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class MockIloServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads              = True
+    allow_reuse_address         = True
+
+    def __init__(self, address, mock, certfile, keyfile, max_inflight=None, verbose=False):
+        HTTPServer.__init__(self, address, MockIloHandler)
+        _context                    = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        _context.load_cert_chain(certfile, keyfile)
+        self.socket                 = _context.wrap_socket(self.socket, server_side=True)
+
+        self.mock                   = mock
+        self.verbose                = verbose
+        # iLO serves a bounded number of requests at once
+        mock.limit                  = threading.BoundedSemaphore(max_inflight) if max_inflight else Unbounded()
+
+
+#-------------------------------------------------
+
+
+def create_certificate(directory=None):
+    '''
+    Self-signed certificate for localhost - returns (certfile, keyfile)
+    '''
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    directory                   = directory or tempfile.mkdtemp(prefix='mock_ilo_')
+    _key                        = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    _name                       = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, u'ilo-mock')])
+    _now                        = datetime.datetime.utcnow()
+    _cert                       = (x509.CertificateBuilder()
+                                    .subject_name(_name)
+                                    .issuer_name(_name)
+                                    .public_key(_key.public_key())
+                                    .serial_number(x509.random_serial_number())
+                                    .not_valid_before(_now - datetime.timedelta(days=1))
+                                    .not_valid_after(_now + datetime.timedelta(days=365))
+                                    .sign(_key, hashes.SHA256()))
+
+    _certfile                   = os.path.join(directory, 'cert.pem')
+    _keyfile                    = os.path.join(directory, 'key.pem')
+    with open(_certfile, 'wb') as _f:
+        _f.write(_cert.public_bytes(serialization.Encoding.PEM))
+    with open(_keyfile, 'wb') as _f:
+        _f.write(_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()))
+    return _certfile, _keyfile
+
+
+def start(host='127.0.0.1', port=0, certfile=None, keyfile=None, max_inflight=None, verbose=False, **options):
+    '''
+    Run a mock iLO in a background thread - ilo_ip is '{host}:{server.server_address[1]}'
+    Options are passed to MockIlo. Call server.shutdown() to stop it.
+    '''
+    if certfile is None:
+        certfile, keyfile       = create_certificate()
+
+    _server                     = MockIloServer((host, port), MockIlo(**options), certfile, keyfile, max_inflight=max_inflight, verbose=verbose)
+    _thread                     = threading.Thread(target=_server.serve_forever)
+    _thread.daemon              = True
+    _thread.start()
+    return _server
+
+
+def main():
+    _parser                     = argparse.ArgumentParser(description='Mock iLO 5 Redfish service')
+    _parser.add_argument('--host', default='127.0.0.1')
+    _parser.add_argument('--port', type=int, default=8443)
+    _parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='JSON file mapping uri to resource')
+    _parser.add_argument('--latency', type=float, default=0, help='milliseconds added to every request')
+    _parser.add_argument('--session-limit', type=int, default=10)
+    _parser.add_argument('--not-ready', type=int, default=0, help='ResourceNotReadyRetry answers before Storage/NetworkAdapters are ready')
+    _parser.add_argument('--post-seconds', type=float, default=3)
+    _parser.add_argument('--erase-seconds', type=float, default=5, help='duration of a PhysicalDriveErase')
+    _parser.add_argument('--power-off', action='store_true', help='start with the server powered off')
+    _parser.add_argument('--no-expand', action='store_true', help='do not advertise $expand')
+    _parser.add_argument('--no-select', action='store_true', help='do not advertise $select')
+    _parser.add_argument('--password', default='password', help='password of every fixture account')
+    _parser.add_argument('--max-inflight', type=int, default=None, help='requests served at once')
+    _parser.add_argument('--cert', default=None)
+    _parser.add_argument('--key', default=None)
+    _parser.add_argument('--verbose', action='store_true')
+    _args                       = _parser.parse_args()
+
+    _server                     = start(host=_args.host, port=_args.port, certfile=_args.cert, keyfile=_args.key,
+                                        max_inflight=_args.max_inflight, verbose=_args.verbose,
+                                        fixture=_args.fixture, latency=_args.latency / 1000.0, session_limit=_args.session_limit,
+                                        not_ready=_args.not_ready, post_seconds=_args.post_seconds, erase_seconds=_args.erase_seconds,
+                                        expand=not _args.no_expand,
+                                        select=not _args.no_select, power_state='Off' if _args.power_off else 'On', password=_args.password)
+    print('Mock iLO listening on https://{0}:{1}'.format(*_server.server_address))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        _server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+ # Copyright 2021 Hewlett Packard Enterprise Development LP
+ #
+ # Licensed under the Apache License, Version 2.0 (the "License"); you may
+ # not use this file except in compliance with the License. You may obtain
+ # a copy of the License at
+ #
+ #      http://www.apache.org/licenses/LICENSE-2.0
+ #
+ # Unless required by applicable law or agreed to in writing, software
+ # distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ # License for the specific language governing permissions and limitations
+ # under the License.
+
+# -*- coding: utf-8 -*-
+
+'''
+Run a plugins/modules/*.py entry point outside of a playbook, e.g. against the mock iLO.
+
+    - run                           : call run_module() of a module with the given arguments, return its result dict
+    - main                          : command line - result printed as JSON
+
+Usage:
+    python run_module.py ilo_system_facts ilo_ip=127.0.0.1:8443 ilo_username=admin ilo_password=password option=Storage
+    python run_module.py ilo_user_facts @args.json
+'''
+
+import argparse
+import importlib
+import io
+import json
+import os
+import sys
+
+import ansible.module_utils
+import ansible.module_utils.basic
+
+
+COLLECTION_DIR                  = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODULES_DIR                     = os.path.join(COLLECTION_DIR, 'plugins', 'modules')
+MODULE_UTILS_DIR                = os.path.join(COLLECTION_DIR, 'plugins', 'module_utils')
+
+# Modules import their helpers as ansible.module_utils.<name>
+if MODULE_UTILS_DIR not in ansible.module_utils.__path__:
+    ansible.module_utils.__path__.insert(0, MODULE_UTILS_DIR)
+if MODULES_DIR not in sys.path:
+    sys.path.insert(0, MODULES_DIR)
+
+
+#-------------------------------------------------
+
+
+def run(module_name, args):
+    '''
+    Call run_module() and capture the result printed by exit_json / fail_json
+    '''
+    _payload                    = json.dumps(dict(ANSIBLE_MODULE_ARGS=args))
+    ansible.module_utils.basic._ANSIBLE_ARGS = _payload.encode('utf-8')
+    # ansible-core 2.19+ also expects the serialization profile of the arguments
+    if hasattr(ansible.module_utils.basic, '_ANSIBLE_PROFILE'):
+        ansible.module_utils.basic._ANSIBLE_PROFILE = 'legacy'
+
+    _module                     = importlib.import_module(module_name)
+    _stdout                     = sys.stdout
+    sys.stdout                  = io.StringIO()
+    try:
+        _module.run_module()
+    except SystemExit:
+        pass
+    finally:
+        _output                 = sys.stdout.getvalue()
+        sys.stdout              = _stdout
+
+    try:
+        return json.loads(_output)
+    except ValueError:
+        return dict(failed=True, msg='module output is not JSON', output=_output)
+
+
+def parse_args(values):
+    _args                       = dict()
+    for _value in values:
+        if _value.startswith('@'):
+            with open(_value[1:], 'r') as _f:
+                _args.update(json.load(_f))
+            continue
+        _key, _, _raw           = _value.partition('=')
+        try:
+            _args[_key]         = json.loads(_raw)
+        except ValueError:
+            _args[_key]         = _raw
+    return _args
+
+
+def main():
+    _parser                     = argparse.ArgumentParser(description='Run an ilo_* module outside of a playbook')
+    _parser.add_argument('module', help='module name, e.g. ilo_system_facts')
+    _parser.add_argument('args', nargs='*', help='key=value (value parsed as JSON when possible) or @file.json')
+    _args                       = _parser.parse_args()
+
+    _result                     = run(_args.module, parse_args(_args.args))
+    print(json.dumps(_result, indent=4))
+    sys.exit(1 if _result.get('failed') else 0)
+
+
+if __name__ == '__main__':
+    main()